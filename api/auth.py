@@ -222,10 +222,11 @@ def verify_session(session_token: str) -> Optional[str]:
     if not session_token:
         return None
     
-    if session_token not in _session_storage:
+    # Sessions live in process memory, so this is a single dict lookup
+    session_data = _session_storage.get(session_token)
+    if session_data is None:
         return None
     
-    session_data = _session_storage[session_token]
     now = datetime.utcnow()
     
     # Check if expired
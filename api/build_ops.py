@@ -9,14 +9,16 @@ import json
 import os
 import re
 from datetime import datetime
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, AsyncIterator, Tuple
 from pathlib import Path
 from enum import Enum
 from dataclasses import dataclass
 import asyncio
+import aiofiles
+from collections import deque
 from config import settings
 from models import BuildConfig, BuildStatus, BuildStatusResponse, ProjectType
-from email_service import send_build_started_email, send_build_completed_email, send_build_stalled_email
+from email_service import send_build_started_email, send_build_completed_email, send_build_stalled_email, fire_notification
 from system_metrics import clear_workers
 from python_utils import get_python_env_with_encoding, format_python_command
 
@@ -462,10 +464,7 @@ async def start_build(config: BuildConfig) -> BuildStatusResponse:
     save_build_status(build_id, status_data)
     
     # Send notification email
-    try:
-        await send_build_started_email(build_id, config.dict())
-    except Exception as e:
-        print(f"Failed to send build started email: {e}")
+    fire_notification(send_build_started_email(build_id, config.dict()), "build started")
     
     # Start build in background
     asyncio.create_task(run_build(build_id, config, workers))
@@ -668,10 +667,10 @@ async def run_build(build_id: str, config: BuildConfig, workers: int):
                         )
                         save_build_status(build_id, status_data)
                     
-                    try:
-                        await send_build_stalled_email(build_id, f"Build timed out after {int(elapsed_seconds)} seconds")
-                    except:
-                        pass
+                    fire_notification(
+                        send_build_stalled_email(build_id, f"Build timed out after {int(elapsed_seconds)} seconds"),
+                        "build stalled"
+                    )
                     
                     process.kill()
                     print(f"[BUILD] Killed build {build_id} - exceeded {BUILD_TIMEOUT_SECONDS}s timeout")
@@ -766,10 +765,7 @@ async def run_build(build_id: str, config: BuildConfig, workers: int):
                                 )
                                 save_build_status(build_id, status_data)
                             
-                            try:
-                                await send_build_stalled_email(build_id, content[-2000:])
-                            except:
-                                pass
+                            fire_notification(send_build_stalled_email(build_id, content[-2000:]), "build stalled")
                             
                             process.kill()
                             print(f"[BUILD] Killed build {build_id} - stalled for {BUILD_STALL_TIMEOUT_SECONDS}s")
@@ -887,15 +883,15 @@ async def run_build(build_id: str, config: BuildConfig, workers: int):
         save_build_status(build_id, status_data)
         
         # Send completion email
-        try:
-            await send_build_completed_email(
+        fire_notification(
+            send_build_completed_email(
                 build_id,
                 status_data["status"] == BuildStatus.SUCCESS.value,
                 status_data["message"],
                 status_data.get("error")
-            )
-        except Exception as e:
-            print(f"Failed to send completion email: {e}")
+            ),
+            "completion"
+        )
             
     except Exception as e:
         # Build error
@@ -908,10 +904,10 @@ async def run_build(build_id: str, config: BuildConfig, workers: int):
             status_data["completed_at"] = completed_at.isoformat()
             save_build_status(build_id, status_data)
         
-        try:
-            await send_build_completed_email(build_id, False, f"Build error: {str(e)}", str(e))
-        except:
-            pass
+        fire_notification(
+            send_build_completed_email(build_id, False, f"Build error: {str(e)}", str(e)),
+            "completion"
+        )
 
 
 async def get_build_status(build_id: str) -> Optional[BuildStatusResponse]:
@@ -940,23 +936,85 @@ def get_build_logs(build_id: str, lines: int = 100) -> Optional[str]:
     if not log_path.exists():
         return None
     
+    # Only the last N lines are ever held in memory
+    maxlen = lines if lines > 0 else None
     try:
         # Use error handling for UTF-8 encoding issues
         with open(log_path, "r", encoding='utf-8', errors='replace') as f:
-            all_lines = f.readlines()
-            return "".join(all_lines[-lines:])
+            return "".join(deque(f, maxlen=maxlen))
     except UnicodeDecodeError as e:
         # If UTF-8 fails, try with latin-1 as fallback
         try:
             with open(log_path, "r", encoding='latin-1') as f:
-                all_lines = f.readlines()
-                return "".join(all_lines[-lines:])
+                return "".join(deque(f, maxlen=maxlen))
         except Exception as e2:
             return f"Error reading log: UTF-8 decode error ({str(e)}), fallback also failed ({str(e2)})"
     except Exception as e:
         return f"Error reading log: {str(e)}"
 
 
+# How often a followed log stream checks for new output
+BUILD_LOG_POLL_SECONDS = 0.5
+
+
+def _read_log_tail(log_path: Path, lines: int) -> Tuple[List[bytes], int]:
+    """Last N raw lines of a log (all for 0 or less) and the offset they end at"""
+    with open(log_path, "rb") as f:
+        tail = deque(f, maxlen=lines if lines > 0 else None)
+        return list(tail), f.tell()
+
+
+async def stream_build_logs(build_id: str, lines: int = 100, follow: bool = False) -> AsyncIterator[str]:
+    """Yield build log lines without loading the whole log into memory.
+
+    Args:
+        build_id: Build whose log to read
+        lines: Number of trailing lines to start from (0 or less for all)
+        follow: Keep yielding new lines while the build is pending or running
+
+    Returns:
+        Async iterator of log lines, each including its trailing newline
+        except possibly the last one
+    """
+    log_path = get_build_log_path(build_id)
+    
+    # The backlog is read in one pass on a worker thread; going through
+    # aiofiles would cost an executor round trip per line
+    tail, offset = await asyncio.to_thread(_read_log_tail, log_path, lines)
+    
+    # A line still being written stays buffered until it is complete
+    pending = b""
+    if follow and tail and not tail[-1].endswith(b"\n"):
+        pending = tail.pop()
+    for line in tail:
+        yield line.decode("utf-8", errors="replace")
+    del tail
+    
+    if not follow:
+        return
+    
+    async with aiofiles.open(log_path, "rb") as f:
+        await f.seek(offset)
+        while True:
+            chunk = await f.readline()
+            if chunk:
+                pending += chunk
+                if pending.endswith(b"\n"):
+                    yield pending.decode("utf-8", errors="replace")
+                    pending = b""
+                continue
+            
+            status_data = load_build_status(build_id)
+            if not status_data or status_data.get("status") not in ("running", "pending"):
+                # Pick up anything written between the last read and the build finishing
+                pending += await f.read()
+                break
+            await asyncio.sleep(BUILD_LOG_POLL_SECONDS)
+    
+    if pending:
+        yield pending.decode("utf-8", errors="replace")
+
+
 async def kill_build(build_id: str) -> Dict[str, Any]:
     """Kill a running build process"""
     try:
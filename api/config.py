@@ -31,6 +31,8 @@ class Settings(BaseSettings):
     DEV_DIR: str = "/var/www/dintrafikskolax_dev"
     PROD_DIR: str = "/var/www/dintrafikskolax_prod"
     APP_DIR: str = "/var/www/dintrafikskolax_app"
+    # Bare mirror used for the commit timeline (empty = read the dev worktree)
+    TIMELINE_MIRROR: str = ""
     
     # PM2 Configuration
     PM2_DEV_APP: str = "dintrafikskolax-dev"
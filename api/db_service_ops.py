@@ -1,14 +1,193 @@
 """Database service management operations"""
 import subprocess
 import asyncio
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 from datetime import datetime
+import asyncpg
+import orjson
+from config import settings
+
+# Process-wide asyncpg pools, one per database URL, shared by the service,
+# troubleshooting and health endpoints. Created on first use (the
+# settings.DATABASE_URL one is warmed on app startup) and closed on shutdown
+PG_POOL_MIN_SIZE = 1
+PG_POOL_MAX_SIZE = 10
+_pg_pools: Dict[str, Any] = {}
+_pg_pool_locks: Dict[str, asyncio.Lock] = {}
+
+PG_ACTIVITY_QUERY = (
+    "SELECT datname, usename, client_addr::text AS client_addr, state, query_start "
+    "FROM pg_stat_activity WHERE state IS NOT NULL ORDER BY query_start DESC"
+)
+
+
+async def get_pg_pool(database_url: Optional[str] = None):
+    """
+    Return the shared asyncpg pool for a database, creating it on first use
+    
+    Args:
+        database_url: Database to connect to (defaults to settings.DATABASE_URL)
+        
+    Returns:
+        asyncpg pool; a pool that fails to connect isn't kept, so the next
+        call tries again
+    """
+    database_url = database_url or settings.DATABASE_URL
+    pool = _pg_pools.get(database_url)
+    if pool is None:
+        # Per-URL lock: an unreachable database doesn't hold up the others
+        async with _pg_pool_locks.setdefault(database_url, asyncio.Lock()):
+            pool = _pg_pools.get(database_url)
+            if pool is None:
+                pool = await asyncpg.create_pool(
+                    dsn=database_url,
+                    min_size=PG_POOL_MIN_SIZE,
+                    max_size=PG_POOL_MAX_SIZE,
+                    max_inactive_connection_lifetime=300,
+                    command_timeout=60,
+                    timeout=10
+                )
+                _pg_pools[database_url] = pool
+    return pool
+
+
+async def close_pg_pool() -> None:
+    """Close all shared asyncpg pools (called on app shutdown)"""
+    pools = list(_pg_pools.values())
+    _pg_pools.clear()
+    await asyncio.gather(*(pool.close() for pool in pools), return_exceptions=True)
+
+
+def _find_active_line(systemctl_output: Optional[str]) -> str:
+    """Return the 'Active:' line from `systemctl status` output in a single pass"""
+    if not systemctl_output:
+        return ''
+    return next((l for l in systemctl_output.splitlines() if l.lstrip().startswith('Active:')), '')
+
+
+# systemd Manager methods keyed by the action name used by the endpoints
+_SYSTEMD_METHODS = {
+    "start": "start_unit",
+    "stop": "stop_unit",
+    "restart": "restart_unit",
+}
+
+SYSTEMD_SERVICE = "org.freedesktop.systemd1"
+SYSTEMD_OBJECT_PATH = "/org/freedesktop/systemd1"
+SYSTEMD_MANAGER_INTERFACE = "org.freedesktop.systemd1.Manager"
+
+_systemd_bus = None
+_systemd_manager = None
+_systemd_subscribed = False
+
+
+def _get_systemd_manager():
+    """
+    Return the system bus and a cached async proxy for
+    org.freedesktop.systemd1.Manager on it
+    
+    Raises ImportError when sdbus isn't installed and SdBusLibraryError when
+    the system bus can't be opened.
+    """
+    global _systemd_bus, _systemd_manager
+    if _systemd_manager is None:
+        from sdbus import DbusInterfaceCommonAsync, dbus_method_async, sd_bus_open_system
+        
+        class SystemdManager(
+            DbusInterfaceCommonAsync,
+            interface_name=SYSTEMD_MANAGER_INTERFACE
+        ):
+            @dbus_method_async(input_signature="ss", result_signature="o")
+            async def start_unit(self, name: str, mode: str) -> str:
+                ...
+            
+            @dbus_method_async(input_signature="ss", result_signature="o")
+            async def stop_unit(self, name: str, mode: str) -> str:
+                ...
+            
+            @dbus_method_async(input_signature="ss", result_signature="o")
+            async def restart_unit(self, name: str, mode: str) -> str:
+                ...
+            
+            @dbus_method_async()
+            async def subscribe(self) -> None:
+                ...
+        
+        bus = sd_bus_open_system()
+        _systemd_manager = SystemdManager.new_proxy(SYSTEMD_SERVICE, SYSTEMD_OBJECT_PATH, bus)
+        _systemd_bus = bus
+    return _systemd_bus, _systemd_manager
+
+
+async def _systemctl_action(unit: str, action: str, timeout: int) -> Tuple[bool, str]:
+    """Run `sudo systemctl <action> <unit>`, which blocks until the job finishes"""
+    result = await asyncio.to_thread(
+        subprocess.run,
+        ["sudo", "systemctl", action, unit],
+        capture_output=True,
+        text=True,
+        timeout=timeout
+    )
+    return result.returncode == 0, result.stderr or result.stdout
+
+
+async def _systemd_action(unit: str, action: str, timeout: int = 30) -> Tuple[bool, str]:
+    """
+    Start, stop or restart a systemd unit and wait for the job to finish
+    
+    Talks to systemd directly over D-Bus and waits for the JobRemoved signal
+    of the queued job, so success means the job completed rather than just
+    being queued. Falls back to `sudo systemctl` only when sdbus isn't
+    installed or the system bus can't be opened; errors from systemd itself
+    are raised to the caller.
+    
+    Args:
+        unit: Unit name without the .service suffix (e.g. 'postgresql')
+        action: One of 'start', 'stop', 'restart'
+        timeout: Seconds to wait for the job to finish
+        
+    Returns:
+        Tuple of (success, output) where output is the job result ('done',
+        'failed', 'timeout', ...) or the systemctl output
+    """
+    global _systemd_subscribed
+    try:
+        bus, manager = _get_systemd_manager()
+    except Exception as e:
+        print(f"systemd D-Bus unavailable for {action} of {unit}, using systemctl: {e}")
+        return await _systemctl_action(unit, action, timeout)
+    
+    # Listen before queueing the job so its JobRemoved can't be missed
+    jobs_removed = await bus.get_signal_queue_async(
+        SYSTEMD_SERVICE, SYSTEMD_OBJECT_PATH, SYSTEMD_MANAGER_INTERFACE, "JobRemoved"
+    )
+    if not _systemd_subscribed:
+        # systemd only emits job signals once a client has subscribed
+        await manager.subscribe()
+        _systemd_subscribed = True
+    
+    method = getattr(manager, _SYSTEMD_METHODS[action])
+    job_path = await method(f"{unit}.service", "replace")
+    
+    async def wait_for_job() -> str:
+        while True:
+            message = await jobs_removed.get()
+            _job_id, removed_path, _unit, result = message.get_contents()
+            if removed_path == job_path:
+                return result
+    
+    try:
+        result = await asyncio.wait_for(wait_for_job(), timeout=timeout)
+    except asyncio.TimeoutError:
+        return False, f"{action} of {unit} did not finish within {timeout}s (job {job_path})"
+    return result == "done", result
 
 
 async def get_postgres_status() -> Dict[str, Any]:
     """Get PostgreSQL service status"""
     try:
-        result = subprocess.run(
+        result = await asyncio.to_thread(
+            subprocess.run,
             ["systemctl", "status", "postgresql"],
             capture_output=True,
             text=True,
@@ -18,11 +197,11 @@ async def get_postgres_status() -> Dict[str, Any]:
         is_running = result.returncode == 0
         
         # Parse status output
-        status_lines = result.stdout.split('\n') if result.stdout else []
-        active_line = next((l for l in status_lines if 'Active:' in l), '')
+        active_line = _find_active_line(result.stdout)
         
         # Get more details
-        version_result = subprocess.run(
+        version_result = await asyncio.to_thread(
+            subprocess.run,
             ["psql", "--version"],
             capture_output=True,
             text=True,
@@ -59,7 +238,8 @@ async def get_postgres_status() -> Dict[str, Any]:
 async def get_redis_status() -> Dict[str, Any]:
     """Get Redis service status"""
     try:
-        result = subprocess.run(
+        result = await asyncio.to_thread(
+            subprocess.run,
             ["systemctl", "status", "redis-server"],
             capture_output=True,
             text=True,
@@ -69,11 +249,11 @@ async def get_redis_status() -> Dict[str, Any]:
         is_running = result.returncode == 0
         
         # Parse status output
-        status_lines = result.stdout.split('\n') if result.stdout else []
-        active_line = next((l for l in status_lines if 'Active:' in l), '')
+        active_line = _find_active_line(result.stdout)
         
         # Try redis-cli ping
-        ping_result = subprocess.run(
+        ping_result = await asyncio.to_thread(
+            subprocess.run,
             ["redis-cli", "ping"],
             capture_output=True,
             text=True,
@@ -107,30 +287,30 @@ async def get_redis_status() -> Dict[str, Any]:
         }
 
 
-async def start_postgres() -> Dict[str, Any]:
-    """Start PostgreSQL service"""
+async def start_postgres(include_status: bool = False) -> Dict[str, Any]:
+    """
+    Start PostgreSQL service
+    
+    Args:
+        include_status: Include the service status in the response. Off by
+            default since the dashboard refetches /api/services/status itself.
+    """
     try:
-        result = subprocess.run(
-            ["sudo", "systemctl", "start", "postgresql"],
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
+        success, output = await _systemd_action("postgresql", "start", timeout=30)
         
-        if result.returncode == 0:
-            # Wait a moment and check status
-            await asyncio.sleep(2)
-            status = await get_postgres_status()
-            return {
+        if success:
+            response = {
                 "success": True,
-                "message": "PostgreSQL started successfully",
-                "status": status
+                "message": "PostgreSQL started successfully"
             }
+            if include_status:
+                response["status"] = await get_postgres_status()
+            return response
         else:
             return {
                 "success": False,
                 "message": "Failed to start PostgreSQL",
-                "error": result.stderr or result.stdout
+                "error": output
             }
     except Exception as e:
         return {
@@ -143,14 +323,9 @@ async def start_postgres() -> Dict[str, Any]:
 async def stop_postgres() -> Dict[str, Any]:
     """Stop PostgreSQL service"""
     try:
-        result = subprocess.run(
-            ["sudo", "systemctl", "stop", "postgresql"],
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
+        success, output = await _systemd_action("postgresql", "stop", timeout=30)
         
-        if result.returncode == 0:
+        if success:
             return {
                 "success": True,
                 "message": "PostgreSQL stopped successfully"
@@ -159,7 +334,7 @@ async def stop_postgres() -> Dict[str, Any]:
             return {
                 "success": False,
                 "message": "Failed to stop PostgreSQL",
-                "error": result.stderr or result.stdout
+                "error": output
             }
     except Exception as e:
         return {
@@ -169,30 +344,30 @@ async def stop_postgres() -> Dict[str, Any]:
         }
 
 
-async def restart_postgres() -> Dict[str, Any]:
-    """Restart PostgreSQL service"""
+async def restart_postgres(include_status: bool = False) -> Dict[str, Any]:
+    """
+    Restart PostgreSQL service
+    
+    Args:
+        include_status: Include the service status in the response. Off by
+            default since the dashboard refetches /api/services/status itself.
+    """
     try:
-        result = subprocess.run(
-            ["sudo", "systemctl", "restart", "postgresql"],
-            capture_output=True,
-            text=True,
-            timeout=60
-        )
+        success, output = await _systemd_action("postgresql", "restart", timeout=60)
         
-        if result.returncode == 0:
-            # Wait a moment and check status
-            await asyncio.sleep(3)
-            status = await get_postgres_status()
-            return {
+        if success:
+            response = {
                 "success": True,
-                "message": "PostgreSQL restarted successfully",
-                "status": status
+                "message": "PostgreSQL restarted successfully"
             }
+            if include_status:
+                response["status"] = await get_postgres_status()
+            return response
         else:
             return {
                 "success": False,
                 "message": "Failed to restart PostgreSQL",
-                "error": result.stderr or result.stdout
+                "error": output
             }
     except Exception as e:
         return {
@@ -202,29 +377,30 @@ async def restart_postgres() -> Dict[str, Any]:
         }
 
 
-async def start_redis() -> Dict[str, Any]:
-    """Start Redis service"""
+async def start_redis(include_status: bool = False) -> Dict[str, Any]:
+    """
+    Start Redis service
+    
+    Args:
+        include_status: Include the service status in the response. Off by
+            default since the dashboard refetches /api/services/status itself.
+    """
     try:
-        result = subprocess.run(
-            ["sudo", "systemctl", "start", "redis-server"],
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
+        success, output = await _systemd_action("redis-server", "start", timeout=30)
         
-        if result.returncode == 0:
-            await asyncio.sleep(2)
-            status = await get_redis_status()
-            return {
+        if success:
+            response = {
                 "success": True,
-                "message": "Redis started successfully",
-                "status": status
+                "message": "Redis started successfully"
             }
+            if include_status:
+                response["status"] = await get_redis_status()
+            return response
         else:
             return {
                 "success": False,
                 "message": "Failed to start Redis",
-                "error": result.stderr or result.stdout
+                "error": output
             }
     except Exception as e:
         return {
@@ -237,14 +413,9 @@ async def start_redis() -> Dict[str, Any]:
 async def stop_redis() -> Dict[str, Any]:
     """Stop Redis service"""
     try:
-        result = subprocess.run(
-            ["sudo", "systemctl", "stop", "redis-server"],
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
+        success, output = await _systemd_action("redis-server", "stop", timeout=30)
         
-        if result.returncode == 0:
+        if success:
             return {
                 "success": True,
                 "message": "Redis stopped successfully"
@@ -253,7 +424,7 @@ async def stop_redis() -> Dict[str, Any]:
             return {
                 "success": False,
                 "message": "Failed to stop Redis",
-                "error": result.stderr or result.stdout
+                "error": output
             }
     except Exception as e:
         return {
@@ -263,29 +434,30 @@ async def stop_redis() -> Dict[str, Any]:
         }
 
 
-async def restart_redis() -> Dict[str, Any]:
-    """Restart Redis service"""
+async def restart_redis(include_status: bool = False) -> Dict[str, Any]:
+    """
+    Restart Redis service
+    
+    Args:
+        include_status: Include the service status in the response. Off by
+            default since the dashboard refetches /api/services/status itself.
+    """
     try:
-        result = subprocess.run(
-            ["sudo", "systemctl", "restart", "redis-server"],
-            capture_output=True,
-            text=True,
-            timeout=60
-        )
+        success, output = await _systemd_action("redis-server", "restart", timeout=60)
         
-        if result.returncode == 0:
-            await asyncio.sleep(2)
-            status = await get_redis_status()
-            return {
+        if success:
+            response = {
                 "success": True,
-                "message": "Redis restarted successfully",
-                "status": status
+                "message": "Redis restarted successfully"
             }
+            if include_status:
+                response["status"] = await get_redis_status()
+            return response
         else:
             return {
                 "success": False,
                 "message": "Failed to restart Redis",
-                "error": result.stderr or result.stdout
+                "error": output
             }
     except Exception as e:
         return {
@@ -332,11 +504,43 @@ async def run_postgres_maintenance() -> Dict[str, Any]:
 
 
 async def get_postgres_connections() -> Dict[str, Any]:
-    """Get current PostgreSQL connections"""
+    """
+    Get current PostgreSQL connections
+    
+    Queries pg_stat_activity over a pooled asyncpg connection when DATABASE_URL
+    is configured, otherwise falls back to psql as the postgres system user.
+    Either way "connections" is a list of row dicts with query_start as an
+    ISO 8601 string.
+    """
+    if settings.DATABASE_URL:
+        try:
+            pool = await get_pg_pool()
+            async with pool.acquire() as conn:
+                rows = await conn.fetch(PG_ACTIVITY_QUERY)
+            connections = []
+            for row in rows:
+                item = dict(row)
+                if item["query_start"] is not None:
+                    item["query_start"] = item["query_start"].isoformat()
+                connections.append(item)
+            return {
+                "success": True,
+                "connections": connections
+            }
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e)
+            }
+    
     try:
+        # Have psql return the rows as one JSON array so both paths produce
+        # the same shape
         result = subprocess.run(
-            ["sudo", "-u", "postgres", "psql", "-c", 
-             "SELECT datname, usename, client_addr, state, query_start FROM pg_stat_activity WHERE state IS NOT NULL ORDER BY query_start DESC;"],
+            [
+                "sudo", "-u", "postgres", "psql", "-X", "-A", "-t", "-c",
+                f"SELECT coalesce(json_agg(activity), '[]') FROM ({PG_ACTIVITY_QUERY}) AS activity;"
+            ],
             capture_output=True,
             text=True,
             timeout=10
@@ -345,7 +549,7 @@ async def get_postgres_connections() -> Dict[str, Any]:
         if result.returncode == 0:
             return {
                 "success": True,
-                "connections": result.stdout
+                "connections": orjson.loads(result.stdout)
             }
         else:
             return {
@@ -361,8 +565,17 @@ async def get_postgres_connections() -> Dict[str, Any]:
 
 async def get_all_services_status() -> Dict[str, Any]:
     """Get status of all database-related services"""
-    postgres = await get_postgres_status()
-    redis = await get_redis_status()
+    try:
+        # Probe both services concurrently; if one side fails the other is cancelled
+        async with asyncio.TaskGroup() as tg:
+            postgres_task = tg.create_task(get_postgres_status())
+            redis_task = tg.create_task(get_redis_status())
+        postgres = postgres_task.result()
+        redis = redis_task.result()
+    except* Exception as eg:
+        error = "; ".join(str(e) for e in eg.exceptions)
+        postgres = {"service": "postgresql", "running": False, "status": "error", "error": error}
+        redis = {"service": "redis-server", "running": False, "status": "error", "error": error}
     
     return {
         "postgresql": postgres,
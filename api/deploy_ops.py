@@ -1,14 +1,94 @@
 """Deployment operations for Go Live"""
-import subprocess
+import asyncio
+import hashlib
+import json
 import shutil
 import os
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
 from config import settings
+from health import _find_database_url
 from models import DeployGoLiveRequest, DeployGoLiveResponse
 from pm2_ops import restart_pm2_app
 
+# Persisted between deploys to remember what was last migrated
+DEPLOY_STATE_FILE = ".next.deploy-state.json"
+
+
+def _migrations_fingerprint(migrations_dir: Path, database_url: str) -> str:
+    """Hash the target database and the (relative path, size, mtime) of every
+    file under migrations_dir, so pointing prod at another database re-runs
+    the migrations even when the files are unchanged"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(database_url.encode() + b"\n")
+    if migrations_dir.exists():
+        entries = []
+        for root, _dirs, files in os.walk(migrations_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                stat = os.stat(path)
+                entries.append((os.path.relpath(path, migrations_dir), stat.st_size, stat.st_mtime_ns))
+        for rel_path, size, mtime_ns in sorted(entries):
+            digest.update(f"{rel_path}\0{size}\0{mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+def _prisma_database_url(prod_dir: Path) -> str:
+    """DATABASE_URL the Prisma CLI will use in prod_dir: the process
+    environment, then .env, then prisma/.env (Prisma ignores .env.local)"""
+    if os.environ.get("DATABASE_URL"):
+        return os.environ["DATABASE_URL"]
+    for env_file in (prod_dir / ".env", prod_dir / "prisma" / ".env"):
+        try:
+            url = _find_database_url(env_file.read_bytes())
+        except OSError:
+            continue
+        if url is not None:
+            return url
+    return ""
+
+
+def _load_deploy_state(prod_dir: Path) -> dict:
+    """Load the deploy state file from the prod directory"""
+    try:
+        with open(prod_dir / DEPLOY_STATE_FILE, "r") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def _save_deploy_state(prod_dir: Path, state: dict) -> None:
+    """Persist the deploy state file in the prod directory"""
+    try:
+        with open(prod_dir / DEPLOY_STATE_FILE, "w") as f:
+            json.dump(state, f, indent=2)
+    except Exception as e:
+        print(f"Failed to save deploy state: {e}")
+
+
+async def _run_prisma_migrate_deploy(prod_dir: Path) -> bool:
+    """Run `prisma migrate deploy` in prod_dir, returning True on success"""
+    process = await asyncio.create_subprocess_exec(
+        "npx", "prisma", "migrate", "deploy",
+        cwd=str(prod_dir),
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+    try:
+        _stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=120)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        print("Prisma migrate warning: timed out after 120s")
+        return False
+    
+    if process.returncode != 0:
+        # Log but don't fail - migrations might already be applied
+        print(f"Prisma migrate warning: {stderr.decode(errors='replace')}")
+        return False
+    return True
+
 
 async def deploy_to_production(request: DeployGoLiveRequest) -> DeployGoLiveResponse:
     """
@@ -28,6 +108,16 @@ async def deploy_to_production(request: DeployGoLiveRequest) -> DeployGoLiveResp
     dev_dir = Path(settings.DEV_DIR)
     prod_dir = Path(settings.PROD_DIR)
     
+    # Derived paths, built once and used throughout
+    dev_next = dev_dir / ".next"
+    prod_next = prod_dir / ".next"
+    dev_public = dev_dir / "public"
+    prod_public = prod_dir / "public"
+    dev_prisma = dev_dir / "prisma"
+    prod_prisma = prod_dir / "prisma"
+    dev_migrations = dev_prisma / "migrations"
+    prod_migrations = prod_prisma / "migrations"
+    
     if not dev_dir.exists():
         return DeployGoLiveResponse(
             success=False,
@@ -43,7 +133,6 @@ async def deploy_to_production(request: DeployGoLiveRequest) -> DeployGoLiveResp
         )
     
     # Check if .next directory exists in dev
-    dev_next = dev_dir / ".next"
     if not dev_next.exists():
         return DeployGoLiveResponse(
             success=False,
@@ -55,12 +144,10 @@ async def deploy_to_production(request: DeployGoLiveRequest) -> DeployGoLiveResp
         # Create backup if requested
         if not request.skip_backup:
             backup_dir = prod_dir / f".next.backup.{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}"
-            prod_next = prod_dir / ".next"
             if prod_next.exists():
                 shutil.copytree(prod_next, backup_dir)
         
         # Remove existing .next in prod
-        prod_next = prod_dir / ".next"
         if prod_next.exists():
             shutil.rmtree(prod_next)
         
@@ -76,40 +163,31 @@ async def deploy_to_production(request: DeployGoLiveRequest) -> DeployGoLiveResp
                 shutil.copy2(dev_file, prod_file)
         
         # Copy public directory if it exists
-        dev_public = dev_dir / "public"
-        prod_public = prod_dir / "public"
         if dev_public.exists() and dev_public.is_dir():
             if prod_public.exists():
                 shutil.rmtree(prod_public)
             shutil.copytree(dev_public, prod_public)
         
         # Copy Prisma schema and run migrations on prod database
-        prisma_schema = dev_dir / "prisma" / "schema.prisma"
+        prisma_schema = dev_prisma / "schema.prisma"
         if prisma_schema.exists():
-            prod_prisma_dir = prod_dir / "prisma"
-            prod_prisma_dir.mkdir(exist_ok=True)
-            shutil.copy2(prisma_schema, prod_prisma_dir / "schema.prisma")
+            prod_prisma.mkdir(exist_ok=True)
+            shutil.copy2(prisma_schema, prod_prisma / "schema.prisma")
             
             # Copy migration files
-            dev_migrations = dev_dir / "prisma" / "migrations"
             if dev_migrations.exists():
-                prod_migrations = prod_dir / "prisma" / "migrations"
                 if prod_migrations.exists():
                     shutil.rmtree(prod_migrations)
                 shutil.copytree(dev_migrations, prod_migrations)
             
-            # Run prisma migrate deploy on production
-            migrate_result = subprocess.run(
-                ["npx", "prisma", "migrate", "deploy"],
-                cwd=str(prod_dir),
-                capture_output=True,
-                text=True,
-                timeout=120
-            )
-            
-            if migrate_result.returncode != 0:
-                # Log but don't fail - migrations might already be applied
-                print(f"Prisma migrate warning: {migrate_result.stderr}")
+            # Run prisma migrate deploy on production, unless the migrations
+            # and the database are the ones of the last successful deploy
+            deploy_state = _load_deploy_state(prod_dir)
+            migrations_hash = _migrations_fingerprint(dev_migrations, _prisma_database_url(prod_dir))
+            if deploy_state.get("migrations_hash") != migrations_hash:
+                if await _run_prisma_migrate_deploy(prod_dir):
+                    deploy_state["migrations_hash"] = migrations_hash
+                    _save_deploy_state(prod_dir, deploy_state)
         
         # Restart production PM2 process
         pm2_result = await restart_pm2_app(settings.PM2_PROD_APP)
@@ -2,12 +2,50 @@
 import aiosmtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import Optional
+from typing import Optional, Set, Coroutine, Any
 from config import settings
+import asyncio
 import os
 import socket
 
 
+# Notification tasks still in flight; holding a reference keeps them from being
+# garbage collected before they finish
+_pending_notifications: Set[asyncio.Task] = set()
+
+
+async def _send_logged(coro: Coroutine[Any, Any, bool], label: str) -> bool:
+    """Await a notification coroutine, logging instead of raising on failure"""
+    try:
+        return await coro
+    except Exception as e:
+        print(f"Failed to send {label} email: {e}")
+        return False
+
+
+def fire_notification(coro: Coroutine[Any, Any, bool], label: str = "notification") -> asyncio.Task:
+    """
+    Send a notification email in the background without blocking the caller
+    
+    Args:
+        coro: Coroutine returned by one of the send_*_email helpers
+        label: Short description used in the failure log line
+        
+    Returns:
+        The scheduled task
+    """
+    task = asyncio.create_task(_send_logged(coro, label))
+    _pending_notifications.add(task)
+    task.add_done_callback(_pending_notifications.discard)
+    return task
+
+
+async def drain_pending_notifications() -> None:
+    """Wait for in-flight notification emails (used on shutdown)"""
+    if _pending_notifications:
+        await asyncio.gather(*_pending_notifications, return_exceptions=True)
+
+
 async def get_smtp_config():
     """
     Load SMTP configuration from environment or site_settings
@@ -56,17 +94,17 @@ async def send_email(
     """
     smtp_config = await get_smtp_config()
     
-    # Create message
-    message = MIMEMultipart("alternative")
+    # Create message - only wrap in multipart when there is a text alternative
+    if text_body:
+        message = MIMEMultipart("alternative")
+        message.attach(MIMEText(text_body, "plain"))
+        message.attach(MIMEText(html_body, "html"))
+    else:
+        message = MIMEText(html_body, "html")
     message["From"] = f"{smtp_config['from_name']} <{smtp_config['from_email']}>"
     message["To"] = to
     message["Subject"] = subject
     
-    # Add text and HTML parts
-    if text_body:
-        message.attach(MIMEText(text_body, "plain"))
-    message.attach(MIMEText(html_body, "html"))
-    
     try:
         # Force IPv4 by ensuring we use 127.0.0.1 instead of localhost
         hostname = smtp_config["host"]
@@ -181,6 +219,8 @@ async def send_build_completed_email(build_id: str, success: bool, message: str,
 async def send_build_stalled_email(build_id: str, last_output: str) -> bool:
     """Send build stalled notification"""
     subject = f"Build Stalled - {build_id[:8]}"
+    # Last 20 whole lines, capped so a single runaway line can't bloat the mail
+    tail = "\n".join(last_output.splitlines()[-20:])[-2000:]
     html_body = f"""
     <html>
     <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
@@ -188,7 +228,7 @@ async def send_build_stalled_email(build_id: str, last_output: str) -> bool:
         <p><strong>Build ID:</strong> {build_id}</p>
         <p>The build appears to have stalled with no output for an extended period.</p>
         <p><strong>Last Output:</strong></p>
-        <pre style="background: #f3f4f6; padding: 12px; border-radius: 4px; overflow-x: auto;">{last_output[-500:]}</pre>
+        <pre style="background: #f3f4f6; padding: 12px; border-radius: 4px; overflow-x: auto;">{tail}</pre>
         <p>Please check the build logs at: https://build.dintrafikskolahlm.se</p>
     </body>
     </html>
@@ -1,16 +1,356 @@
 """Git commit tracking for test and dev environments"""
-import subprocess
-import json
+import asyncio
+import hashlib
+import os
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
-from datetime import datetime
-from typing import Dict, List, Optional
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+import aiofiles
+import orjson
+import pygit2
 from config import settings
 
 
-async def get_git_commit_info(directory: str) -> Dict:
+# Base argv for every git invocation: switch off config that only costs time
+# (signature checks, fsmonitor start-up, auto gc)
+GIT = [
+    "git",
+    "-c", "log.showSignature=false",
+    "-c", "core.fsmonitor=false",
+    "-c", "gc.auto=0",
+    "-c", "protocol.version=2",
+]
+
+# Timeouts scale with what the command does: network transfer or a plain
+# ref/config lookup
+FETCH_TIMEOUT_SECONDS = 600
+LOOKUP_TIMEOUT_SECONDS = 10
+
+GIT_STATUS_FILE = Path("/var/www/build/data/git-status.json")
+try:
+    GIT_STATUS_FILE.parent.mkdir(parents=True, exist_ok=True)
+except OSError:
+    pass
+
+# Digest of the last comparison written to GIT_STATUS_FILE (timestamp excluded)
+_last_status_digest: Optional[str] = None
+
+
+# pygit2 Repository objects must not be shared between threads, so every
+# thread keeps its own handle per directory
+_thread_repos = threading.local()
+
+
+def _open_repository(directory: str):
+    """Open (and cache, per thread) a pygit2 repository for a working directory"""
+    repos = getattr(_thread_repos, "repos", None)
+    if repos is None:
+        repos = _thread_repos.repos = {}
+    repo = repos.get(directory)
+    if repo is None:
+        repo = repos[directory] = pygit2.Repository(directory)
+    return repo
+
+
+def _format_git_date(timestamp: int, offset_minutes: int) -> str:
+    """Format a commit timestamp and UTC offset like git's %ai"""
+    tz = timezone(timedelta(minutes=offset_minutes))
+    return datetime.fromtimestamp(timestamp, tz).strftime("%Y-%m-%d %H:%M:%S %z")
+
+
+def format_relative_date(timestamp: int) -> str:
+    """Format a unix timestamp like git's %ar (e.g. '3 hours ago')"""
+    def plural(count: int, unit: str) -> str:
+        return f"{count} {unit}{'' if count == 1 else 's'}"
+    
+    diff = max(0, int(time.time()) - timestamp)
+    if diff < 90:
+        return f"{plural(diff, 'second')} ago"
+    minutes = (diff + 30) // 60
+    if minutes < 90:
+        return f"{plural(minutes, 'minute')} ago"
+    hours = (minutes + 30) // 60
+    if hours < 36:
+        return f"{plural(hours, 'hour')} ago"
+    days = (hours + 12) // 24
+    if days < 14:
+        return f"{plural(days, 'day')} ago"
+    if days < 70:
+        return f"{plural((days + 3) // 7, 'week')} ago"
+    if days < 365:
+        return f"{plural((days + 15) // 30, 'month')} ago"
+    if days < 1825:
+        years = days // 365
+        months = (days % 365 + 15) // 30
+        if months:
+            return f"{plural(years, 'year')}, {plural(months, 'month')} ago"
+        return f"{plural(years, 'year')} ago"
+    return f"{plural((days + 183) // 365, 'year')} ago"
+
+
+def commit_subject(commit) -> str:
+    """First line of a pygit2 commit message (git's %s)"""
+    return commit.message.split("\n", 1)[0].strip()
+
+
+# pygit2 reads block; run them on a small dedicated pool so a burst of
+# requests can't spawn unbounded threads or stall the event loop
+_git_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="git-read")
+
+
+async def _run_blocking(func: Callable[..., Any], *args: Any) -> Any:
+    """Run a blocking repository read on the git thread pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_git_executor, partial(func, *args))
+
+
+async def _exec_git(
+    args: List[str],
+    cwd: Path,
+    timeout: float,
+    capture: bool = True
+) -> Tuple[int, bytes, bytes]:
+    """
+    Run a git command without blocking the event loop
+    
+    git runs in its own session so that on timeout or cancellation the whole
+    process group (including helpers such as remote-https) is killed, not just
+    git itself.
+    
+    Args:
+        args: Arguments after `git`
+        cwd: Repository directory
+        timeout: Seconds before the process group is killed
+        capture: Collect stdout; when False it goes to /dev/null
+        
+    Returns:
+        Tuple of (returncode, stdout, stderr) as bytes
+    """
+    process = await asyncio.create_subprocess_exec(
+        *GIT, *args,
+        cwd=str(cwd),
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE if capture else asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE,
+        start_new_session=True
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=timeout)
+    except (asyncio.TimeoutError, asyncio.CancelledError):
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        await process.wait()
+        raise
+    return process.returncode, stdout or b"", stderr
+
+
+async def _git(
+    args: List[str],
+    cwd: Path,
+    timeout: float = LOOKUP_TIMEOUT_SECONDS,
+    capture: bool = True,
+    raw: bool = False
+) -> Optional[Union[str, bytes]]:
+    """
+    Run a git command and return its output
+    
+    Only used for network operations (fetch, clone) and config lookups;
+    repository reads go through pygit2.
+    
+    Args:
+        args: Arguments after `git`
+        cwd: Repository directory
+        timeout: Seconds before the process group is killed
+        capture: Collect stdout; when False it goes to /dev/null
+        raw: Return stdout as bytes instead of decoding it as UTF-8
+        
+    Returns:
+        stdout with trailing newlines stripped ("" when not captured), or
+        None if git exited non-zero
+    """
+    returncode, stdout, _ = await _exec_git(args, cwd, timeout, capture)
+    if returncode != 0:
+        return None
+    if not capture:
+        return ""
+    stdout = stdout.rstrip(b"\n")
+    return stdout if raw else stdout.decode("utf-8", errors="replace")
+
+
+def _cache_key(dir_path: Path) -> str:
+    """Key per-repository caches by resolved path so aliases share entries"""
+    return str(dir_path.resolve())
+
+
+# Per-directory fetch serialization and the last fetch per directory:
+# (monotonic time it finished, returncode, stderr)
+_fetch_locks: Dict[str, asyncio.Lock] = {}
+_last_fetch: Dict[str, Tuple[float, int, str]] = {}
+
+
+async def _fetch_origin(
+    dir_path: Path,
+    from_dir: Optional[Path] = None,
+    timeout: float = FETCH_TIMEOUT_SECONDS
+) -> Tuple[int, str]:
+    """
+    Fetch from origin; network I/O always goes through the git CLI
+    
+    This is the one fetch path for the dashboard, the pull endpoints and the
+    background status fetch. Concurrent callers for the same directory share
+    one fetch: anyone who queued up behind a fetch that finished after they
+    asked reuses its result.
+    
+    Args:
+        dir_path: Repository to update
+        from_dir: Local clone of the same origin that was just fetched. Its
+            origin/* refs are copied over the filesystem instead of going back
+            to the network.
+        timeout: Seconds before the fetch is killed
+    
+    Returns:
+        Tuple of (returncode, stderr)
+    """
+    if from_dir is not None:
+        fetch_args = [str(from_dir), "+refs/remotes/origin/*:refs/remotes/origin/*"]
+    else:
+        fetch_args = ["origin"]
+    return await _fetch_deduplicated(dir_path, fetch_args, timeout)
+
+
+async def _fetch_deduplicated(
+    dir_path: Path,
+    fetch_args: List[str],
+    timeout: float = FETCH_TIMEOUT_SECONDS
+) -> Tuple[int, str]:
+    """
+    Run `git fetch` once per directory for all callers queued behind it
+    
+    timeout covers the whole call: time spent queued behind another caller's
+    (possibly much longer) fetch counts against it. Running out while queued
+    returns a non-zero result instead of waiting on.
+    """
+    key = _cache_key(dir_path)
+    requested_at = time.monotonic()
+    lock = _fetch_locks.setdefault(key, asyncio.Lock())
+    try:
+        await asyncio.wait_for(lock.acquire(), timeout)
+    except asyncio.TimeoutError:
+        return 1, f"Timed out after {timeout:g}s waiting for another fetch in {dir_path}"
+    try:
+        last = _last_fetch.get(key)
+        if last is not None and last[0] >= requested_at:
+            return last[1], last[2]
+        remaining = timeout - (time.monotonic() - requested_at)
+        if remaining <= 0:
+            return 1, f"Timed out after {timeout:g}s waiting for another fetch in {dir_path}"
+        # Progress output is never read, so don't pipe it at all
+        returncode, _, stderr = await _exec_git(
+            ["fetch", "--quiet", "--no-tags", "--no-write-fetch-head", *fetch_args],
+            dir_path,
+            remaining,
+            capture=False
+        )
+        stderr = stderr.decode("utf-8", errors="replace")
+        _last_fetch[key] = (time.monotonic(), returncode, stderr)
+        _info_cache.pop(key, None)
+        return returncode, stderr
+    finally:
+        lock.release()
+
+
+# In-flight lookups: (directory, operation) -> task shared by concurrent callers
+_inflight: Dict[tuple, asyncio.Task] = {}
+
+
+async def _run_once(key: tuple, coro_factory: Callable[[], Any]) -> Any:
+    """
+    Coalesce identical concurrent lookups into a single run
+    
+    The first caller starts the work; anyone arriving while it is still
+    running awaits the same task. Cancelling one waiter doesn't cancel the
+    shared work.
+    """
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(coro_factory())
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    return await asyncio.shield(task)
+
+
+# Commit info cache: resolved directory -> (cached at, repository state key, info)
+INFO_CACHE_TTL_SECONDS = 5
+_info_cache: Dict[str, Tuple[float, tuple, Dict]] = {}
+
+
+def _repo_state_key(dir_path: Path) -> Optional[tuple]:
+    """
+    Cheap fingerprint of HEAD, the branch it points at and the index
+    
+    Returns None when the layout isn't a plain .git directory (e.g. worktrees),
+    in which case the result is not cached.
+    """
+    git_dir = dir_path / ".git"
+    try:
+        head_path = git_dir / "HEAD"
+        head_stat = head_path.stat()
+        key = [head_stat.st_mtime_ns, head_stat.st_size]
+        with open(head_path, "r") as f:
+            head = f.read().strip()
+        paths = [git_dir / "index", git_dir / "packed-refs"]
+        if head.startswith("ref: "):
+            paths.append(git_dir / head[5:])
+        for path in paths:
+            try:
+                stat = path.stat()
+                key.extend((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                key.extend((0, 0))
+        return tuple(key)
+    except OSError:
+        return None
+
+
+def _read_commit_info_pygit2(directory: str, result: Dict, include_status: bool = True) -> None:
+    """Fill commit info in-process from the repository's object database"""
+    repo = _open_repository(directory)
+    
+    if not repo.head_is_unborn:
+        commit = repo[repo.head.target]
+        result["current_commit"] = str(commit.id)
+        result["current_commit_short"] = result["current_commit"][:8]
+        result["branch"] = "HEAD" if repo.head_is_detached else repo.head.shorthand
+        result["commit_message"] = commit.message.strip()
+        result["commit_author"] = commit.author.name
+        result["commit_date"] = _format_git_date(commit.author.time, commit.author.offset)
+    
+    if include_status:
+        result["is_clean"] = not repo.status(untracked_files="no")
+    
+    try:
+        result["remote_url"] = repo.remotes["origin"].url
+    except KeyError:
+        pass
+
+
+async def get_git_commit_info(directory: str, include_status: bool = True) -> Dict:
     """
     Get detailed git commit information for a directory
     
+    Args:
+        directory: Repository working directory
+        include_status: Check the working tree for changes to tracked files.
+            This is the expensive part on large trees; when False, is_clean
+            is None.
+    
     Returns:
     - current_commit: Current commit hash
     - current_commit_short: Short commit hash
@@ -20,6 +360,10 @@ async def get_git_commit_info(directory: str) -> Dict:
     - commit_date: Commit date
     - is_clean: Working directory clean
     - remote_url: Remote repository URL
+    
+    Results are reused for a few seconds as long as HEAD, the current branch
+    ref and the index are unchanged on disk (a result without status is only
+    reused by callers that don't ask for it).
     """
     dir_path = Path(directory)
     
@@ -29,108 +373,115 @@ async def get_git_commit_info(directory: str) -> Dict:
             "directory": directory
         }
     
+    cache_key = _cache_key(dir_path)
+    state_key = _repo_state_key(dir_path)
+    cached = _info_cache.get(cache_key)
+    if (
+        cached is not None
+        and state_key is not None
+        and cached[1] == state_key
+        and time.monotonic() - cached[0] < INFO_CACHE_TTL_SECONDS
+        and (not include_status or cached[2]["is_clean"] is not None)
+    ):
+        return dict(cached[2], directory=directory)
+    
+    result = await _run_once(
+        (cache_key, "info", include_status),
+        lambda: _load_commit_info(cache_key, dir_path, state_key, include_status)
+    )
+    return dict(result, directory=directory)
+
+
+async def _load_commit_info(
+    cache_key: str,
+    dir_path: Path,
+    state_key: Optional[tuple],
+    include_status: bool
+) -> Dict:
+    """Read commit info for get_git_commit_info and cache it on success"""
     result = {
-        "directory": directory,
+        "directory": str(dir_path),
         "current_commit": None,
         "current_commit_short": None,
         "branch": None,
         "commit_message": None,
         "commit_author": None,
         "commit_date": None,
-        "is_clean": False,
+        "is_clean": False if include_status else None,
         "remote_url": None,
         "error": None
     }
     
     try:
-        # Get current commit hash
-        commit_result = subprocess.run(
-            ["git", "rev-parse", "HEAD"],
-            cwd=str(dir_path),
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        if commit_result.returncode == 0:
-            result["current_commit"] = commit_result.stdout.strip()
-            result["current_commit_short"] = result["current_commit"][:8]
-        
-        # Get current branch
-        branch_result = subprocess.run(
-            ["git", "rev-parse", "--abbrev-ref", "HEAD"],
-            cwd=str(dir_path),
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        if branch_result.returncode == 0:
-            result["branch"] = branch_result.stdout.strip()
-        
-        # Get commit message
-        message_result = subprocess.run(
-            ["git", "log", "-1", "--pretty=%B"],
-            cwd=str(dir_path),
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        if message_result.returncode == 0:
-            result["commit_message"] = message_result.stdout.strip()
-        
-        # Get commit author
-        author_result = subprocess.run(
-            ["git", "log", "-1", "--pretty=%an"],
-            cwd=str(dir_path),
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        if author_result.returncode == 0:
-            result["commit_author"] = author_result.stdout.strip()
-        
-        # Get commit date
-        date_result = subprocess.run(
-            ["git", "log", "-1", "--pretty=%ai"],
-            cwd=str(dir_path),
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        if date_result.returncode == 0:
-            result["commit_date"] = date_result.stdout.strip()
-        
-        # Check if working directory is clean
-        status_result = subprocess.run(
-            ["git", "status", "--porcelain"],
-            cwd=str(dir_path),
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        if status_result.returncode == 0:
-            result["is_clean"] = not bool(status_result.stdout.strip())
-        
-        # Get remote URL
-        remote_result = subprocess.run(
-            ["git", "config", "--get", "remote.origin.url"],
-            cwd=str(dir_path),
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        if remote_result.returncode == 0:
-            result["remote_url"] = remote_result.stdout.strip()
-        
+        await _run_blocking(_read_commit_info_pygit2, str(dir_path), result, include_status)
     except Exception as e:
         result["error"] = str(e)
     
+    if state_key is not None and result["error"] is None:
+        _info_cache[cache_key] = (time.monotonic(), state_key, dict(result))
+    
     return result
 
 
-async def compare_with_remote(directory: str, branch: str = None) -> Dict:
+def _compare_pygit2(directory: str, branch: str, result: Dict, list_commits: bool = True) -> None:
+    """Count and list ahead/behind commits in-process"""
+    repo = _open_repository(directory)
+    remote_ref = repo.references.get(f"refs/remotes/origin/{branch}")
+    if remote_ref is None or repo.head_is_unborn:
+        return
+    
+    local_oid = repo.head.target
+    remote_oid = remote_ref.target
+    ahead, behind = repo.ahead_behind(local_oid, remote_oid)
+    result["ahead"] = ahead
+    result["behind"] = behind
+    result["up_to_date"] = ahead == 0 and behind == 0
+    
+    for key, start, hide, count in (
+        ("commits_ahead", local_oid, remote_oid, ahead),
+        ("commits_behind", remote_oid, local_oid, behind),
+    ):
+        if count == 0 or not list_commits:
+            continue
+        walker = repo.walk(start, pygit2.GIT_SORT_TIME)
+        walker.hide(hide)
+        for commit in walker:
+            # Match `git log --no-merges`
+            if len(commit.parent_ids) > 1:
+                continue
+            result[key].append({
+                "hash": str(commit.id)[:7],
+                "message": commit_subject(commit),
+                "author": commit.author.name,
+                "date": format_relative_date(commit.author.time)
+            })
+
+
+def _current_branch_pygit2(directory: str) -> str:
+    repo = _open_repository(directory)
+    return "HEAD" if repo.head_is_detached else repo.head.shorthand
+
+
+async def _current_branch(dir_path: Path) -> Optional[str]:
+    """Resolve the checked-out branch name ('HEAD' when detached)"""
+    return await _run_blocking(_current_branch_pygit2, str(dir_path))
+
+
+async def compare_with_remote(
+    directory: str,
+    branch: str = None,
+    fetch: bool = True,
+    list_commits: bool = True
+) -> Dict:
     """
     Compare local commits with remote
     
+    Args:
+        directory: Repository working directory
+        branch: Branch to compare; looked up from HEAD only when not given
+        fetch: Fetch origin first. Pass False when the caller already fetched.
+        list_commits: List the commits on each side, not just count them
+    
     Returns:
     - ahead: Number of commits ahead of remote
     - behind: Number of commits behind remote
@@ -150,109 +501,116 @@ async def compare_with_remote(directory: str, branch: str = None) -> Dict:
     
     try:
         # Fetch latest from remote
-        subprocess.run(
-            ["git", "fetch", "origin"],
-            cwd=str(dir_path),
-            capture_output=True,
-            timeout=30
-        )
+        if fetch:
+            await _fetch_origin(dir_path)
         
-        # Get current branch if not specified
+        # Callers such as get_environment_comparison already know the branch
+        # from get_git_commit_info; only resolve it when they don't
         if not branch:
-            branch_result = subprocess.run(
-                ["git", "rev-parse", "--abbrev-ref", "HEAD"],
-                cwd=str(dir_path),
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            if branch_result.returncode == 0:
-                branch = branch_result.stdout.strip()
+            branch = await _current_branch(dir_path)
         
         if not branch:
             result["error"] = "Could not determine branch"
             return result
         
-        # Get ahead/behind count
-        count_result = subprocess.run(
-            ["git", "rev-list", "--left-right", "--count", f"HEAD...origin/{branch}"],
-            cwd=str(dir_path),
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        
-        if count_result.returncode == 0:
-            parts = count_result.stdout.strip().split()
-            if len(parts) == 2:
-                result["ahead"] = int(parts[0])
-                result["behind"] = int(parts[1])
-                result["up_to_date"] = result["ahead"] == 0 and result["behind"] == 0
-        
-        # Get commits ahead
-        if result["ahead"] > 0:
-            ahead_result = subprocess.run(
-                ["git", "log", f"origin/{branch}..HEAD", "--pretty=%h|%s|%an|%ar", "--no-merges"],
-                cwd=str(dir_path),
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            if ahead_result.returncode == 0:
-                for line in ahead_result.stdout.strip().split('\n'):
-                    if line:
-                        parts = line.split('|')
-                        if len(parts) >= 4:
-                            result["commits_ahead"].append({
-                                "hash": parts[0],
-                                "message": parts[1],
-                                "author": parts[2],
-                                "date": parts[3]
-                            })
-        
-        # Get commits behind
-        if result["behind"] > 0:
-            behind_result = subprocess.run(
-                ["git", "log", f"HEAD..origin/{branch}", "--pretty=%h|%s|%an|%ar", "--no-merges"],
-                cwd=str(dir_path),
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            if behind_result.returncode == 0:
-                for line in behind_result.stdout.strip().split('\n'):
-                    if line:
-                        parts = line.split('|')
-                        if len(parts) >= 4:
-                            result["commits_behind"].append({
-                                "hash": parts[0],
-                                "message": parts[1],
-                                "author": parts[2],
-                                "date": parts[3]
-                            })
+        await _run_blocking(_compare_pygit2, str(dir_path), branch, result, list_commits)
     
+    except asyncio.TimeoutError:
+        result["error"] = "git timed out"
     except Exception as e:
         result["error"] = str(e)
     
     return result
 
 
-async def get_environment_comparison() -> Dict:
+async def _write_status_file(result: Dict) -> None:
+    """
+    Write the comparison to GIT_STATUS_FILE without blocking the event loop
+    
+    The file is written to a temp path and renamed into place so readers never
+    see a partial file. The write is skipped when nothing but the timestamp
+    changed since the last one.
+    """
+    global _last_status_digest
+    
+    digest = hashlib.blake2b(
+        orjson.dumps({k: v for k, v in result.items() if k != "timestamp"}, option=orjson.OPT_SORT_KEYS),
+        digest_size=16
+    ).hexdigest()
+    if digest == _last_status_digest and GIT_STATUS_FILE.exists():
+        return
+    
+    tmp_file = GIT_STATUS_FILE.with_suffix(".json.tmp")
+    async with aiofiles.open(tmp_file, "wb") as f:
+        await f.write(orjson.dumps(result))
+        await f.flush()
+    os.replace(tmp_file, GIT_STATUS_FILE)
+    _last_status_digest = digest
+
+
+def _retrieve_exception(task: asyncio.Task) -> None:
+    """Done callback for background tasks nobody awaits to the end"""
+    if not task.cancelled():
+        task.exception()
+
+
+async def get_environment_comparison(total_budget_s: float = 120) -> Dict:
     """
     Compare dev and prod environments with remote
     
+    Args:
+        total_budget_s: Overall time budget. A fetch still running when it
+            runs out continues in the background and the comparison uses the
+            refs already on disk; listing the ahead/behind commits is skipped
+            once it is exhausted. Either way "partial" is set in the result.
+    
     Returns comprehensive comparison data
     """
+    deadline = time.monotonic() + total_budget_s
+    partial = False
+    fetch_error = None
     dev_dir = settings.DEV_DIR
     prod_dir = settings.PROD_DIR
     
     # Get commit info for both environments
-    dev_info = await get_git_commit_info(dev_dir)
-    prod_info = await get_git_commit_info(prod_dir)
+    dev_info, prod_info = await asyncio.gather(
+        get_git_commit_info(dev_dir),
+        # The dashboard only shows working tree state for dev
+        get_git_commit_info(prod_dir, include_status=False)
+    )
+    
+    # When both checkouts track the same remote only dev goes to the network;
+    # prod then picks up dev's freshly fetched origin/* refs locally
+    shared_remote = (
+        dev_dir != prod_dir
+        and dev_info.get("remote_url")
+        and dev_info.get("remote_url") == prod_info.get("remote_url")
+    )
+    async def fetch_both() -> None:
+        if shared_remote:
+            await _fetch_origin(Path(dev_dir))
+            await _fetch_origin(Path(prod_dir), from_dir=Path(dev_dir))
+        else:
+            await asyncio.gather(_fetch_origin(Path(dev_dir)), _fetch_origin(Path(prod_dir)))
+    
+    fetch_task = asyncio.ensure_future(fetch_both())
+    fetch_task.add_done_callback(_retrieve_exception)
+    try:
+        await asyncio.wait_for(asyncio.shield(fetch_task), timeout=max(deadline - time.monotonic(), 0))
+    except asyncio.TimeoutError:
+        partial = True
+    except Exception as e:
+        fetch_error = str(e)
+    
+    list_commits = time.monotonic() < deadline
+    if not list_commits:
+        partial = True
     
     # Compare with remote
-    dev_comparison = await compare_with_remote(dev_dir, dev_info.get("branch"))
-    prod_comparison = await compare_with_remote(prod_dir, prod_info.get("branch"))
+    dev_comparison, prod_comparison = await asyncio.gather(
+        compare_with_remote(dev_dir, dev_info.get("branch"), fetch=False, list_commits=list_commits),
+        compare_with_remote(prod_dir, prod_info.get("branch"), fetch=False, list_commits=list_commits)
+    )
     
     # Determine sync status
     dev_status = "up-to-date" if dev_comparison.get("up_to_date") else \
@@ -267,7 +625,7 @@ async def get_environment_comparison() -> Dict:
     same_commit = dev_info.get("current_commit") == prod_info.get("current_commit")
     
     result = {
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
         "dev": {
             "info": dev_info,
             "comparison": dev_comparison,
@@ -279,8 +637,11 @@ async def get_environment_comparison() -> Dict:
             "status": prod_status
         },
         "same_commit": same_commit,
+        "partial": partial,
         "recommendations": []
     }
+    if fetch_error is not None:
+        result["fetch_error"] = fetch_error
     
     # Generate recommendations
     if dev_comparison.get("behind", 0) > 0:
@@ -321,19 +682,89 @@ async def get_environment_comparison() -> Dict:
     
     # Save to JSON file
     try:
-        status_file = Path("/var/www/build/data/git-status.json")
-        status_file.parent.mkdir(parents=True, exist_ok=True)
-        with open(status_file, "w") as f:
-            json.dump(result, f, indent=2)
+        await _write_status_file(result)
     except Exception as e:
         result["save_error"] = str(e)
     
     return result
 
 
+def _timeline_pygit2(directory: str, limit: int = 20) -> List[Dict]:
+    """Recent non-merge commits on origin/V25, read in-process"""
+    repo = _open_repository(directory)
+    remote_ref = repo.references.get("refs/remotes/origin/V25")
+    if remote_ref is None:
+        return []
+    
+    timeline = []
+    for commit in repo.walk(remote_ref.target, pygit2.GIT_SORT_TIME):
+        if len(commit.parent_ids) > 1:
+            continue
+        commit_hash = str(commit.id)
+        timeline.append({
+            "hash": commit_hash,
+            "hash_short": commit_hash[:7],
+            "message": commit_subject(commit),
+            "author": commit.author.name,
+            "author_email": commit.author.email,
+            "date": _format_git_date(commit.author.time, commit.author.offset),
+            "date_relative": format_relative_date(commit.author.time)
+        })
+        if len(timeline) >= limit:
+            break
+    return timeline
+
+
+# Commits kept in the timeline mirror; the timeline only ever shows 20
+TIMELINE_MIRROR_DEPTH = 50
+
+
+async def _update_timeline_mirror(dev_dir: Path) -> Optional[Path]:
+    """
+    Create or refresh the bare timeline mirror configured in TIMELINE_MIRROR
+    
+    The mirror is a blobless, shallow, single-branch bare clone of the dev
+    origin, so refreshing it transfers only V25 commits and trees.
+    
+    Returns:
+        Path of the mirror, or None if it is not configured or can't be cloned
+    """
+    if not settings.TIMELINE_MIRROR:
+        return None
+    mirror = Path(settings.TIMELINE_MIRROR)
+    
+    if not (mirror / "HEAD").exists():
+        remote_url = await _git(["config", "--get", "remote.origin.url"], dev_dir)
+        if not remote_url:
+            return None
+        mirror.parent.mkdir(parents=True, exist_ok=True)
+        cloned = await _git(
+            [
+                "clone", "--quiet", "--bare", "--filter=blob:none",
+                "--single-branch", "--branch", "V25",
+                f"--depth={TIMELINE_MIRROR_DEPTH}",
+                remote_url, str(mirror)
+            ],
+            mirror.parent,
+            timeout=FETCH_TIMEOUT_SECONDS,
+            capture=False
+        )
+        if cloned is None:
+            return None
+    
+    await _fetch_deduplicated(
+        mirror,
+        [f"--depth={TIMELINE_MIRROR_DEPTH}", "origin", "+refs/heads/V25:refs/remotes/origin/V25"]
+    )
+    return mirror
+
+
 async def get_commit_timeline() -> List[Dict]:
     """
     Get a timeline of recent commits from remote
+    
+    Reads from the TIMELINE_MIRROR bare clone when configured, otherwise from
+    the dev worktree.
     """
     dev_dir = Path(settings.DEV_DIR)
     
@@ -341,37 +772,15 @@ async def get_commit_timeline() -> List[Dict]:
     
     try:
         # Fetch latest
-        subprocess.run(
-            ["git", "fetch", "origin"],
-            cwd=str(dev_dir),
-            capture_output=True,
-            timeout=30
-        )
-        
-        # Get recent commits from remote
-        result = subprocess.run(
-            ["git", "log", "origin/V25", "--pretty=%H|%h|%s|%an|%ae|%ai|%ar", "-20", "--no-merges"],
-            cwd=str(dev_dir),
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
+        repo_dir = await _update_timeline_mirror(dev_dir)
+        if repo_dir is None:
+            repo_dir = dev_dir
+            await _fetch_origin(dev_dir)
         
-        if result.returncode == 0:
-            for line in result.stdout.strip().split('\n'):
-                if line:
-                    parts = line.split('|')
-                    if len(parts) >= 7:
-                        timeline.append({
-                            "hash": parts[0],
-                            "hash_short": parts[1],
-                            "message": parts[2],
-                            "author": parts[3],
-                            "author_email": parts[4],
-                            "date": parts[5],
-                            "date_relative": parts[6]
-                        })
+        timeline = await _run_blocking(_timeline_pygit2, str(repo_dir))
     
+    except asyncio.TimeoutError:
+        return [{"error": "git timed out"}]
     except Exception as e:
         return [{"error": str(e)}]
     
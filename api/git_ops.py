@@ -1,135 +1,412 @@
 """Git operations for pulling and managing repository state"""
+import asyncio
 import subprocess
 import os
-from typing import List, Optional, Dict
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, List, Optional, Dict, Tuple
+import pygit2
 from config import settings
+from git_commit_tracker import _fetch_origin, _open_repository, _run_blocking
 from models import GitPullRequest, GitPullResponse
 
 
-def get_available_branches(working_dir: str) -> Dict[str, List[str]]:
-    """Get list of available local and remote branches"""
+def _text(data: bytes) -> str:
+    """Decode captured git output, keeping undecodable bytes visible"""
+    return data.decode("utf-8", errors="replace")
+
+
+async def _run_git(args: List[str], cwd: str, timeout: float) -> Tuple[int, str, str]:
+    """
+    Run a git command without blocking the event loop
+    
+    Args:
+        args: Arguments after `git`
+        cwd: Repository directory
+        timeout: Seconds before git is killed
+        
+    Returns:
+        Tuple of (returncode, stdout, stderr)
+        
+    Raises:
+        asyncio.TimeoutError: If git didn't finish in time
+    """
+    process = await asyncio.create_subprocess_exec(
+        "git", *args,
+        cwd=cwd,
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
     try:
-        # Get current branch
-        current_result = subprocess.run(
-            ["git", "rev-parse", "--abbrev-ref", "HEAD"],
-            cwd=working_dir,
-            capture_output=True,
-            text=True,
-            timeout=10
-        )
-        current_branch = current_result.stdout.strip() if current_result.returncode == 0 else None
+        stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=timeout)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        raise
+    return process.returncode, _text(stdout), _text(stderr)
+
+
+async def _run_git_streaming(
+    args: List[str],
+    cwd: str,
+    timeout: float,
+    on_line: Optional[Callable[[str], None]] = None
+) -> Tuple[int, str, str]:
+    """
+    Run a git command, handing each output line to on_line as it arrives
+    
+    Used for merge/rebase so callers can react to lines such as CONFLICT
+    while git is still running rather than scanning the captured output
+    afterwards. Both pipes are drained to the end so git never blocks on a
+    full pipe.
+    
+    Args:
+        args: Arguments after `git`
+        cwd: Repository directory
+        timeout: Seconds before git is killed
+        on_line: Called with each stdout/stderr line (without the newline)
         
-        # Get all branches
-        branches_result = subprocess.run(
-            ["git", "branch", "-a"],
-            cwd=working_dir,
-            capture_output=True,
-            text=True,
-            timeout=10
+    Returns:
+        Tuple of (returncode, stdout, stderr)
+        
+    Raises:
+        asyncio.TimeoutError: If git didn't finish in time
+    """
+    process = await asyncio.create_subprocess_exec(
+        "git", *args,
+        cwd=cwd,
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+    stdout_lines: List[str] = []
+    stderr_lines: List[str] = []
+    
+    async def drain(stream: asyncio.StreamReader, lines: List[str]) -> None:
+        async for raw_line in stream:
+            line = _text(raw_line)
+            lines.append(line)
+            if on_line is not None:
+                on_line(line.rstrip("\n"))
+    
+    try:
+        await asyncio.wait_for(
+            asyncio.gather(
+                drain(process.stdout, stdout_lines),
+                drain(process.stderr, stderr_lines),
+                process.wait()
+            ),
+            timeout=timeout
         )
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        raise
+    return process.returncode, "".join(stdout_lines), "".join(stderr_lines)
+
+
+def _head_commit(working_dir: str) -> Optional[str]:
+    """
+    Commit HEAD points at, read in-process through pygit2
+    
+    Returns:
+        Full commit hash, or None for an unborn branch or a directory that
+        isn't a repository
+    """
+    try:
+        repo = _open_repository(working_dir)
+    except pygit2.GitError:
+        return None
+    if repo.head_is_unborn:
+        return None
+    return str(repo.head.target)
+
+
+def _has_diverged(working_dir: str, branch: str) -> bool:
+    """Whether HEAD and origin/<branch> each have commits the other lacks"""
+    repo = _open_repository(working_dir)
+    remote_ref = repo.references.get(f"refs/remotes/origin/{branch}")
+    if remote_ref is None or repo.head_is_unborn:
+        return False
+    ahead, behind = repo.ahead_behind(repo.head.target, remote_ref.resolve().target)
+    return ahead > 0 and behind > 0
+
+
+# Seconds a pull or preview waits for its fetch of origin
+FETCH_TIMEOUT_SECONDS = 30
+
+
+# Current branch per working directory: working_dir -> (branch, cached at)
+BRANCH_CACHE_TTL_SECONDS = 30
+_branch_cache: Dict[str, Tuple[str, float]] = {}
+
+
+def _remember_branch(working_dir: str, branch: Optional[str]) -> None:
+    """Record a freshly resolved current branch"""
+    if branch:
+        _branch_cache[working_dir] = (branch, time.monotonic())
+
+
+def _forget_branch(working_dir: str) -> None:
+    """Drop the cached branch after an operation that may have moved HEAD"""
+    _branch_cache.pop(working_dir, None)
+
+
+async def _get_current_branch(working_dir: str) -> Optional[str]:
+    """Current branch of working_dir, reusing a lookup from the last 30 seconds"""
+    cached = _branch_cache.get(working_dir)
+    if cached is not None and time.monotonic() - cached[1] < BRANCH_CACHE_TTL_SECONDS:
+        return cached[0]
+    
+    returncode, stdout, _ = await _run_git(["rev-parse", "--abbrev-ref", "HEAD"], working_dir, timeout=10)
+    if returncode != 0:
+        return None
+    branch = stdout.strip()
+    _remember_branch(working_dir, branch)
+    return branch
+
+
+# Branch lists per working directory, valid while the ref mtimes match:
+# working_dir -> (ref mtimes, (local branches, remote branches))
+BRANCH_LIST_CACHE_SIZE = 32
+_branch_list_cache: "OrderedDict[str, Tuple[Tuple[int, int], Tuple[List[str], List[str]]]]" = OrderedDict()
+
+
+def _refs_signature(working_dir: str) -> Optional[Tuple[int, int]]:
+    """
+    Modification times that change whenever a branch is created, moved or deleted
+    
+    Loose refs are replaced by renaming a lock file into place, which bumps
+    the mtime of the directory holding them; packed refs live in one file.
+    
+    Returns:
+        Tuple of (packed-refs mtime, newest branch directory mtime) in
+        nanoseconds, or None if working_dir has no .git directory
+    """
+    git_dir = os.path.join(working_dir, ".git")
+    if not os.path.isdir(git_dir):
+        return None
+    try:
+        packed_mtime = os.stat(os.path.join(git_dir, "packed-refs")).st_mtime_ns
+    except FileNotFoundError:
+        packed_mtime = 0
+    refs_mtime = 0
+    for top in ("refs/heads", "refs/remotes/origin"):
+        for root, _, _ in os.walk(os.path.join(git_dir, top)):
+            refs_mtime = max(refs_mtime, os.stat(root).st_mtime_ns)
+    return packed_mtime, refs_mtime
+
+
+async def get_available_branches(working_dir: str) -> Dict[str, List[str]]:
+    """Get list of available local and remote branches"""
+    try:
+        signature = _refs_signature(working_dir)
+        cached = _branch_list_cache.get(working_dir)
+        if signature is not None and cached is not None and cached[0] == signature:
+            _branch_list_cache.move_to_end(working_dir)
+            local_branches, remote_branches = cached[1]
+            return {
+                "current": await _get_current_branch(working_dir),
+                "local": list(local_branches),
+                "remote": list(remote_branches)
+            }
         
-        if branches_result.returncode != 0:
+        # Current branch and all branches are independent queries
+        current_branch, (branches_code, branches_stdout, _) = await asyncio.gather(
+            _get_current_branch(working_dir),
+            _run_git(
+                ["for-each-ref", "--sort=refname", "--format=%(refname)", "refs/heads/", "refs/remotes/origin/"],
+                working_dir,
+                timeout=10
+            )
+        )
+        if branches_code != 0:
             return {"current": current_branch, "local": [], "remote": []}
         
         local_branches = []
         remote_branches = []
         
-        for line in branches_result.stdout.split("\n"):
-            line = line.strip()
-            if not line:
-                continue
-            
-            # Remove * indicator for current branch
-            line = line.lstrip("* ")
-            
-            if line.startswith("remotes/origin/"):
-                # Extract remote branch name
-                branch_name = line.replace("remotes/origin/", "")
-                if branch_name != "HEAD" and "->" not in branch_name:
+        # One full ref name per line, e.g. refs/heads/main or
+        # refs/remotes/origin/main. Sorted by ref name, so each group comes
+        # out already in order and duplicates would be adjacent
+        for line in branches_stdout.split("\n"):
+            if line.startswith("refs/remotes/origin/"):
+                branch_name = line[len("refs/remotes/origin/"):]
+                # Skip the origin/HEAD symref
+                if branch_name != "HEAD" and (not remote_branches or remote_branches[-1] != branch_name):
                     remote_branches.append(branch_name)
-            elif not line.startswith("remotes/"):
-                local_branches.append(line)
+            elif line.startswith("refs/heads/"):
+                branch_name = line[len("refs/heads/"):]
+                if not local_branches or local_branches[-1] != branch_name:
+                    local_branches.append(branch_name)
+        
+        # Refs touched within the last couple of seconds could change again
+        # without a visible mtime change on coarse-timestamp filesystems
+        if signature is not None and time.time_ns() - max(signature) > 2_000_000_000:
+            _branch_list_cache[working_dir] = (signature, (local_branches, remote_branches))
+            _branch_list_cache.move_to_end(working_dir)
+            while len(_branch_list_cache) > BRANCH_LIST_CACHE_SIZE:
+                _branch_list_cache.popitem(last=False)
         
         return {
             "current": current_branch,
-            "local": sorted(set(local_branches)),
-            "remote": sorted(set(remote_branches))
+            "local": list(local_branches),
+            "remote": list(remote_branches)
         }
     except Exception as e:
         return {"current": None, "local": [], "remote": [], "error": str(e)}
 
 
-def check_git_status(working_dir: str) -> dict:
-    """Check git status and return information about changes"""
+# Number of space-separated fields before the path in each porcelain v2 entry
+_PORCELAIN_V2_PATH_FIELD = {"1": 8, "2": 9, "u": 10, "?": 1, "!": 1}
+
+
+def _parse_porcelain_v2(output: str) -> Tuple[Optional[str], List[str]]:
+    """
+    Parse `git status --porcelain=v2 --branch -z` output
+    
+    Entries use the short v1 form (e.g. "M src/app.ts", "?? new.txt") so
+    callers showing them to the user are unaffected by the v2 format.
+    
+    Returns:
+        Tuple of (current branch, "XY path" entries). The branch is "HEAD"
+        when detached, like `git rev-parse --abbrev-ref HEAD`.
+    """
+    branch = None
+    files = []
+    records = iter(output.split("\x00"))
+    for record in records:
+        if not record:
+            continue
+        if record[0] == "#":
+            if record.startswith("# branch.head "):
+                branch = record[len("# branch.head "):]
+                if branch == "(detached)":
+                    branch = "HEAD"
+            continue
+        kind = record[0]
+        fields = record.split(" ", _PORCELAIN_V2_PATH_FIELD.get(kind, 1))
+        path = fields[-1]
+        if kind in ("?", "!"):
+            files.append(f"{kind * 2} {path}")
+            continue
+        if kind == "2":
+            # Renames and copies are followed by the original path
+            next(records, None)
+        files.append(f"{fields[1].replace('.', ' ')} {path}".lstrip())
+    return branch, files
+
+
+async def check_git_status(working_dir: str) -> dict:
+    """
+    Check git status and return information about changes
+    
+    The current branch comes from the same status call, so callers don't
+    need a separate `git rev-parse --abbrev-ref HEAD`.
+    """
     try:
-        result = subprocess.run(
-            ["git", "status", "--porcelain"],
-            cwd=working_dir,
-            capture_output=True,
-            text=True,
+        # NUL-separated records, so paths with newlines or quotes parse as-is
+        returncode, stdout, _ = await _run_git(
+            ["status", "--porcelain=v2", "--branch", "-z"],
+            working_dir,
             timeout=10
         )
         
-        if result.returncode != 0:
-            return {"has_changes": False, "files": []}
+        if returncode != 0:
+            return {"has_changes": False, "files": [], "current_branch": None}
         
-        files = [line.strip() for line in result.stdout.strip().split("\n") if line.strip()]
+        current_branch, files = _parse_porcelain_v2(stdout)
+        _remember_branch(working_dir, current_branch)
         return {
             "has_changes": len(files) > 0,
-            "files": files
+            "files": files,
+            "current_branch": current_branch
         }
     except Exception as e:
         return {"has_changes": False, "error": str(e)}
 
 
-def stash_changes(working_dir: str) -> tuple[bool, str]:
+async def stash_changes(working_dir: str) -> tuple[bool, str]:
     """Stash local changes"""
     try:
-        result = subprocess.run(
-            ["git", "stash", "push", "-m", "Build Dashboard Auto-Stash"],
-            cwd=working_dir,
-            capture_output=True,
-            text=True,
+        returncode, _, stderr = await _run_git(
+            ["stash", "push", "-m", "Build Dashboard Auto-Stash"],
+            working_dir,
             timeout=10
         )
         
-        if result.returncode == 0:
+        if returncode == 0:
             return True, "Changes stashed successfully"
         else:
-            return False, result.stderr or "Failed to stash changes"
+            return False, stderr or "Failed to stash changes"
     except Exception as e:
         return False, str(e)
 
 
-def delete_changes(working_dir: str) -> tuple[bool, str]:
+async def delete_changes(working_dir: str) -> tuple[bool, str]:
     """Delete local changes (hard reset)"""
     try:
         # First, reset hard
-        result = subprocess.run(
-            ["git", "reset", "--hard", "HEAD"],
-            cwd=working_dir,
-            capture_output=True,
-            text=True,
-            timeout=10
-        )
+        returncode, _, stderr = await _run_git(["reset", "--hard", "HEAD"], working_dir, timeout=10)
         
-        if result.returncode != 0:
-            return False, result.stderr or "Failed to reset changes"
+        if returncode != 0:
+            return False, stderr or "Failed to reset changes"
         
         # Clean untracked files
-        subprocess.run(
-            ["git", "clean", "-fd"],
-            cwd=working_dir,
-            capture_output=True,
-            text=True,
-            timeout=10
-        )
+        await _run_git(["clean", "-fd"], working_dir, timeout=10)
         
         return True, "Local changes deleted successfully"
     except Exception as e:
         return False, str(e)
 
 
+async def _list_unmerged_paths(working_dir: str) -> List[str]:
+    """
+    List paths left unmerged by a failed merge or rebase
+    
+    Reads the index through `git ls-files --unmerged` rather than scanning
+    merge output for CONFLICT, so the answer doesn't depend on git's wording
+    or locale.
+    
+    Returns:
+        Conflicted paths in index order, each listed once
+    """
+    returncode, stdout, _ = await _run_git(["ls-files", "--unmerged", "-z"], working_dir, timeout=10)
+    if returncode != 0:
+        return []
+    paths: List[str] = []
+    # "<mode> <object> <stage>\t<path>" per record, one record per stage
+    for record in stdout.split("\x00"):
+        _, tab, path = record.partition("\t")
+        if tab and (not paths or paths[-1] != path):
+            paths.append(path)
+    return paths
+
+
+async def _rebase_onto(upstream: str, working_dir: str, timeout: float) -> Tuple[int, str, str, List[str]]:
+    """
+    Rebase the checkout onto upstream, aborting if that doesn't complete
+    
+    A failed or timed-out rebase is always aborted, so the checkout is never
+    left in the middle of one.
+    
+    Returns:
+        Tuple of (returncode, stdout, stderr, paths that conflicted)
+    """
+    try:
+        returncode, stdout, stderr = await _run_git_streaming(["rebase", upstream], working_dir, timeout=timeout)
+    except asyncio.TimeoutError:
+        await _run_git(["rebase", "--abort"], working_dir, timeout=10)
+        raise
+    conflicts: List[str] = []
+    if returncode != 0:
+        conflicts = await _list_unmerged_paths(working_dir)
+        await _run_git(["rebase", "--abort"], working_dir, timeout=10)
+    return returncode, stdout, stderr, conflicts
+
+
 async def pull_from_git(request: GitPullRequest) -> GitPullResponse:
     """
     Pull latest changes from git repository
@@ -149,12 +426,12 @@ async def pull_from_git(request: GitPullRequest) -> GitPullResponse:
         )
     
     # Check for local changes
-    status = check_git_status(working_dir)
+    status = await check_git_status(working_dir)
     
     if status.get("has_changes"):
         if request.force:
             # Delete changes
-            success, message = delete_changes(working_dir)
+            success, message = await delete_changes(working_dir)
             if not success:
                 return GitPullResponse(
                     success=False,
@@ -163,7 +440,7 @@ async def pull_from_git(request: GitPullRequest) -> GitPullResponse:
                 )
         elif request.stash_changes:
             # Stash changes
-            success, message = stash_changes(working_dir)
+            success, message = await stash_changes(working_dir)
             if not success:
                 return GitPullResponse(
                     success=False,
@@ -179,18 +456,12 @@ async def pull_from_git(request: GitPullRequest) -> GitPullResponse:
     
     # Fetch latest
     try:
-        fetch_result = subprocess.run(
-            ["git", "fetch", "origin"],
-            cwd=working_dir,
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
+        fetch_code, fetch_stderr = await _fetch_origin(Path(working_dir), timeout=FETCH_TIMEOUT_SECONDS)
         
-        if fetch_result.returncode != 0:
+        if fetch_code != 0:
             return GitPullResponse(
                 success=False,
-                message=f"Failed to fetch: {fetch_result.stderr}"
+                message=f"Failed to fetch: {fetch_stderr}"
             )
     except Exception as e:
         return GitPullResponse(
@@ -198,78 +469,73 @@ async def pull_from_git(request: GitPullRequest) -> GitPullResponse:
             message=f"Fetch error: {str(e)}"
         )
     
-    # Determine which branch to pull
-    if request.branch:
-        target_branch = request.branch
-    else:
-        # Get current branch if not specified
-        try:
-            branch_result = subprocess.run(
-                ["git", "rev-parse", "--abbrev-ref", "HEAD"],
-                cwd=working_dir,
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            target_branch = branch_result.stdout.strip() if branch_result.returncode == 0 else "main"
-        except Exception:
-            target_branch = "main"
+    # Determine which branch to pull; the status check already resolved the
+    # current one
+    target_branch = request.branch or status.get("current_branch") or "main"
     
-    # Pull changes
+    # Pull changes. origin was just fetched, so integrate the local
+    # origin/<branch> instead of letting `git pull` fetch a second time:
+    # fast-forward when possible, rebase onto it when both sides have commits
     try:
-        pull_result = subprocess.run(
-            ["git", "pull", "origin", target_branch],
-            cwd=working_dir,
-            capture_output=True,
-            text=True,
+        # HEAD before and after tells whether anything was pulled, whatever
+        # language git reports it in
+        before = await _run_blocking(_head_commit, working_dir)
+        pull_code, pull_stdout, pull_stderr = await _run_git(
+            ["merge", "--ff-only", f"origin/{target_branch}"],
+            working_dir,
             timeout=60
         )
-        
-        if pull_result.returncode != 0:
-            # Check for conflicts
-            if "CONFLICT" in pull_result.stdout or "conflict" in pull_result.stderr.lower():
+        # Any other fast-forward failure (e.g. local changes in the way) is
+        # reported as is; rebasing wouldn't get past it
+        if pull_code != 0 and await _run_blocking(_has_diverged, working_dir, target_branch):
+            pull_code, pull_stdout, pull_stderr, conflicts = await _rebase_onto(
+                f"origin/{target_branch}",
+                working_dir,
+                timeout=60
+            )
+            if conflicts:
                 return GitPullResponse(
                     success=False,
-                    message="Merge conflicts detected. Please resolve manually.",
-                    conflicts=[line for line in pull_result.stdout.split("\n") if "CONFLICT" in line]
+                    message="Merge conflicts detected; the rebase was aborted. Please resolve manually.",
+                    conflicts=conflicts
                 )
-            
+        
+        if pull_code != 0:
             return GitPullResponse(
                 success=False,
-                message=f"Pull failed: {pull_result.stderr or pull_result.stdout}"
+                message=f"Pull failed: {pull_stderr or pull_stdout}"
             )
         
+        if "Switched to branch" in pull_stdout:
+            _forget_branch(working_dir)
+        
         # Parse git output for changes
-        git_output = pull_result.stdout.strip()
+        git_output = pull_stdout.strip()
         changes_list = []
-        has_changes = False
         sql_migrations = []
         build_dashboard_changes = []
         
         # Check if there were actually changes
-        has_changes = "Already up to date" not in git_output
+        after = await _run_blocking(_head_commit, working_dir)
+        has_changes = before != after
         
-        if git_output and has_changes:
-            # Get list of changed files
+        if has_changes and before is not None:
+            # Get list of changed files since the commit we started from
             try:
-                diff_result = subprocess.run(
-                    ["git", "diff", "--name-only", "HEAD@{1}", "HEAD"],
-                    cwd=working_dir,
-                    capture_output=True,
-                    text=True,
+                diff_code, diff_stdout, _ = await _run_git(
+                    ["diff", "--name-only", "-z", before, "HEAD"],
+                    working_dir,
                     timeout=10
                 )
-                if diff_result.returncode == 0:
-                    changed_files = diff_result.stdout.strip().split("\n")
-                    changes_list = [f for f in changed_files if f.strip()]
+                if diff_code == 0:
+                    changes_list = [f for f in diff_stdout.split("\x00") if f]
                     
-                    # Check for SQL migration files
+                    # Classify SQL migrations and Build Dashboard changes in one pass
                     for file in changes_list:
-                        if file.endswith('.sql') and ('migration' in file.lower() or file.startswith('migrations/')):
+                        lowered = file.lower()
+                        if lowered.endswith('.sql') and ('migration' in lowered or file.startswith(_SQL_MIG_PREFIXES)):
                             sql_migrations.append(file)
-                        
-                        # Check for Build Dashboard changes
-                        if file.startswith('Documentation_new/build-dashboard/'):
+                        if file.startswith(_BM_PREFIXES):
                             build_dashboard_changes.append(file)
             except:
                 # Fallback to parsing git output
@@ -300,7 +566,7 @@ async def pull_from_git(request: GitPullRequest) -> GitPullResponse:
             should_reload=has_changes  # Only reload if there were actual changes
         )
         
-    except subprocess.TimeoutExpired:
+    except asyncio.TimeoutError:
         return GitPullResponse(
             success=False,
             message="Pull operation timed out"
@@ -319,64 +585,61 @@ BUILDMASTER_PATTERNS = [
     "scripts/build-dashboard/",
     "build-dashboard/",
 ]
+# Tuple form for a single str.startswith() check
+_BM_PREFIXES = tuple(BUILDMASTER_PATTERNS)
+# Directories whose .sql files are treated as migrations
+_SQL_MIG_PREFIXES = ("migrations/",)
 
 
-def get_incoming_changes(working_dir: str, branch: str = None) -> dict:
+async def get_incoming_changes(working_dir: str, branch: str = None) -> dict:
     """Fetch and check what changes would be pulled without actually pulling"""
     try:
-        # Fetch first
-        fetch_result = subprocess.run(
-            ["git", "fetch", "origin"],
-            cwd=working_dir,
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
-        
-        if fetch_result.returncode != 0:
-            return {"success": False, "error": f"Fetch failed: {fetch_result.stderr}"}
-        
-        # Get current branch if not specified
-        if not branch:
-            branch_result = subprocess.run(
-                ["git", "rev-parse", "--abbrev-ref", "HEAD"],
-                cwd=working_dir,
-                capture_output=True,
-                text=True,
-                timeout=10
+        # Fetch first; the current branch doesn't depend on it, so resolve it
+        # at the same time when not specified
+        if branch:
+            fetch_code, fetch_stderr = await _fetch_origin(Path(working_dir), timeout=FETCH_TIMEOUT_SECONDS)
+        else:
+            (fetch_code, fetch_stderr), current_branch = await asyncio.gather(
+                _fetch_origin(Path(working_dir), timeout=FETCH_TIMEOUT_SECONDS),
+                _get_current_branch(working_dir)
             )
-            branch = branch_result.stdout.strip() if branch_result.returncode == 0 else "main"
-        
-        # Check ahead/behind status
-        rev_list_result = subprocess.run(
-            ["git", "rev-list", "--left-right", "--count", f"HEAD...origin/{branch}"],
-            cwd=working_dir,
-            capture_output=True,
-            text=True,
-            timeout=10
+            branch = current_branch or "main"
+        
+        if fetch_code != 0:
+            return {"success": False, "error": f"Fetch failed: {fetch_stderr}"}
+        
+        # Ahead/behind status, incoming commits and the files they change only
+        # read the fetched refs, so they run side by side. Commits and files
+        # are NUL-separated: no guessing which lines are hashes and which are
+        # paths.
+        (
+            (rev_list_code, rev_list_stdout, _),
+            (log_code, log_stdout, log_stderr),
+            (diff_code, diff_stdout, diff_stderr)
+        ) = await asyncio.gather(
+            _run_git(["rev-list", "--left-right", "--count", f"HEAD...origin/{branch}"], working_dir, timeout=10),
+            _run_git(["log", "-z", "--format=%h%x00%s", f"HEAD..origin/{branch}"], working_dir, timeout=30),
+            # Three dots: only what changed on origin since the merge base
+            _run_git(["diff", "--name-only", "-z", f"HEAD...origin/{branch}"], working_dir, timeout=30)
         )
         ahead = 0
         behind = 0
-        if rev_list_result.returncode == 0:
-            parts = rev_list_result.stdout.strip().split()
+        if rev_list_code == 0:
+            parts = rev_list_stdout.strip().split()
             if len(parts) == 2:
                 ahead = int(parts[0])
                 behind = int(parts[1])
         
-        # Get incoming changes (diff between local and remote)
-        diff_result = subprocess.run(
-            ["git", "log", f"HEAD..origin/{branch}", "--name-only", "--oneline"],
-            cwd=working_dir,
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
-        
-        if diff_result.returncode != 0:
-            return {"success": False, "error": f"Diff failed: {diff_result.stderr}"}
+        if log_code != 0 or diff_code != 0:
+            return {"success": False, "error": f"Diff failed: {log_stderr or diff_stderr}"}
         
-        output = diff_result.stdout.strip()
-        if not output:
+        # Alternating hash and subject fields
+        log_fields = log_stdout.split("\x00")
+        commits = [
+            {"hash": commit_hash, "message": message}
+            for commit_hash, message in zip(log_fields[0::2], log_fields[1::2])
+        ]
+        if not commits:
             message = "Already up to date"
             if ahead > 0:
                 message = f"Local is {ahead} commit(s) ahead of remote - nothing to pull"
@@ -392,35 +655,14 @@ def get_incoming_changes(working_dir: str, branch: str = None) -> dict:
                 "branch": branch
             }
         
-        # Parse commits and files
-        commits = []
-        files = set()
-        buildmaster_files = []
-        
-        for line in output.split("\n"):
-            line = line.strip()
-            if not line:
-                continue
-            
-            # Commit lines start with a hash
-            if len(line.split()[0]) >= 7 and line.split()[0].isalnum():
-                parts = line.split(" ", 1)
-                if len(parts) == 2:
-                    commits.append({"hash": parts[0], "message": parts[1]})
-            else:
-                # File path
-                files.add(line)
-                # Check if it's a BuildMaster file
-                for pattern in BUILDMASTER_PATTERNS:
-                    if line.startswith(pattern) or pattern in line:
-                        buildmaster_files.append(line)
-                        break
+        files = [path for path in diff_stdout.split("\x00") if path]
+        buildmaster_files = [path for path in files if path.startswith(_BM_PREFIXES)]
         
         return {
             "success": True,
             "has_changes": True,
             "commits": commits,
-            "files": list(files),
+            "files": files,
             "buildmaster_files": buildmaster_files,
             "commit_count": len(commits),
             "file_count": len(files),
@@ -433,63 +675,55 @@ def get_incoming_changes(working_dir: str, branch: str = None) -> dict:
         return {"success": False, "error": str(e)}
 
 
-def check_buildmaster_repo_status(files: list) -> dict:
+async def check_buildmaster_repo_status(files: list) -> dict:
     """Check if BuildMaster files from main repo exist in BuildMaster repo"""
     try:
         if not os.path.exists(BUILDMASTER_DIR):
             return {"success": False, "error": "BuildMaster directory not found"}
         
-        # Get BuildMaster repo status
-        status_result = subprocess.run(
-            ["git", "status", "--porcelain"],
-            cwd=BUILDMASTER_DIR,
-            capture_output=True,
-            text=True,
-            timeout=10
+        # BuildMaster repo status, current commit hash and unpushed changes
+        (_, status_stdout, _), head, (_, unpushed_stdout, _) = await asyncio.gather(
+            _run_git(["status", "--porcelain"], BUILDMASTER_DIR, timeout=10),
+            _run_blocking(_head_commit, BUILDMASTER_DIR),
+            _run_git(["log", "origin/main..HEAD", "--oneline"], BUILDMASTER_DIR, timeout=10)
         )
         
-        # Get current commit hash
-        hash_result = subprocess.run(
-            ["git", "rev-parse", "HEAD"],
-            cwd=BUILDMASTER_DIR,
-            capture_output=True,
-            text=True,
-            timeout=10
-        )
-        
-        # Check if BuildMaster has unpushed changes
-        unpushed_result = subprocess.run(
-            ["git", "log", "origin/main..HEAD", "--oneline"],
-            cwd=BUILDMASTER_DIR,
-            capture_output=True,
-            text=True,
-            timeout=10
-        )
-        
-        has_local_changes = bool(status_result.stdout.strip())
-        unpushed_commits = [line for line in unpushed_result.stdout.strip().split("\n") if line]
+        has_local_changes = bool(status_stdout.strip())
+        unpushed_commits = [line for line in unpushed_stdout.strip().split("\n") if line]
         
         # Map main repo files to BuildMaster paths
-        file_mapping = []
+        mapped = []
         for file in files:
-            # Extract just the relative path within build-dashboard
-            for pattern in BUILDMASTER_PATTERNS:
-                if file.startswith(pattern):
-                    relative_path = file[len(pattern):]
-                    buildmaster_path = os.path.join(BUILDMASTER_DIR, relative_path)
-                    exists_in_bm = os.path.exists(buildmaster_path)
-                    file_mapping.append({
-                        "main_repo_path": file,
-                        "buildmaster_path": relative_path,
-                        "exists_in_buildmaster": exists_in_bm
-                    })
-                    break
+            prefix = next((p for p in _BM_PREFIXES if file.startswith(p)), None)
+            if prefix is not None:
+                # Extract just the relative path within build-dashboard
+                mapped.append((file, file[len(prefix):]))
+        
+        # One directory listing per directory instead of one stat per file
+        dir_entries = {}
+        for _, relative_path in mapped:
+            directory = os.path.dirname(relative_path)
+            if directory not in dir_entries:
+                try:
+                    with os.scandir(os.path.join(BUILDMASTER_DIR, directory)) as entries:
+                        dir_entries[directory] = {entry.name for entry in entries}
+                except (FileNotFoundError, NotADirectoryError):
+                    dir_entries[directory] = set()
+        
+        file_mapping = [
+            {
+                "main_repo_path": file,
+                "buildmaster_path": relative_path,
+                "exists_in_buildmaster": os.path.basename(relative_path) in dir_entries[os.path.dirname(relative_path)]
+            }
+            for file, relative_path in mapped
+        ]
         
         return {
             "success": True,
             "has_local_changes": has_local_changes,
             "unpushed_commits": unpushed_commits,
-            "current_hash": hash_result.stdout.strip() if hash_result.returncode == 0 else None,
+            "current_hash": head,
             "file_mapping": file_mapping,
             "should_push_instead": has_local_changes or len(unpushed_commits) > 0
         }
@@ -506,17 +740,17 @@ def get_local_changes_detailed(working_dir: str) -> dict:
             ["git", "status", "--porcelain"],
             cwd=working_dir,
             capture_output=True,
-            text=True,
             timeout=10
         )
         
         if status_result.returncode != 0:
-            return {"success": False, "error": f"Git status failed: {status_result.stderr}"}
+            return {"success": False, "error": f"Git status failed: {_text(status_result.stderr)}"}
         
         files = []
-        for line in status_result.stdout.strip().split("\n"):
-            if not line:
+        for raw_line in status_result.stdout.split(b"\n"):
+            if not raw_line:
                 continue
+            line = _text(raw_line)
             status_code = line[:2].strip()
             file_path = line[3:].strip()
             
@@ -545,15 +779,14 @@ def get_local_changes_detailed(working_dir: str) -> dict:
             ["git", "log", "@{u}..HEAD", "--oneline"],
             cwd=working_dir,
             capture_output=True,
-            text=True,
             timeout=10
         )
         
         unpushed_commits = []
         if unpushed_result.returncode == 0:
-            for line in unpushed_result.stdout.strip().split("\n"):
-                if line:
-                    parts = line.split(" ", 1)
+            for raw_line in unpushed_result.stdout.split(b"\n"):
+                if raw_line:
+                    parts = _text(raw_line).split(" ", 1)
                     if len(parts) == 2:
                         unpushed_commits.append({"hash": parts[0], "message": parts[1]})
         
@@ -578,18 +811,16 @@ def reset_files(working_dir: str, files: list = None, reset_all: bool = False) -
                 ["git", "checkout", "--", "."],
                 cwd=working_dir,
                 capture_output=True,
-                text=True,
                 timeout=30
             )
             if result.returncode != 0:
-                return {"success": False, "error": f"Reset failed: {result.stderr}"}
+                return {"success": False, "error": f"Reset failed: {_text(result.stderr)}"}
             
             # Clean untracked files
             clean_result = subprocess.run(
                 ["git", "clean", "-fd"],
                 cwd=working_dir,
                 capture_output=True,
-                text=True,
                 timeout=30
             )
             
@@ -602,7 +833,6 @@ def reset_files(working_dir: str, files: list = None, reset_all: bool = False) -
                     ["git", "checkout", "--", file_path],
                     cwd=working_dir,
                     capture_output=True,
-                    text=True,
                     timeout=10
                 )
                 if result.returncode == 0:
@@ -628,22 +858,21 @@ def force_sync_to_remote(working_dir: str, branch: str = None) -> dict:
                 ["git", "rev-parse", "--abbrev-ref", "HEAD"],
                 cwd=working_dir,
                 capture_output=True,
-                text=True,
                 timeout=10
             )
-            branch = branch_result.stdout.strip() if branch_result.returncode == 0 else "main"
+            branch = _text(branch_result.stdout).strip() if branch_result.returncode == 0 else "main"
         
         # Hard reset to origin
         result = subprocess.run(
             ["git", "reset", "--hard", f"origin/{branch}"],
             cwd=working_dir,
             capture_output=True,
-            text=True,
             timeout=30
         )
+        _forget_branch(working_dir)
         
         if result.returncode != 0:
-            return {"success": False, "error": f"Reset failed: {result.stderr}"}
+            return {"success": False, "error": f"Reset failed: {_text(result.stderr)}"}
         
         # Clean untracked files
         subprocess.run(["git", "clean", "-fd"], cwd=working_dir, capture_output=True, timeout=30)
@@ -666,17 +895,17 @@ async def pull_with_env(env: str, branch: str = None, stash: bool = False, force
         return {"success": False, "error": f"Directory not found: {working_dir}"}
     
     # Check for local changes
-    status = check_git_status(working_dir)
+    status = await check_git_status(working_dir)
     
     if status.get("has_changes"):
         if force:
             # Delete all local changes
-            success, message = delete_changes(working_dir)
+            success, message = await delete_changes(working_dir)
             if not success:
                 return {"success": False, "error": f"Failed to delete changes: {message}", "files": status.get("files", [])}
         elif stash:
             # Stash local changes
-            success, message = stash_changes(working_dir)
+            success, message = await stash_changes(working_dir)
             if not success:
                 return {"success": False, "error": f"Failed to stash changes: {message}", "files": status.get("files", [])}
         else:
@@ -687,124 +916,92 @@ async def pull_with_env(env: str, branch: str = None, stash: bool = False, force
                 "files": status.get("files", [])
             }
     
+    # Get branch (already resolved by the status check)
+    if not branch:
+        branch = status.get("current_branch") or "main"
+    
     # Fetch latest changes
     try:
-        fetch_result = subprocess.run(
-            ["git", "fetch", "origin"],
-            cwd=working_dir,
-            capture_output=True,
-            text=True,
-            timeout=30
+        # Ask the remote whether the branch exists while the fetch runs; a
+        # remote-tracking ref would still be there after the branch was
+        # deleted upstream
+        (fetch_code, fetch_stderr), (ls_code, _, _) = await asyncio.gather(
+            _fetch_origin(Path(working_dir), timeout=FETCH_TIMEOUT_SECONDS),
+            _run_git(["ls-remote", "--exit-code", "--heads", "origin", branch], working_dir, timeout=FETCH_TIMEOUT_SECONDS)
         )
         
-        if fetch_result.returncode != 0:
-            return {"success": False, "error": f"Fetch failed: {fetch_result.stderr}"}
-        
-        # Get branch
-        if not branch:
-            branch_result = subprocess.run(
-                ["git", "rev-parse", "--abbrev-ref", "HEAD"],
-                cwd=working_dir,
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            branch = branch_result.stdout.strip() if branch_result.returncode == 0 else "main"
-        
-        # Check if branch exists on remote
-        check_branch_result = subprocess.run(
-            ["git", "ls-remote", "--heads", "origin", branch],
-            cwd=working_dir,
-            capture_output=True,
-            text=True,
-            timeout=10
-        )
+        if fetch_code != 0:
+            return {"success": False, "error": f"Fetch failed: {fetch_stderr}"}
         
-        if check_branch_result.returncode != 0 or not check_branch_result.stdout.strip():
+        if ls_code != 0:
             return {"success": False, "error": f"Branch '{branch}' not found on remote"}
         
-        # Try pull with rebase first (cleaner history)
-        pull_result = subprocess.run(
-            ["git", "pull", "--rebase", "origin", branch],
-            cwd=working_dir,
-            capture_output=True,
-            text=True,
+        # Remember where HEAD started so the result doesn't depend on git's
+        # wording or the reflog
+        before = await _run_blocking(_head_commit, working_dir)
+        
+        # Try rebase first (cleaner history). origin was just fetched, so
+        # rebase onto the local origin/<branch> rather than pulling again
+        pull_code, pull_stdout, pull_stderr, rebase_conflicts = await _rebase_onto(
+            f"origin/{branch}",
+            working_dir,
             timeout=120
         )
         
-        # If rebase fails, try different strategies
-        if pull_result.returncode != 0:
-            error_output = pull_result.stderr or pull_result.stdout
+        # If rebase fails (it has been aborted by now), try different strategies
+        if pull_code != 0:
+            error_output = pull_stderr or pull_stdout
             
             # If rebase conflicts or divergent branches, try merge instead
-            if "conflict" in error_output.lower() or "divergent" in error_output.lower() or "need to specify" in error_output.lower():
-                # Abort any ongoing rebase
-                subprocess.run(
-                    ["git", "rebase", "--abort"],
-                    cwd=working_dir,
-                    capture_output=True,
-                    timeout=10
-                )
-                
-                # Try merge pull
-                merge_pull_result = subprocess.run(
-                    ["git", "pull", "--no-rebase", "origin", branch],
-                    cwd=working_dir,
-                    capture_output=True,
-                    text=True,
+            if rebase_conflicts or "divergent" in error_output.lower() or "need to specify" in error_output.lower():
+                # Try merge
+                merge_code, merge_stdout, merge_stderr = await _run_git_streaming(
+                    ["merge", "--no-edit", f"origin/{branch}"],
+                    working_dir,
                     timeout=120
                 )
                 
-                if merge_pull_result.returncode != 0:
+                if merge_code != 0:
                     # If merge also fails and force was requested, reset to origin
                     if force:
-                        reset_result = subprocess.run(
-                            ["git", "reset", "--hard", f"origin/{branch}"],
-                            cwd=working_dir,
-                            capture_output=True,
-                            text=True,
+                        reset_code, reset_stdout, reset_stderr = await _run_git(
+                            ["reset", "--hard", f"origin/{branch}"],
+                            working_dir,
                             timeout=30
                         )
-                        if reset_result.returncode != 0:
-                            return {"success": False, "error": f"Reset failed: {reset_result.stderr}"}
-                        pull_result = reset_result
+                        _forget_branch(working_dir)
+                        if reset_code != 0:
+                            return {"success": False, "error": f"Reset failed: {reset_stderr}"}
+                        pull_stdout = reset_stdout
                     else:
-                        return {"success": False, "error": f"Pull failed with conflicts. Use force=true to reset to remote state. Error: {merge_pull_result.stderr or merge_pull_result.stdout}"}
+                        return {
+                            "success": False,
+                            "error": f"Pull failed with conflicts. Use force=true to reset to remote state. Error: {merge_stderr or merge_stdout}",
+                            "conflicts": await _list_unmerged_paths(working_dir)
+                        }
                 else:
-                    pull_result = merge_pull_result
+                    pull_stdout = merge_stdout
             else:
                 return {"success": False, "error": f"Pull failed: {error_output}"}
         
+        if "Switched to branch" in pull_stdout:
+            _forget_branch(working_dir)
+        
         # Check what was pulled
-        output = pull_result.stdout.strip()
-        already_up_to_date = "Already up to date" in output or "is up to date" in output.lower()
+        after = await _run_blocking(_head_commit, working_dir)
+        already_up_to_date = before == after
         
         # Get changed files
         changed_files = []
-        if not already_up_to_date:
+        if not already_up_to_date and before is not None:
             try:
-                # Try to get diff between previous HEAD and current HEAD
-                diff_result = subprocess.run(
-                    ["git", "diff", "--name-only", "HEAD@{1}", "HEAD"],
-                    cwd=working_dir,
-                    capture_output=True,
-                    text=True,
+                diff_code, diff_stdout, _ = await _run_git(
+                    ["diff", "--name-only", "-z", before, "HEAD"],
+                    working_dir,
                     timeout=10
                 )
-                if diff_result.returncode == 0:
-                    changed_files = [f for f in diff_result.stdout.strip().split("\n") if f.strip()]
-                
-                # If that didn't work, try comparing with origin
-                if not changed_files:
-                    diff_origin_result = subprocess.run(
-                        ["git", "diff", "--name-only", f"HEAD~1", "HEAD"],
-                        cwd=working_dir,
-                        capture_output=True,
-                        text=True,
-                        timeout=10
-                    )
-                    if diff_origin_result.returncode == 0:
-                        changed_files = [f for f in diff_origin_result.stdout.strip().split("\n") if f.strip()]
+                if diff_code == 0:
+                    changed_files = [f for f in diff_stdout.split("\x00") if f]
             except:
                 pass
         
@@ -817,61 +1014,89 @@ async def pull_with_env(env: str, branch: str = None, stash: bool = False, force
             "env": env
         }
         
-    except subprocess.TimeoutExpired:
+    except asyncio.TimeoutError:
         return {"success": False, "error": "Pull operation timed out"}
     except Exception as e:
         return {"success": False, "error": str(e)}
 
 
+async def pull_with_envs(envs: List[str], branch: str = None, stash: bool = False, force: bool = False) -> Dict[str, dict]:
+    """
+    Pull several environments at once
+    
+    Each environment is its own checkout, so the pulls run side by side and
+    take as long as the slowest one. Fetches against the same checkout are
+    already shared by _fetch_origin.
+    
+    Args:
+        envs: Environments to pull ("dev" and/or "prod")
+        branch: Branch to pull (defaults to each checkout's current branch)
+        stash: Stash local changes before pulling
+        force: Discard local changes and reset to origin if the pull fails
+        
+    Returns:
+        Dict mapping each environment to its pull_with_env result
+    """
+    unknown = [env for env in envs if env not in ("dev", "prod")]
+    if unknown:
+        return {env: {"success": False, "error": f"Unknown environment: {env}"} for env in unknown}
+    
+    # Preserve order, pull each environment once
+    envs = list(dict.fromkeys(envs))
+    results = await asyncio.gather(
+        *(pull_with_env(env, branch, stash, force) for env in envs),
+        return_exceptions=True
+    )
+    return {
+        env: {"success": False, "error": str(result), "env": env} if isinstance(result, BaseException) else result
+        for env, result in zip(envs, results)
+    }
+
+
 def push_to_buildmaster(commit_message: str = None) -> dict:
     """Push BuildMaster changes to its repo"""
     try:
         if not os.path.exists(BUILDMASTER_DIR):
             return {"success": False, "error": "BuildMaster directory not found"}
         
-        # Check for changes
-        status_result = subprocess.run(
-            ["git", "status", "--porcelain"],
-            cwd=BUILDMASTER_DIR,
-            capture_output=True,
-            text=True,
-            timeout=10
-        )
-        
-        if status_result.stdout.strip():
-            # Stage all changes
-            subprocess.run(
-                ["git", "add", "-A"],
+        def git(*args: str, timeout: float = 10) -> subprocess.CompletedProcess:
+            return subprocess.run(
+                ["git", *args],
                 cwd=BUILDMASTER_DIR,
                 capture_output=True,
-                text=True,
-                timeout=10
+                timeout=timeout
             )
-            
-            # Commit
+        
+        # Stage all changes. `git add -A` is the one walk over the working
+        # tree; everything after it only reads the index and object store
+        add_result = git("add", "-A")
+        if add_result.returncode != 0:
+            return {"success": False, "error": f"Staging failed: {_text(add_result.stderr)}"}
+        
+        tree_result = git("write-tree")
+        head_result = git("rev-parse", "HEAD", "HEAD^{tree}")
+        if tree_result.returncode != 0 or head_result.returncode != 0:
+            return {"success": False, "error": f"Commit failed: {_text(tree_result.stderr or head_result.stderr)}"}
+        tree = _text(tree_result.stdout).strip()
+        parent, parent_tree = _text(head_result.stdout).split()
+        
+        # Same tree as HEAD means there is nothing to commit
+        if tree != parent_tree:
             msg = commit_message or "BuildMaster update from main repo"
-            commit_result = subprocess.run(
-                ["git", "commit", "-m", msg],
-                cwd=BUILDMASTER_DIR,
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            
+            commit_result = git("commit-tree", tree, "-p", parent, "-m", msg)
             if commit_result.returncode != 0:
-                return {"success": False, "error": f"Commit failed: {commit_result.stderr}"}
+                return {"success": False, "error": f"Commit failed: {_text(commit_result.stderr)}"}
+            
+            # Only move HEAD if it still points at the parent we committed on
+            ref_result = git("update-ref", "-m", f"commit: {msg}", "HEAD", _text(commit_result.stdout).strip(), parent)
+            if ref_result.returncode != 0:
+                return {"success": False, "error": f"Commit failed: {_text(ref_result.stderr)}"}
         
         # Push
-        push_result = subprocess.run(
-            ["git", "push", "origin", "main"],
-            cwd=BUILDMASTER_DIR,
-            capture_output=True,
-            text=True,
-            timeout=60
-        )
+        push_result = git("push", "origin", "main", timeout=60)
         
         if push_result.returncode != 0:
-            return {"success": False, "error": f"Push failed: {push_result.stderr}"}
+            return {"success": False, "error": f"Push failed: {_text(push_result.stderr)}"}
         
         return {"success": True, "message": "Successfully pushed to BuildMaster repo"}
         
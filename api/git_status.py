@@ -1,14 +1,176 @@
 """Git status operations with detailed information and suggestions"""
-import subprocess
+import asyncio
+import time
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Optional, Tuple, Union
+import pygit2
 from config import settings
+from git_commit_tracker import _fetch_origin, _open_repository, commit_subject, format_relative_date
+from git_ops import _forget_branch, _list_unmerged_paths
 
 
-async def get_detailed_git_status() -> Dict:
+# Environment directories, built once instead of on every call
+_DEV_DIR = Path(settings.DEV_DIR)
+_PROD_DIR = Path(settings.PROD_DIR)
+
+# pygit2 status flags grouped like porcelain XY codes: M on either side,
+# anything staged (or conflicted), D on either side
+_PYGIT2_MODIFIED = pygit2.GIT_STATUS_INDEX_MODIFIED | pygit2.GIT_STATUS_WT_MODIFIED
+_PYGIT2_STAGED = (
+    pygit2.GIT_STATUS_INDEX_NEW | pygit2.GIT_STATUS_INDEX_MODIFIED | pygit2.GIT_STATUS_INDEX_DELETED |
+    pygit2.GIT_STATUS_INDEX_RENAMED | pygit2.GIT_STATUS_INDEX_TYPECHANGE | pygit2.GIT_STATUS_CONFLICTED
+)
+_PYGIT2_DELETED = pygit2.GIT_STATUS_INDEX_DELETED | pygit2.GIT_STATUS_WT_DELETED
+
+# How often the background task fetches origin in the dev directory
+GIT_FETCH_INTERVAL_SECONDS = 60
+_fetch_loop_task: Optional[asyncio.Task] = None
+
+# The dashboard polls git status every 10-15s while it's open. Without a
+# status request for this long nobody is watching, and the background fetch
+# pauses until the next request wakes it
+GIT_WATCHER_IDLE_SECONDS = 120
+_last_status_request = float("-inf")
+_watcher_seen = asyncio.Event()
+
+# Last computed detailed status and the computation in flight, shared by
+# concurrent and back-to-back requests. The generation is bumped whenever a
+# git operation here changes the working tree, so results computed before
+# it are never cached
+STATUS_CACHE_TTL_SECONDS = 2.0
+_status_cache: Dict = {"ts": 0.0, "value": None, "generation": 0}
+_status_inflight: Optional[asyncio.Task] = None
+
+
+async def _run(*argv: str, cwd: str, timeout: float) -> Tuple[int, bytes, bytes]:
+    """
+    Run a command without blocking the event loop
+    
+    Args:
+        argv: Program and arguments
+        cwd: Working directory
+        timeout: Seconds before the process is killed
+        
+    Returns:
+        Tuple of (returncode, stdout, stderr) as bytes
+        
+    Raises:
+        asyncio.TimeoutError: If the process didn't finish in time
+    """
+    process = await asyncio.create_subprocess_exec(
+        *argv,
+        cwd=cwd,
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=timeout)
+    except asyncio.TimeoutError:
+        # Reap the killed process so it doesn't linger as a zombie
+        process.kill()
+        await process.wait()
+        raise
+    return process.returncode, stdout, stderr
+
+
+async def _git(*args: str, cwd: str, timeout: float = 5, raw: bool = False) -> Tuple[int, Union[str, bytes], str]:
+    """
+    Run a git command without blocking the event loop
+    
+    Args:
+        args: Arguments after `git`
+        cwd: Repository directory
+        timeout: Seconds before git is killed
+        raw: Return stdout as bytes instead of decoding it
+        
+    Returns:
+        Tuple of (returncode, stdout, stderr)
+        
+    Raises:
+        asyncio.TimeoutError: If git didn't finish in time
+    """
+    returncode, stdout, stderr = await _run("git", *args, cwd=cwd, timeout=timeout)
+    return (
+        returncode,
+        stdout if raw else stdout.decode("utf-8", errors="replace"),
+        stderr.decode("utf-8", errors="replace")
+    )
+
+
+async def fetch_dev_origin(timeout: float = 30) -> bool:
+    """
+    Fetch origin in the dev directory
+    
+    Args:
+        timeout: Seconds before the fetch is abandoned
+        
+    Returns:
+        True if the fetch succeeded
+    """
+    dev_dir = _DEV_DIR
+    if not dev_dir.exists():
+        return False
+    try:
+        returncode, stderr = await _fetch_origin(dev_dir, timeout=timeout)
+    except Exception as e:
+        print(f"Background git fetch failed: {e}")
+        return False
+    if returncode != 0:
+        print(f"Background git fetch failed: {stderr.strip()}")
+    return returncode == 0
+
+
+def has_active_watchers() -> bool:
+    """Whether a client has asked for git status within GIT_WATCHER_IDLE_SECONDS"""
+    return time.monotonic() - _last_status_request < GIT_WATCHER_IDLE_SECONDS
+
+
+async def _fetch_loop() -> None:
+    """Keep origin refs in the dev directory fresh for status requests"""
+    while True:
+        if not has_active_watchers():
+            # Idle server: do no git work until a status request comes in
+            _watcher_seen.clear()
+            await _watcher_seen.wait()
+        await fetch_dev_origin()
+        await asyncio.sleep(GIT_FETCH_INTERVAL_SECONDS)
+
+
+def start_background_fetch() -> asyncio.Task:
+    """Start the periodic dev fetch (called on app startup)"""
+    global _fetch_loop_task
+    if _fetch_loop_task is None or _fetch_loop_task.done():
+        _fetch_loop_task = asyncio.create_task(_fetch_loop())
+    return _fetch_loop_task
+
+
+async def stop_background_fetch() -> None:
+    """Cancel the periodic dev fetch (called on app shutdown)"""
+    global _fetch_loop_task
+    if _fetch_loop_task is not None:
+        _fetch_loop_task.cancel()
+        await asyncio.gather(_fetch_loop_task, return_exceptions=True)
+        _fetch_loop_task = None
+
+
+def invalidate_git_status_cache() -> None:
+    """Forget the cached detailed status after changing the working tree"""
+    global _status_inflight
+    _status_cache["ts"] = 0.0
+    _status_cache["value"] = None
+    _status_cache["generation"] += 1
+    _status_inflight = None
+
+
+async def get_detailed_git_status(force_refresh: bool = False, ttl: float = STATUS_CACHE_TTL_SECONDS) -> Dict:
     """
     Get detailed git status with file changes and actionable suggestions
     
+    Results are reused for ttl seconds and concurrent callers share one
+    computation. Remote-tracking refs come from the background fetch loop;
+    pass force_refresh=True to fetch origin and recompute.
+    
     Returns dict with:
     - status: clean/dirty/error
     - branch: current branch name
@@ -20,7 +182,84 @@ async def get_detailed_git_status() -> Dict:
     - current_commit: current commit hash
     - latest_remote_commit: latest remote commit hash
     """
-    dev_dir = Path(settings.DEV_DIR)
+    global _status_inflight, _last_status_request
+    
+    _last_status_request = time.monotonic()
+    _watcher_seen.set()
+    
+    if force_refresh:
+        await fetch_dev_origin(timeout=10)
+    else:
+        if _status_cache["value"] is not None and time.monotonic() - _status_cache["ts"] < ttl:
+            return _status_cache["value"]
+        if _status_inflight is not None:
+            return await asyncio.shield(_status_inflight)
+    
+    generation = _status_cache["generation"]
+    task = asyncio.ensure_future(_compute_detailed_git_status())
+    _status_inflight = task
+    
+    def finished(task: asyncio.Task) -> None:
+        global _status_inflight
+        if _status_inflight is task:
+            _status_inflight = None
+        if not task.cancelled() and task.exception() is None and _status_cache["generation"] == generation:
+            _status_cache.update(ts=time.monotonic(), value=task.result())
+    
+    task.add_done_callback(finished)
+    # Shielded so a caller that goes away doesn't cancel it for the others
+    return await asyncio.shield(task)
+
+
+def _read_status_pygit2(dev_dir: str, prod_dir: Optional[str], result: Dict) -> None:
+    """Fill result in-process from the repositories' index, refs and objects"""
+    repo = _open_repository(dev_dir)
+    
+    if not repo.head_is_unborn:
+        commit = repo[repo.head.target]
+        result["current_commit"] = str(commit.id)
+        result["current_commit_short"] = result["current_commit"][:8]
+        result["commit_message"] = commit_subject(commit)
+        result["commit_date"] = format_relative_date(commit.author.time)
+        
+        if repo.head_is_detached:
+            result["branch"] = "HEAD"
+        else:
+            result["branch"] = repo.head.shorthand
+            remote_ref = repo.references.get(f"refs/remotes/origin/{result['branch']}")
+            if remote_ref is not None:
+                result["latest_remote_commit"] = str(remote_ref.resolve().target)
+                result["latest_remote_commit_short"] = result["latest_remote_commit"][:8]
+            # Ahead/behind against the configured upstream, like status --branch
+            upstream = repo.branches.local[result["branch"]].upstream
+            if upstream is not None:
+                result["ahead"], result["behind"] = repo.ahead_behind(
+                    repo.head.target, upstream.resolve().target
+                )
+    
+    result["stash_count"] = len(repo.listall_stashes())
+    result["has_stash"] = result["stash_count"] > 0
+    
+    for file_path, flags in sorted(repo.status(untracked_files="normal").items()):
+        if flags & _PYGIT2_MODIFIED:
+            result["modified_files"].append(file_path)
+        if flags == pygit2.GIT_STATUS_WT_NEW:
+            result["untracked_files"].append(file_path)
+        if flags & _PYGIT2_STAGED:
+            result["staged_files"].append(file_path)
+        if flags & _PYGIT2_DELETED:
+            result["deleted_files"].append(file_path)
+    
+    if prod_dir is not None:
+        prod_repo = _open_repository(prod_dir)
+        if not prod_repo.head_is_unborn:
+            result["prod_commit"] = str(prod_repo.head.target)
+            result["prod_commit_short"] = result["prod_commit"][:8]
+
+
+async def _compute_detailed_git_status() -> Dict:
+    """Run the git queries behind get_detailed_git_status"""
+    dev_dir = _DEV_DIR
     
     result = {
         "status": "unknown",
@@ -57,117 +296,14 @@ async def get_detailed_git_status() -> Dict:
         return result
     
     try:
-        # Get current branch
-        branch_result = subprocess.run(
-            ["git", "rev-parse", "--abbrev-ref", "HEAD"],
-            cwd=str(dev_dir),
-            capture_output=True,
-            text=True,
-            timeout=5
+        prod_dir = _PROD_DIR
+        # Read everything in-process: no git processes per poll
+        await asyncio.to_thread(
+            _read_status_pygit2,
+            str(dev_dir),
+            str(prod_dir) if prod_dir.exists() else None,
+            result
         )
-        if branch_result.returncode == 0:
-            result["branch"] = branch_result.stdout.strip()
-        
-        # Get current commit
-        commit_result = subprocess.run(
-            ["git", "rev-parse", "HEAD"],
-            cwd=str(dev_dir),
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        if commit_result.returncode == 0:
-            result["current_commit"] = commit_result.stdout.strip()
-            result["current_commit_short"] = result["current_commit"][:8]
-        
-        # Get commit message
-        message_result = subprocess.run(
-            ["git", "log", "-1", "--pretty=%s"],
-            cwd=str(dev_dir),
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        if message_result.returncode == 0:
-            result["commit_message"] = message_result.stdout.strip()
-        
-        # Get commit date
-        date_result = subprocess.run(
-            ["git", "log", "-1", "--pretty=%ar"],
-            cwd=str(dev_dir),
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        if date_result.returncode == 0:
-            result["commit_date"] = date_result.stdout.strip()
-        
-        # Fetch latest from remote (non-blocking)
-        try:
-            subprocess.run(
-                ["git", "fetch", "origin"],
-                cwd=str(dev_dir),
-                capture_output=True,
-                timeout=10
-            )
-            
-            # Get latest remote commit
-            if result["branch"]:
-                remote_commit_result = subprocess.run(
-                    ["git", "rev-parse", f"origin/{result['branch']}"],
-                    cwd=str(dev_dir),
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
-                if remote_commit_result.returncode == 0:
-                    result["latest_remote_commit"] = remote_commit_result.stdout.strip()
-                    result["latest_remote_commit_short"] = result["latest_remote_commit"][:8]
-        except:
-            pass  # Non-critical if fetch fails
-        
-        # Get git status --porcelain
-        status_result = subprocess.run(
-            ["git", "status", "--porcelain"],
-            cwd=str(dev_dir),
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        
-        if status_result.returncode != 0:
-            result["status"] = "error"
-            result["suggestions"].append({
-                "type": "error",
-                "message": "Failed to get git status",
-                "action": None
-            })
-            return result
-        
-        # Parse status output
-        lines = status_result.stdout.strip().split('\n')
-        for line in lines:
-            if not line:
-                continue
-            
-            status_code = line[:2]
-            file_path = line[3:]
-            
-            # Modified files (M in index or working tree)
-            if 'M' in status_code:
-                result["modified_files"].append(file_path)
-            
-            # Untracked files
-            if status_code == '??':
-                result["untracked_files"].append(file_path)
-            
-            # Staged files (first character is not space or ?)
-            if status_code[0] not in [' ', '?']:
-                result["staged_files"].append(file_path)
-            
-            # Deleted files
-            if 'D' in status_code:
-                result["deleted_files"].append(file_path)
         
         result["file_count"] = len(result["modified_files"]) + len(result["untracked_files"]) + len(result["staged_files"]) + len(result["deleted_files"])
         
@@ -177,53 +313,6 @@ async def get_detailed_git_status() -> Dict:
         else:
             result["status"] = "dirty"
         
-        # Check for stashes
-        stash_result = subprocess.run(
-            ["git", "stash", "list"],
-            cwd=str(dev_dir),
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        if stash_result.returncode == 0:
-            stash_lines = [l for l in stash_result.stdout.strip().split('\n') if l]
-            result["stash_count"] = len(stash_lines)
-            result["has_stash"] = result["stash_count"] > 0
-        
-        # Check ahead/behind remote
-        try:
-            ahead_behind_result = subprocess.run(
-                ["git", "rev-list", "--left-right", "--count", f"HEAD...origin/{result['branch']}"],
-                cwd=str(dev_dir),
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            if ahead_behind_result.returncode == 0:
-                parts = ahead_behind_result.stdout.strip().split()
-                if len(parts) == 2:
-                    result["ahead"] = int(parts[0])
-                    result["behind"] = int(parts[1])
-        except:
-            pass
-        
-        # Get prod commit for comparison
-        prod_dir = Path(settings.PROD_DIR)
-        if prod_dir.exists():
-            try:
-                prod_commit_result = subprocess.run(
-                    ["git", "rev-parse", "HEAD"],
-                    cwd=str(prod_dir),
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
-                if prod_commit_result.returncode == 0:
-                    result["prod_commit"] = prod_commit_result.stdout.strip()
-                    result["prod_commit_short"] = result["prod_commit"][:8]
-            except:
-                pass
-        
         # Check if commits are in sync
         result["commits_in_sync"] = (
             result["current_commit"] == result["latest_remote_commit"] and
@@ -308,28 +397,26 @@ async def get_detailed_git_status() -> Dict:
 
 async def git_stash_changes() -> Dict:
     """Stash current changes"""
-    dev_dir = Path(settings.DEV_DIR)
+    dev_dir = _DEV_DIR
     
     try:
-        result = subprocess.run(
-            ["git", "stash", "push", "-m", f"Auto-stash from build dashboard"],
-            cwd=str(dev_dir),
-            capture_output=True,
-            text=True,
-            timeout=10
+        returncode, stdout, stderr = await _git(
+            "stash", "push", "-m", "Auto-stash from build dashboard", cwd=str(dev_dir), timeout=10
         )
         
-        if result.returncode == 0:
+        invalidate_git_status_cache()
+        
+        if returncode == 0:
             return {
                 "success": True,
                 "message": "Changes stashed successfully",
-                "output": result.stdout
+                "output": stdout
             }
         else:
             return {
                 "success": False,
                 "message": "Failed to stash changes",
-                "error": result.stderr
+                "error": stderr
             }
     except Exception as e:
         return {
@@ -341,28 +428,24 @@ async def git_stash_changes() -> Dict:
 
 async def git_pop_stash() -> Dict:
     """Pop the latest stash"""
-    dev_dir = Path(settings.DEV_DIR)
+    dev_dir = _DEV_DIR
     
     try:
-        result = subprocess.run(
-            ["git", "stash", "pop"],
-            cwd=str(dev_dir),
-            capture_output=True,
-            text=True,
-            timeout=10
-        )
+        returncode, stdout, stderr = await _git("stash", "pop", cwd=str(dev_dir), timeout=10)
+        
+        invalidate_git_status_cache()
         
-        if result.returncode == 0:
+        if returncode == 0:
             return {
                 "success": True,
                 "message": "Stash applied successfully",
-                "output": result.stdout
+                "output": stdout
             }
         else:
             return {
                 "success": False,
                 "message": "Failed to pop stash (may have conflicts)",
-                "error": result.stderr
+                "error": stderr
             }
     except Exception as e:
         return {
@@ -372,22 +455,80 @@ async def git_pop_stash() -> Dict:
         }
 
 
+async def git_stash_and_pull() -> Dict:
+    """Stash local changes, rebase onto the upstream branch and re-apply the stash"""
+    dev_dir = _DEV_DIR
+    
+    try:
+        # Fetch through the shared per-directory fetch instead of letting
+        # `git pull` go to the network on its own
+        fetch_code, fetch_stderr = await _fetch_origin(dev_dir, timeout=30)
+        if fetch_code != 0:
+            return {
+                "success": False,
+                "message": "Failed to fetch from origin",
+                "error": fetch_stderr
+            }
+        
+        # --autostash does stash -> rebase -> pop inside git itself, and skips
+        # the pop when there was nothing to stash, which a plain
+        # "stash push && pull && stash pop" chain would get wrong by popping
+        # an older, unrelated stash
+        try:
+            returncode, stdout, stderr = await _git("rebase", "--autostash", cwd=str(dev_dir), timeout=60)
+        except asyncio.TimeoutError:
+            returncode, stdout, stderr = -1, "", "git rebase timed out"
+        if returncode != 0:
+            # Don't leave dev mid-rebase; aborting also re-applies the stash
+            await _git("rebase", "--abort", cwd=str(dev_dir), timeout=10)
+        else:
+            # The rebase itself succeeded, but git still exits 0 when
+            # re-applying the autostash conflicts: the files are left with
+            # conflict markers and the local changes stay in the stash
+            conflicts = await _list_unmerged_paths(str(dev_dir))
+            if conflicts:
+                return {
+                    "success": False,
+                    "message": "Pulled latest changes, but re-applying local changes conflicted. "
+                               "Resolve the conflicts; your changes remain in stash@{0}",
+                    "conflicts": conflicts,
+                    "output": stdout,
+                    "error": stderr
+                }
+        
+        if returncode == 0:
+            return {
+                "success": True,
+                "message": "Pulled latest changes and re-applied local changes",
+                "output": stdout
+            }
+        else:
+            return {
+                "success": False,
+                "message": "Failed to pull (local changes may conflict)",
+                "error": stderr
+            }
+    except Exception as e:
+        return {
+            "success": False,
+            "message": f"Error pulling with stash: {str(e)}",
+            "error": str(e)
+        }
+    finally:
+        invalidate_git_status_cache()
+        _forget_branch(settings.DEV_DIR)
+
+
 async def git_clean_untracked() -> Dict:
     """Remove untracked files (with dry-run first)"""
-    dev_dir = Path(settings.DEV_DIR)
+    dev_dir = _DEV_DIR
     
     try:
         # First do a dry run to see what would be removed
-        dry_run_result = subprocess.run(
-            ["git", "clean", "-fd", "--dry-run"],
-            cwd=str(dev_dir),
-            capture_output=True,
-            text=True,
-            timeout=10
-        )
+        dry_run_code, dry_run_stdout, dry_run_stderr = await _git("clean", "-fd", "--dry-run", cwd=str(dev_dir), timeout=10)
         
-        if dry_run_result.returncode == 0:
-            files_to_remove = dry_run_result.stdout.strip().split('\n')
+        if dry_run_code == 0:
+            files_to_remove = dry_run_stdout.strip().split('\n')
             files_to_remove = [f for f in files_to_remove if f]
             
             return {
@@ -400,7 +541,7 @@ async def git_clean_untracked() -> Dict:
             return {
                 "success": False,
                 "message": "Failed to check untracked files",
-                "error": dry_run_result.stderr
+                "error": dry_run_stderr
             }
     except Exception as e:
         return {
@@ -412,28 +553,24 @@ async def git_clean_untracked() -> Dict:
 
 async def git_clean_untracked_confirm() -> Dict:
     """Actually remove untracked files"""
-    dev_dir = Path(settings.DEV_DIR)
+    dev_dir = _DEV_DIR
     
     try:
-        result = subprocess.run(
-            ["git", "clean", "-fd"],
-            cwd=str(dev_dir),
-            capture_output=True,
-            text=True,
-            timeout=10
-        )
+        returncode, stdout, stderr = await _git("clean", "-fd", cwd=str(dev_dir), timeout=10)
+        
+        invalidate_git_status_cache()
         
-        if result.returncode == 0:
+        if returncode == 0:
             return {
                 "success": True,
                 "message": "Untracked files removed successfully",
-                "output": result.stdout
+                "output": stdout
             }
         else:
             return {
                 "success": False,
                 "message": "Failed to remove untracked files",
-                "error": result.stderr
+                "error": stderr
             }
     except Exception as e:
         return {
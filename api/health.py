@@ -1,10 +1,11 @@
 """Health check operations for server, database, and environment"""
+import asyncio
 import psutil
 import os
 import json
-from datetime import datetime
-from typing import Optional, Dict, Any
-import subprocess
+import time
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, List, Tuple, Callable, Awaitable
 from pathlib import Path
 from config import settings
 from models import (
@@ -13,11 +14,90 @@ from models import (
     RedisHealthResponse,
     EnvironmentHealthResponse
 )
+from db_service_ops import get_pg_pool
 from pm2_ops import is_pm2_running
 
+# The Redis driver is optional; the probe reports it missing
+try:
+    import redis
+except ImportError:
+    redis = None
+
 # Settings file path
 SETTINGS_FILE = "/var/www/build/settings.json"
 
+# Parsed settings.json together with the mtime it was read at
+_settings_cache: Optional[Tuple[int, Dict[str, Any]]] = None
+
+# Paths checked by the environment probe, built once instead of per call
+_DEV_DIR = Path(settings.DEV_DIR)
+_DEV_ENV_FILE = _DEV_DIR / ".env.local"
+_PROD_ENV_FILE = Path(settings.PROD_DIR) / ".env.production"
+_APP_ENV_FILE = Path(settings.APP_DIR) / ".env.local"
+
+# How long each probe's result is reused before the probe runs again
+DATABASE_HEALTH_TTL_SECONDS = 5.0
+REDIS_HEALTH_TTL_SECONDS = 5.0
+ENVIRONMENT_HEALTH_TTL_SECONDS = 2.0
+
+# DATABASE_URL per (project_path, env), valid while the env file mtimes match
+_database_url_cache: Dict[Tuple[str, str], Tuple[Tuple[Optional[int], ...], Optional[str]]] = {}
+
+
+# Seconds a health query may take on a pooled connection
+DB_PROBE_TIMEOUT_SECONDS = 5
+
+
+def _mtime_ns(path: str) -> Optional[int]:
+    """Modification time of path, or None if it doesn't exist"""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+class AsyncTTLCache:
+    """
+    Cache async results for a fixed time, per key
+    
+    Concurrent misses on the same key share one computation, so a burst of
+    polls costs a single probe. Failed computations aren't cached.
+    """
+    
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._values: Dict[Any, Tuple[float, Any]] = {}
+        self._inflight: Dict[Any, asyncio.Task] = {}
+    
+    async def get(self, key: Any, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value for key, running factory() if it's missing or stale"""
+        cached = self._values.get(key)
+        if cached is not None and time.monotonic() - cached[0] < self.ttl:
+            return cached[1]
+        
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done, key=key: self._store(key, done))
+        # Shielded so one caller going away doesn't cancel the probe for the others
+        return await asyncio.shield(task)
+    
+    def _store(self, key: Any, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if task.cancelled() or task.exception() is not None:
+            return
+        now = time.monotonic()
+        # Drop expired entries, e.g. keys for an older settings.json
+        self._values = {k: v for k, v in self._values.items() if now - v[0] < self.ttl}
+        self._values[key] = (now, task.result())
+
+
+_database_health_cache = AsyncTTLCache(DATABASE_HEALTH_TTL_SECONDS)
+_redis_health_cache = AsyncTTLCache(REDIS_HEALTH_TTL_SECONDS)
+_environment_health_cache = AsyncTTLCache(ENVIRONMENT_HEALTH_TTL_SECONDS)
+
 
 def get_database_url_from_env(project_path: str, env: str = "dev") -> Optional[str]:
     """Read DATABASE_URL from .env files in the project"""
@@ -27,50 +107,95 @@ def get_database_url_from_env(project_path: str, env: str = "dev") -> Optional[s
     else:
         env_files = [".env.local", ".env.development.local", ".env.development", ".env"]
     
-    for env_file in env_files:
-        env_path = os.path.join(project_path, env_file)
-        if os.path.exists(env_path):
+    env_paths = [os.path.join(project_path, env_file) for env_file in env_files]
+    mtimes = tuple(_mtime_ns(env_path) for env_path in env_paths)
+    
+    # Only re-read the files when one of them was added, removed or changed
+    cache_key = (project_path, env)
+    cached = _database_url_cache.get(cache_key)
+    if cached is not None and cached[0] == mtimes:
+        return cached[1]
+    
+    url = _scan_env_files(env_paths, mtimes)
+    _database_url_cache[cache_key] = (mtimes, url)
+    return url
+
+
+def _find_database_url(data: bytes) -> Optional[str]:
+    """
+    Extract DATABASE_URL from the contents of an env file
+    
+    Jumps straight to occurrences of the key instead of walking every line;
+    only an occurrence at the start of a line (after indentation) counts, so
+    commented-out definitions are skipped.
+    """
+    index = data.find(b"DATABASE_URL")
+    while index >= 0:
+        line_start = data.rfind(b"\n", 0, index) + 1
+        line_end = data.find(b"\n", index)
+        if line_end < 0:
+            line_end = len(data)
+        if not data[line_start:index].strip():
+            line = data[line_start:line_end].decode("utf-8", errors="replace").strip()
+            if line.startswith('DATABASE_URL=') or line.startswith('DATABASE_URL ='):
+                # Handle various quote styles and potential inline comments
+                url = line.split('=', 1)[1].strip()
+                # Remove surrounding quotes
+                if (url.startswith('"') and url.endswith('"')) or \
+                   (url.startswith("'") and url.endswith("'")):
+                    url = url[1:-1]
+                # Remove inline comments
+                if ' #' in url:
+                    url = url.split(' #')[0].strip()
+                return url
+        index = data.find(b"DATABASE_URL", line_end)
+    return None
+
+
+def _scan_env_files(env_paths: List[str], mtimes: Tuple[Optional[int], ...]) -> Optional[str]:
+    """Return DATABASE_URL from the first env file that defines it"""
+    for env_path, mtime in zip(env_paths, mtimes):
+        if mtime is not None:
             try:
-                with open(env_path, 'r') as f:
-                    for line in f:
-                        line = line.strip()
-                        # Skip comments and empty lines
-                        if not line or line.startswith('#'):
-                            continue
-                        if line.startswith('DATABASE_URL=') or line.startswith('DATABASE_URL ='):
-                            # Handle various quote styles and potential inline comments
-                            url = line.split('=', 1)[1].strip()
-                            # Remove surrounding quotes
-                            if (url.startswith('"') and url.endswith('"')) or \
-                               (url.startswith("'") and url.endswith("'")):
-                                url = url[1:-1]
-                            # Remove inline comments
-                            if ' #' in url:
-                                url = url.split(' #')[0].strip()
-                            return url
+                with open(env_path, 'rb') as f:
+                    url = _find_database_url(f.read())
             except Exception as e:
                 print(f"Error reading {env_path}: {e}")
                 continue
+            if url is not None:
+                return url
     return None
 
 
 def load_settings_sync() -> Dict[str, Any]:
-    """Synchronously load settings from JSON file"""
-    if os.path.exists(SETTINGS_FILE):
-        try:
-            with open(SETTINGS_FILE, 'r') as f:
-                return json.load(f)
-        except:
-            pass
-    return {}
+    """Synchronously load settings from JSON file, re-reading it only when it changes"""
+    global _settings_cache
+    mtime = _mtime_ns(SETTINGS_FILE)
+    if mtime is None:
+        return {}
+    if _settings_cache is not None and _settings_cache[0] == mtime:
+        return _settings_cache[1]
+    try:
+        with open(SETTINGS_FILE, 'r') as f:
+            data = json.load(f)
+    except:
+        return {}
+    _settings_cache = (mtime, data)
+    return data
 
 
 async def check_database_health_for_env(env: str = "dev") -> Dict[str, Any]:
     """Check database health for a specific environment using settings/env"""
+    # Keyed on the settings.json mtime so an edit takes effect immediately
+    return await _database_health_cache.get(
+        ("env", env, _mtime_ns(SETTINGS_FILE)),
+        lambda: _probe_database_for_env(env)
+    )
+
+
+async def _probe_database_for_env(env: str) -> Dict[str, Any]:
+    """Run the database health probe behind check_database_health_for_env"""
     try:
-        import time
-        import psycopg2
-        
         start_time = time.time()
         
         # Try to get database URL from settings or .env
@@ -102,12 +227,10 @@ async def check_database_health_for_env(env: str = "dev") -> Dict[str, Any]:
             else:
                 database_url = f"postgresql://{user}@{host}:{port}/{database}?sslmode={ssl_mode}"
         
-        # Test connection
-        conn = psycopg2.connect(database_url, connect_timeout=5)
-        cursor = conn.cursor()
-        cursor.execute("SELECT 1")
-        cursor.close()
-        conn.close()
+        # Test connection over a pooled connection
+        pool = await get_pg_pool(database_url)
+        async with pool.acquire(timeout=DB_PROBE_TIMEOUT_SECONDS) as conn:
+            await conn.fetchval("SELECT 1", timeout=DB_PROBE_TIMEOUT_SECONDS)
         
         response_time = (time.time() - start_time) * 1000
         
@@ -135,13 +258,62 @@ async def check_database_health_for_env(env: str = "dev") -> Dict[str, Any]:
         }
 
 
+# Boot time never changes while the process runs
+_BOOT_TIME = psutil.boot_time()
+
+# How often the background task samples CPU usage
+CPU_SAMPLE_INTERVAL_SECONDS = 1.0
+_cpu_sampler_task: Optional[asyncio.Task] = None
+_last_cpu_percent: Optional[float] = None
+
+
+async def _cpu_sampler() -> None:
+    """Keep _last_cpu_percent current so health requests never wait for a sample"""
+    global _last_cpu_percent
+    # The first non-blocking call only primes psutil's counters
+    psutil.cpu_percent(interval=None)
+    while True:
+        await asyncio.sleep(CPU_SAMPLE_INTERVAL_SECONDS)
+        _last_cpu_percent = psutil.cpu_percent(interval=None)
+
+
+def start_cpu_sampler() -> asyncio.Task:
+    """Start the background CPU sampler (called on app startup)"""
+    global _cpu_sampler_task
+    if _cpu_sampler_task is None or _cpu_sampler_task.done():
+        _cpu_sampler_task = asyncio.create_task(_cpu_sampler())
+    return _cpu_sampler_task
+
+
+async def stop_cpu_sampler() -> None:
+    """Cancel the background CPU sampler (called on app shutdown)"""
+    global _cpu_sampler_task
+    if _cpu_sampler_task is not None:
+        _cpu_sampler_task.cancel()
+        await asyncio.gather(_cpu_sampler_task, return_exceptions=True)
+        _cpu_sampler_task = None
+
+
+def _read_uptime() -> float:
+    """Seconds since boot, from /proc/uptime where available"""
+    try:
+        with open("/proc/uptime") as f:
+            return float(f.read().split(None, 1)[0])
+    except (OSError, ValueError):
+        return time.time() - _BOOT_TIME
+
+
 async def get_server_health(env: str = "dev") -> ServerHealthResponse:
     """Get server health metrics including database status"""
     try:
-        cpu_percent = psutil.cpu_percent(interval=1)
+        cpu_percent = _last_cpu_percent
+        if cpu_percent is None:
+            # Sampler not running or not sampled yet: take a one-second sample
+            # without holding the event loop
+            cpu_percent = await asyncio.to_thread(psutil.cpu_percent, 1)
         memory = psutil.virtual_memory()
         disk = psutil.disk_usage('/')
-        uptime = datetime.utcnow().timestamp() - psutil.boot_time()
+        uptime = _read_uptime()
         
         return ServerHealthResponse(
             cpu_percent=cpu_percent,
@@ -152,7 +324,7 @@ async def get_server_health(env: str = "dev") -> ServerHealthResponse:
             disk_free=disk.free,
             disk_percent=disk.percent,
             uptime=uptime,
-            timestamp=datetime.utcnow()
+            timestamp=datetime.now(timezone.utc)
         )
     except Exception as e:
         # Return error response
@@ -165,12 +337,17 @@ async def get_server_health(env: str = "dev") -> ServerHealthResponse:
             disk_free=0,
             disk_percent=0.0,
             uptime=0.0,
-            timestamp=datetime.utcnow()
+            timestamp=datetime.now(timezone.utc)
         )
 
 
 async def get_database_health() -> DatabaseHealthResponse:
     """Get database connection health"""
+    return await _database_health_cache.get(("default", _mtime_ns(SETTINGS_FILE)), _probe_database)
+
+
+async def _probe_database() -> DatabaseHealthResponse:
+    """Run the database health probe behind get_database_health"""
     if not settings.DATABASE_URL:
         return DatabaseHealthResponse(
             connected=False,
@@ -181,41 +358,22 @@ async def get_database_health() -> DatabaseHealthResponse:
     start_time = datetime.utcnow()
     
     try:
-        import time
-        import psycopg2
-        
-        # Try to connect to database
-        conn = psycopg2.connect(settings.DATABASE_URL)
-        cursor = conn.cursor()
-        
-        # Basic connection test
-        cursor.execute("SELECT 1")
-        
-        # Get database version
-        cursor.execute("SELECT version()")
-        db_version = cursor.fetchone()[0]
-        
-        # Get database size
-        cursor.execute("""
-            SELECT pg_database_size(current_database())
-        """)
-        db_size = cursor.fetchone()[0]
-        
-        # Get number of connections
-        cursor.execute("""
-            SELECT count(*) FROM pg_stat_activity
-        """)
-        connection_count = cursor.fetchone()[0]
-        
-        # Get number of tables
-        cursor.execute("""
-            SELECT count(*) FROM information_schema.tables 
-            WHERE table_schema = 'public'
-        """)
-        table_count = cursor.fetchone()[0]
-        
-        cursor.close()
-        conn.close()
+        # Borrow a pooled connection to the database
+        pool = await get_pg_pool(settings.DATABASE_URL)
+        async with pool.acquire(timeout=DB_PROBE_TIMEOUT_SECONDS) as conn:
+            # Version, database size, number of connections and number of
+            # tables in one round trip. Tables are counted from pg_class
+            # (the relation kinds information_schema.tables lists) rather
+            # than through the information_schema views
+            db_version, db_size, connection_count, table_count = await conn.fetchrow("""
+                SELECT
+                    version(),
+                    pg_database_size(current_database()),
+                    (SELECT count(*) FROM pg_stat_activity),
+                    (SELECT count(*) FROM pg_catalog.pg_class
+                     WHERE relkind IN ('r', 'p', 'v', 'f')
+                       AND relnamespace = (SELECT oid FROM pg_catalog.pg_namespace WHERE nspname = 'public'))
+            """, timeout=DB_PROBE_TIMEOUT_SECONDS)
         
         end_time = datetime.utcnow()
         response_time = (end_time - start_time).total_seconds() * 1000
@@ -242,18 +400,29 @@ async def get_database_health() -> DatabaseHealthResponse:
         )
 
 
+# Shared Redis client; its connection pool is reused across health probes.
+# Constructing it doesn't connect, so it's safe at import time
+_redis_client = (
+    redis.Redis(host='localhost', port=6379, db=0, socket_connect_timeout=2)
+    if redis is not None else None
+)
+
+
 async def get_redis_health() -> RedisHealthResponse:
     """Get Redis connection health"""
+    return await _redis_health_cache.get(None, _probe_redis)
+
+
+async def _probe_redis() -> RedisHealthResponse:
+    """Run the Redis health probe behind get_redis_health"""
     try:
-        import time
-        import redis
+        if _redis_client is None:
+            raise RuntimeError("redis is not installed")
         
         start_time = time.time()
         
         # Try to connect to Redis (default localhost:6379)
-        r = redis.Redis(host='localhost', port=6379, db=0, socket_connect_timeout=2)
-        r.ping()
-        r.close()
+        _redis_client.ping()
         
         response_time = (time.time() - start_time) * 1000  # Convert to ms
         
@@ -270,42 +439,54 @@ async def get_redis_health() -> RedisHealthResponse:
         )
 
 
+async def _git_worktree_status(repo_dir: Path) -> str:
+    """Return "clean", "dirty", "error" or "unknown" for a git working tree"""
+    if not repo_dir.exists():
+        return "unknown"
+    try:
+        process = await asyncio.create_subprocess_exec(
+            "git", "status", "--porcelain", "-z",
+            cwd=str(repo_dir),
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+        try:
+            stdout, _ = await asyncio.wait_for(process.communicate(), timeout=5)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            raise
+    except Exception:
+        return "error"
+    if process.returncode != 0:
+        return "unknown"
+    # With -z there's no trailing newline or path quoting: any record at all
+    # means the tree is dirty
+    return "dirty" if stdout else "clean"
+
+
 async def get_environment_health() -> EnvironmentHealthResponse:
     """Get environment health status"""
+    return await _environment_health_cache.get(None, _probe_environment)
+
+
+async def _probe_environment() -> EnvironmentHealthResponse:
+    """Run the checks behind get_environment_health"""
     from config import get_environment_directory, get_pm2_app_name
     
-    dev_dir = Path(settings.DEV_DIR)
-    prod_dir = Path(settings.PROD_DIR)
-    app_dir = Path(settings.APP_DIR)
-    
-    # Check if directories exist
-    dev_env_exists = dev_dir.exists() and (dev_dir / ".env.local").exists()
-    prod_env_exists = prod_dir.exists() and (prod_dir / ".env.production").exists()
-    app_env_exists = app_dir.exists() and (app_dir / ".env.local").exists()
+    # One stat per env file; a missing directory fails the same stat
+    dev_env_exists = os.path.exists(_DEV_ENV_FILE)
+    prod_env_exists = os.path.exists(_PROD_ENV_FILE)
+    app_env_exists = os.path.exists(_APP_ENV_FILE)
     
-    # Check PM2 processes
-    pm2_dev_running = is_pm2_running(settings.PM2_DEV_APP)
-    pm2_prod_running = is_pm2_running(settings.PM2_PROD_APP)
-    pm2_app_running = is_pm2_running(settings.PM2_APP_APP)
-    
-    # Check git repo status
-    git_repo_status = "unknown"
-    if dev_dir.exists():
-        try:
-            result = subprocess.run(
-                ["git", "status", "--porcelain"],
-                cwd=str(dev_dir),
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            if result.returncode == 0:
-                if result.stdout.strip():
-                    git_repo_status = "dirty"
-                else:
-                    git_repo_status = "clean"
-        except:
-            git_repo_status = "error"
+    # Check PM2 processes and git repo status concurrently
+    pm2_dev_running, pm2_prod_running, pm2_app_running, git_repo_status = await asyncio.gather(
+        is_pm2_running(settings.PM2_DEV_APP),
+        is_pm2_running(settings.PM2_PROD_APP),
+        is_pm2_running(settings.PM2_APP_APP),
+        _git_worktree_status(_DEV_DIR)
+    )
     
     return EnvironmentHealthResponse(
         dev_env_exists=dev_env_exists,
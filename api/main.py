@@ -1,12 +1,22 @@
 """FastAPI main application for Build Dashboard API"""
-from fastapi import FastAPI, HTTPException, Depends, Header, status, UploadFile, File, Form
+from fastapi import FastAPI, HTTPException, Depends, Header, Request, Response, status, UploadFile, File, Form
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, FileResponse, ORJSONResponse, StreamingResponse
 from typing import Optional
 from pathlib import Path
+from datetime import datetime
+from types import MappingProxyType
 import uvicorn
 import os
+import re
+import time
+import hashlib
+import functools
+import asyncio
 import shutil
+import aiofiles
+import orjson
 
 from config import settings, get_environment_directory, get_pm2_app_name
 from models import (
@@ -20,9 +30,9 @@ from models import (
     ErrorResponse
 )
 from auth import request_otp, verify_otp, verify_session, cleanup_expired_sessions
-from git_ops import pull_from_git, get_available_branches, get_incoming_changes, check_buildmaster_repo_status, pull_with_env, push_to_buildmaster
+from git_ops import pull_from_git, get_available_branches, get_incoming_changes, check_buildmaster_repo_status, pull_with_env, pull_with_envs, push_to_buildmaster
 from pm2_ops import reload_pm2_app
-from build_ops import start_build, get_build_status, get_build_logs, get_build_history, check_active_build, kill_build
+from build_ops import start_build, get_build_status, get_build_logs, get_build_history, check_active_build, kill_build, stream_build_logs, get_build_log_path
 from build_dashboard_ops import install_build_dashboard, get_build_dashboard_status
 from system_metrics import get_system_metrics, get_build_metrics, handle_stalled_workers
 from deploy_ops import deploy_to_production
@@ -32,36 +42,25 @@ from health import (
     get_database_health,
     get_redis_health,
     get_environment_health,
-    check_database_health_for_env
+    check_database_health_for_env,
+    start_cpu_sampler,
+    stop_cpu_sampler,
+    AsyncTTLCache
 )
-from sanity_checker import run_sanity_check, SanityReport
 from git_status import (
     get_detailed_git_status,
     git_stash_changes,
     git_pop_stash,
+    git_stash_and_pull,
     git_clean_untracked,
-    git_clean_untracked_confirm
+    git_clean_untracked_confirm,
+    start_background_fetch,
+    stop_background_fetch
 )
 from git_commit_tracker import (
     get_environment_comparison,
     get_commit_timeline
 )
-from troubleshooting_ops import (
-    get_cache_status,
-    clear_cache,
-    get_redis_status,
-    clear_redis_cache,
-    get_package_versions,
-    get_pm2_logs,
-    get_system_logs,
-    test_connectivity,
-    analyze_env_file,
-    get_sql_migrations,
-    check_migration_applied,
-    execute_sql,
-    discover_vitest_tests,
-    run_vitest_tests
-)
 from settings_ops import (
     load_settings,
     save_settings,
@@ -83,6 +82,7 @@ from settings_ops import (
     scan_all_env_databases
 )
 from python_utils import format_python_command, get_python_env_with_encoding
+from email_service import drain_pending_notifications
 from buildmaster_ops import (
     load_buildmaster_settings,
     save_buildmaster_settings,
@@ -107,14 +107,18 @@ from db_service_ops import (
     restart_redis,
     run_postgres_maintenance,
     get_postgres_connections,
-    get_all_services_status
+    get_all_services_status,
+    get_pg_pool,
+    close_pg_pool
 )
 
 # Create FastAPI app
 app = FastAPI(
     title="Build Dashboard API",
     description="API for managing builds, deployments, and server operations",
-    version="1.0.0"
+    version="1.0.0",
+    # Endpoints return plain dicts; serialize them with orjson
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
@@ -129,6 +133,26 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+class StreamAwareGZipMiddleware(GZipMiddleware):
+    """GZip responses except live streams, which GZipMiddleware would buffer
+    until the stream ends"""
+
+    UNCOMPRESSED_PATH_RE = re.compile(r"^/api/build/logs/[^/]+/stream$")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and self.UNCOMPRESSED_PATH_RE.match(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+# Compress larger responses (build logs, script lists, history); small auth
+# and status replies aren't worth the CPU
+app.add_middleware(StreamAwareGZipMiddleware, minimum_size=1024, compresslevel=5)
+
+# Worker threads available to sync endpoints and to_thread calls
+THREADPOOL_SIZE = 100
+
 
 # Dependency for session verification
 async def verify_session_token(
@@ -141,15 +165,15 @@ async def verify_session_token(
             detail="Authorization header required"
         )
     
-    # Extract token (format: "Bearer <token>")
-    parts = authorization.split()
-    if len(parts) != 2 or parts[0].lower() != "bearer":
+    # Extract token (format: "Bearer <token>"), checking the scheme prefix
+    # in place instead of splitting the header
+    token = authorization[7:].strip()
+    if authorization[:7].lower() != "bearer " or not token or " " in token:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authorization format. Use: Bearer <token>"
         )
     
-    token = parts[1]
     email = verify_session(token)
     
     if not email:
@@ -161,16 +185,99 @@ async def verify_session_token(
     return email
 
 
+def etag_cached(endpoint):
+    """Add ETag / If-None-Match handling to a read-only GET endpoint.
+
+    The endpoint must declare a `request: Request` parameter. Its payload is
+    serialized once, hashed into the ETag, and a poll that already holds
+    that version gets an empty 304 instead of the body.
+
+    Args:
+        endpoint: Async endpoint returning a dict or a JSON Response
+
+    Returns:
+        Wrapped endpoint with the same signature
+    """
+    @functools.wraps(endpoint)
+    async def wrapper(*args, **kwargs):
+        request: Request = kwargs["request"]
+        result = await endpoint(*args, **kwargs)
+        if isinstance(result, Response):
+            if result.status_code != 200:
+                return result
+            body = result.body
+        else:
+            body = orjson.dumps(result, default=str)
+
+        etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+        # no-cache: the browser may keep the body but must revalidate on every
+        # request, so an edit shows up on the next poll
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    return wrapper
+
+
+# Results of expensive endpoints that several dashboard tabs poll at once.
+# Concurrent calls share one run, and its result is reused briefly
+SINGLEFLIGHT_TTL_SECONDS = 2.0
+_singleflight_cache = AsyncTTLCache(SINGLEFLIGHT_TTL_SECONDS)
+
+
+def singleflight(key: str):
+    """Coalesce concurrent calls of an endpoint whose result doesn't depend
+    on the caller.
+
+    Args:
+        key: Cache key shared by every call of the endpoint
+
+    Returns:
+        Decorator wrapping the endpoint with the same signature
+    """
+    def decorator(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            return await _singleflight_cache.get(key, lambda: endpoint(*args, **kwargs))
+        return wrapper
+    return decorator
+
+
 # Cleanup expired sessions on startup and initialize valid emails
 @app.on_event("startup")
 async def startup_event():
     cleanup_expired_sessions()
     # Initialize valid emails if not exists
     await initialize_valid_emails()
+    # Keep origin refs fresh so git status requests stay local
+    start_background_fetch()
+    # Sample CPU in the background so health requests don't wait a second
+    start_cpu_sampler()
+    # The file endpoints are plain `def` and run in anyio's threadpool;
+    # raise its limit so a burst of them doesn't queue behind 40 tokens
+    import anyio.to_thread
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    # Open the shared PostgreSQL pool up front so the first query doesn't
+    # pay for connecting; a database that's down must not block startup
+    if settings.DATABASE_URL:
+        try:
+            app.state.db_pool = await get_pg_pool()
+        except Exception as e:
+            print(f"PostgreSQL pool not available at startup: {e}")
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    # Let queued build notification emails finish before the loop closes
+    await drain_pending_notifications()
+    await stop_background_fetch()
+    await stop_cpu_sampler()
+    await close_pg_pool()
 
 
 # Authentication endpoints
-@app.post("/api/auth/request-otp", response_model=dict)
+@app.post("/api/auth/request-otp")
 async def request_otp_endpoint(request: OTPRequest):
     """Request OTP for authentication"""
     try:
@@ -185,8 +292,10 @@ async def request_otp_endpoint(request: OTPRequest):
         )
 
 
-@app.get("/api/database/env-config/{environment}", response_model=dict)
+@app.get("/api/database/env-config/{environment}")
+@etag_cached
 async def database_env_config_endpoint(
+    request: Request,
     environment: str,
     email: str = Depends(verify_session_token)
 ):
@@ -196,6 +305,7 @@ async def database_env_config_endpoint(
     currently configured. This is read-only and does not modify any files.
     """
     try:
+        from troubleshooting_ops import get_env_database_config
         if environment not in ("dev", "prod", "app"):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -215,7 +325,7 @@ async def database_env_config_endpoint(
         )
 
 
-@app.post("/api/database/dev/update-database-url", response_model=dict)
+@app.post("/api/database/dev/update-database-url")
 async def update_dev_database_url_endpoint(
     payload: dict,
     email: str = Depends(verify_session_token)
@@ -226,6 +336,7 @@ async def update_dev_database_url_endpoint(
     you repoint the dev environment to its own PostgreSQL database.
     """
     try:
+        from troubleshooting_ops import update_database_url
         database_url = payload.get("database_url")
         target_files = payload.get("files") or None
 
@@ -235,7 +346,7 @@ async def update_dev_database_url_endpoint(
                 detail="database_url is required"
             )
 
-        result = await update_dev_database_url(settings.DEV_DIR, database_url, target_files)
+        result = await update_database_url(settings.DEV_DIR, database_url, target_files)
         if result.get("error"):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -257,7 +368,7 @@ async def update_dev_database_url_endpoint(
         )
 
 
-@app.post("/api/auth/verify-otp", response_model=dict)
+@app.post("/api/auth/verify-otp")
 async def verify_otp_endpoint(request: OTPVerify):
     """Verify OTP and create session"""
     try:
@@ -277,13 +388,16 @@ async def verify_otp_endpoint(request: OTPVerify):
 
 
 # Git operations
-@app.get("/api/git/branches", response_model=dict)
+@app.get("/api/git/branches")
+@etag_cached
+@singleflight("git-branches")
 async def git_branches_endpoint(
+    request: Request,
     email: str = Depends(verify_session_token)
 ):
     """Get available git branches"""
     try:
-        branches = get_available_branches(settings.DEV_DIR)
+        branches = await get_available_branches(settings.DEV_DIR)
         return branches
     except Exception as e:
         raise HTTPException(
@@ -292,7 +406,7 @@ async def git_branches_endpoint(
         )
 
 
-@app.post("/api/git/pull", response_model=dict)
+@app.post("/api/git/pull")
 async def git_pull_endpoint(
     request: GitPullRequest,
     email: str = Depends(verify_session_token)
@@ -309,7 +423,7 @@ async def git_pull_endpoint(
 
 
 # PM2 operations
-@app.post("/api/pm2/dev/reload", response_model=dict)
+@app.post("/api/pm2/dev/reload")
 async def pm2_dev_reload_endpoint(
     email: str = Depends(verify_session_token)
 ):
@@ -325,7 +439,7 @@ async def pm2_dev_reload_endpoint(
 
 
 # Build operations
-@app.get("/api/build/active", response_model=dict)
+@app.get("/api/build/active")
 async def build_active_check_endpoint(
     email: str = Depends(verify_session_token)
 ):
@@ -400,7 +514,37 @@ async def build_logs_endpoint(
     return {"build_id": build_id, "logs": logs}
 
 
-@app.get("/api/build/history", response_model=dict)
+@app.get("/api/build/logs/{build_id}/stream")
+async def build_logs_stream_endpoint(
+    build_id: str,
+    lines: int = 100,
+    follow: bool = False,
+    email: str = Depends(verify_session_token)
+):
+    """Stream build logs as NDJSON, one {"line": ...} object per log line.
+
+    With follow=true the response stays open and tails the log until the
+    build is no longer running.
+    """
+    if not get_build_log_path(build_id).exists():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Logs for build {build_id} not found"
+        )
+    
+    async def ndjson_lines():
+        async for line in stream_build_logs(build_id, lines, follow):
+            yield orjson.dumps({"line": line.rstrip("\n")}) + b"\n"
+    
+    return StreamingResponse(
+        ndjson_lines(),
+        media_type="application/x-ndjson",
+        # Tell nginx not to buffer, so followed lines arrive as they're written
+        headers={"X-Build-Id": build_id, "X-Accel-Buffering": "no"}
+    )
+
+
+@app.get("/api/build/history")
 async def build_history_endpoint(
     limit: int = 20,
     email: str = Depends(verify_session_token)
@@ -410,7 +554,7 @@ async def build_history_endpoint(
     return {"history": history}
 
 
-@app.post("/api/build/kill/{build_id}", response_model=dict)
+@app.post("/api/build/kill/{build_id}")
 async def kill_build_endpoint(
     build_id: str,
     email: str = Depends(verify_session_token)
@@ -433,13 +577,15 @@ async def kill_build_endpoint(
         )
 
 
-@app.get("/api/build/changes-since-last", response_model=dict)
+@app.get("/api/build/changes-since-last")
+@singleflight("build-changes")
 async def build_changes_check_endpoint(
     email: str = Depends(verify_session_token)
 ):
     """Check if there are code changes since last build"""
     try:
-        changes = check_changes_since_last_build(settings.DEV_DIR)
+        # Runs git subprocesses; keep them off the event loop
+        changes = await asyncio.to_thread(check_changes_since_last_build, settings.DEV_DIR)
         return changes
     except Exception as e:
         raise HTTPException(
@@ -448,13 +594,15 @@ async def build_changes_check_endpoint(
         )
 
 
-@app.get("/api/build/disk-usage", response_model=dict)
+@app.get("/api/build/disk-usage")
+@singleflight("build-disk-usage")
 async def build_disk_usage_endpoint(
     email: str = Depends(verify_session_token)
 ):
     """Get disk usage for build artifacts"""
     try:
-        usage = get_build_disk_usage(settings.DEV_DIR)
+        # Runs du over .next and node_modules; keep it off the event loop
+        usage = await asyncio.to_thread(get_build_disk_usage, settings.DEV_DIR)
         return usage
     except Exception as e:
         raise HTTPException(
@@ -463,47 +611,178 @@ async def build_disk_usage_endpoint(
         )
 
 
-@app.get("/api/build/scripts", response_model=dict)
+async def _read_json_file(path: Path):
+    """Read and parse a JSON file without blocking the event loop"""
+    async with aiofiles.open(path, "rb") as f:
+        return orjson.loads(await f.read())
+
+
+async def _write_json_file(path: Path, data) -> None:
+    """Write data to a JSON file (2-space indent) without blocking the event loop"""
+    # Trailing newline matches what npm writes, so package.json diffs stay clean
+    async with aiofiles.open(path, "wb") as f:
+        await f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE))
+
+
+# Main build scripts shown by /api/build/scripts - consolidated list with V25 optimizations
+_MAIN_BUILD_SCRIPTS = MappingProxyType({
+    "build:server": {"desc": "Production build with PM2, Redis, Nginx (recommended)", "category": "production"},
+    "build:prod": {"desc": "Production build (same as build:server)", "category": "production"},
+    "build:quick": {"desc": "Quick build - skip PM2, Redis, deps install", "category": "quick"},
+    "build:clean": {"desc": "Clean build - removes .next cache before building", "category": "clean"},
+    "build:phased": {"desc": "Phased build - memory-safe for large projects", "category": "phased"},
+    "build:phased:prod": {"desc": "Phased production build with monitoring", "category": "phased"},
+    "build": {"desc": "Standard Next.js build", "category": "standard"},
+})
+
+# Build script metadata for /api/build/scripts/all
+_SCRIPT_METADATA = MappingProxyType({
+    "build": {"desc": "Standard Next.js build", "category": "standard", "timeout": 1800},
+    "build:server": {"desc": "Production build with PM2, Redis, Nginx", "category": "production", "timeout": 1800, "recommended": True},
+    "build:prod": {"desc": "Production build (same as build:server)", "category": "production", "timeout": 1800},
+    "build:quick": {"desc": "Quick build - skip PM2, Redis, deps", "category": "quick", "timeout": 600},
+    "build:clean": {"desc": "Clean build - removes .next cache", "category": "clean", "timeout": 2400},
+    "build:phased": {"desc": "Phased build - memory-safe for large projects", "category": "phased", "timeout": 2400},
+    "build:phased:prod": {"desc": "Phased production build with monitoring", "category": "phased", "timeout": 3000},
+    "dev": {"desc": "Start development server", "category": "development", "timeout": 0},
+    "start": {"desc": "Start production server", "category": "production", "timeout": 0},
+    "lint": {"desc": "Run ESLint", "category": "quality", "timeout": 300},
+    "test": {"desc": "Run tests", "category": "quality", "timeout": 600},
+})
+_DEFAULT_SCRIPT_METADATA = MappingProxyType({"desc": "", "category": "other", "timeout": 1800})
+
+# Everything the analyze endpoint looks for in a build command, matched in
+# a single pass. Groups that never match stay out of the found set
+_ANALYZE_RE = re.compile(
+    r'(?P<mem_flag>max-old-space-size)(?:=(?P<mem>\d+))?'
+    r'|(?P<node_env>NODE_ENV=)'
+    r'|(?P<turbo>--turbo)'
+    r'|(?P<clean>rimraf \.next|rm -rf \.next)'
+    r'|(?P<loop>while true|for \(;;\))'
+)
+
+# Custom build scripts stored by BuildMaster. Its directory is created by
+# config on import
+_CUSTOM_SCRIPTS_FILE = Path(settings.BUILD_DATA_DIR) / "custom_scripts.json"
+
+# One lock per JSON file the script endpoints read-modify-write. The API runs
+# a single worker, so an in-process lock is enough to keep concurrent saves
+# from dropping each other's changes
+_FILE_LOCKS: dict = {}
+
+
+def _lock_for(path) -> asyncio.Lock:
+    """Return the write lock for a file path"""
+    return _FILE_LOCKS.setdefault(str(path), asyncio.Lock())
+
+
+# Custom script timestamps are stored as epoch seconds and only turned into
+# ISO strings when a script is sent to the dashboard
+_SCRIPT_TIMESTAMP_FIELDS = ("created_at", "updated_at")
+
+
+def _render_custom_script(script: dict) -> dict:
+    """Return a copy of a stored custom script with ISO timestamps.
+
+    Args:
+        script: Script entry as stored in custom_scripts.json
+
+    Returns:
+        Copy of the entry; entries written before timestamps were stored
+        as numbers are passed through unchanged
+    """
+    rendered = dict(script)
+    for field in _SCRIPT_TIMESTAMP_FIELDS:
+        value = rendered.get(field)
+        if isinstance(value, (int, float)):
+            rendered[field] = datetime.utcfromtimestamp(value).isoformat()
+    return rendered
+
+
+# Parsed package.json files and the script lists built from them, keyed by
+# path and valid while the file's (mtime_ns, size) stamp is unchanged
+_package_json_cache: dict = {}
+_build_scripts_cache: dict = {}
+
+
+def _file_stamp(path: Path) -> Optional[tuple]:
+    """(mtime_ns, size) of path, or None if it doesn't exist"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+async def _load_package_json(path: Path, stamp: tuple) -> dict:
+    """Parsed package.json, re-read only when its stamp changes. Don't mutate the result"""
+    cached = _package_json_cache.get(str(path))
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    package_data = await _read_json_file(path)
+    _package_json_cache[str(path)] = (stamp, package_data)
+    return package_data
+
+
+# Config and env files the editor endpoints serve are small and re-read on
+# every open; keep up to 128 of them in memory, keyed by their stamp so a
+# save (or an outside edit) is picked up on the next read
+SMALL_FILE_CACHE_MAX_BYTES = 256 * 1024
+
+
+@functools.lru_cache(maxsize=128)
+def _read_small_text(path: str, mtime_ns: int, size: int) -> str:
+    """File contents; mtime_ns and size only make up the cache key"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def _read_text_cached(path: str) -> str:
+    """Read a UTF-8 text file, serving files up to 256 KB from the LRU"""
+    st = os.stat(path)
+    if st.st_size > SMALL_FILE_CACHE_MAX_BYTES:
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+    return _read_small_text(path, st.st_mtime_ns, st.st_size)
+
+
+@app.get("/api/build/scripts")
+@etag_cached
 async def build_scripts_endpoint(
+    request: Request,
     email: str = Depends(verify_session_token)
 ):
     """Get available build scripts from dev package.json - consolidated list"""
     try:
-        import json
         package_json_path = Path(settings.DEV_DIR) / "package.json"
         
-        if not package_json_path.exists():
+        stamp = _file_stamp(package_json_path)
+        if stamp is None:
             return {"scripts": [], "error": "package.json not found"}
         
-        with open(package_json_path, "r") as f:
-            package_data = json.load(f)
-        
-        all_scripts = package_data.get("scripts", {})
-        
-        # Only show the main build scripts - consolidated list with V25 optimizations
-        main_build_scripts = {
-            "build:server": {"desc": "Production build with PM2, Redis, Nginx (recommended)", "category": "production"},
-            "build:prod": {"desc": "Production build (same as build:server)", "category": "production"},
-            "build:quick": {"desc": "Quick build - skip PM2, Redis, deps install", "category": "quick"},
-            "build:clean": {"desc": "Clean build - removes .next cache before building", "category": "clean"},
-            "build:phased": {"desc": "Phased build - memory-safe for large projects", "category": "phased"},
-            "build:phased:prod": {"desc": "Phased production build with monitoring", "category": "phased"},
-            "build": {"desc": "Standard Next.js build", "category": "standard"},
-        }
-        
-        build_scripts = []
-        for name, meta in main_build_scripts.items():
-            if name in all_scripts:
-                build_scripts.append({
-                    "name": name,
-                    "command": all_scripts[name],
-                    "category": meta["category"],
-                    "description": meta["desc"],
-                    "recommended": name == "build:server"
-                })
-        
-        # Sort: recommended first
-        build_scripts.sort(key=lambda x: (not x['recommended'], x['name']))
+        cache_key = ("consolidated", str(package_json_path))
+        cached = _build_scripts_cache.get(cache_key)
+        if cached is not None and cached[0] == stamp:
+            build_scripts = cached[1]
+        else:
+            package_data = await _load_package_json(package_json_path, stamp)
+            
+            all_scripts = package_data.get("scripts", {})
+            
+            build_scripts = []
+            for name, meta in _MAIN_BUILD_SCRIPTS.items():
+                if name in all_scripts:
+                    build_scripts.append({
+                        "name": name,
+                        "command": all_scripts[name],
+                        "category": meta["category"],
+                        "description": meta["desc"],
+                        "recommended": name == "build:server"
+                    })
+            
+            # Sort: recommended first
+            build_scripts.sort(key=lambda x: (not x['recommended'], x['name']))
+            _build_scripts_cache[cache_key] = (stamp, build_scripts)
         
         return {
             "scripts": build_scripts,
@@ -517,62 +796,56 @@ async def build_scripts_endpoint(
         )
 
 
-@app.get("/api/build/scripts/all", response_model=dict)
+@app.get("/api/build/scripts/all")
+@etag_cached
 async def build_scripts_all_endpoint(
+    request: Request,
     environment: str = "dev",
     email: str = Depends(verify_session_token)
 ):
     """Get all build scripts from package.json with full details"""
     try:
-        import json
         project_dir = get_environment_directory(environment)
         package_json_path = Path(project_dir) / "package.json"
         
-        if not package_json_path.exists():
+        stamp = _file_stamp(package_json_path)
+        if stamp is None:
             return {"scripts": [], "error": "package.json not found"}
         
-        with open(package_json_path, "r") as f:
-            package_data = json.load(f)
-        
-        all_scripts = package_data.get("scripts", {})
-        
-        # Build script metadata
-        script_metadata = {
-            "build": {"desc": "Standard Next.js build", "category": "standard", "timeout": 1800},
-            "build:server": {"desc": "Production build with PM2, Redis, Nginx", "category": "production", "timeout": 1800, "recommended": True},
-            "build:prod": {"desc": "Production build (same as build:server)", "category": "production", "timeout": 1800},
-            "build:quick": {"desc": "Quick build - skip PM2, Redis, deps", "category": "quick", "timeout": 600},
-            "build:clean": {"desc": "Clean build - removes .next cache", "category": "clean", "timeout": 2400},
-            "build:phased": {"desc": "Phased build - memory-safe for large projects", "category": "phased", "timeout": 2400},
-            "build:phased:prod": {"desc": "Phased production build with monitoring", "category": "phased", "timeout": 3000},
-            "dev": {"desc": "Start development server", "category": "development", "timeout": 0},
-            "start": {"desc": "Start production server", "category": "production", "timeout": 0},
-            "lint": {"desc": "Run ESLint", "category": "quality", "timeout": 300},
-            "test": {"desc": "Run tests", "category": "quality", "timeout": 600},
-        }
-        
-        build_scripts = []
-        for name, command in all_scripts.items():
-            meta = script_metadata.get(name, {"desc": "", "category": "other", "timeout": 1800})
-            build_scripts.append({
-                "name": name,
-                "command": command,
-                "category": meta.get("category", "other"),
-                "description": meta.get("desc", ""),
-                "recommended": meta.get("recommended", False),
-                "timeout": meta.get("timeout", 1800),
-                "isCustom": False
-            })
-        
-        # Sort: recommended first, then by category
-        build_scripts.sort(key=lambda x: (not x['recommended'], x['category'], x['name']))
+        cache_key = ("all", str(package_json_path))
+        cached = _build_scripts_cache.get(cache_key)
+        if cached is not None and cached[0] == stamp:
+            build_scripts = cached[1]
+        else:
+            package_data = await _load_package_json(package_json_path, stamp)
+            
+            all_scripts = package_data.get("scripts", {})
+            
+            build_scripts = []
+            for name, command in all_scripts.items():
+                meta = _SCRIPT_METADATA.get(name, _DEFAULT_SCRIPT_METADATA)
+                build_scripts.append({
+                    "name": name,
+                    "command": command,
+                    "category": meta.get("category", "other"),
+                    "description": meta.get("desc", ""),
+                    "recommended": meta.get("recommended", False),
+                    "timeout": meta.get("timeout", 1800),
+                    "isCustom": False
+                })
+            
+            # Sort: recommended first, then by category
+            build_scripts.sort(key=lambda x: (not x['recommended'], x['category'], x['name']))
+            _build_scripts_cache[cache_key] = (stamp, build_scripts)
         
-        return {
+        # Only strings, numbers and booleans: hand it to orjson directly
+        # instead of running it through FastAPI's encoder first
+        return ORJSONResponse({
             "scripts": build_scripts,
             "default": "build:server",
             "path": project_dir,
             "environment": environment
-        }
+        })
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -580,21 +853,22 @@ async def build_scripts_all_endpoint(
         )
 
 
-@app.get("/api/build/scripts/custom", response_model=dict)
+@app.get("/api/build/scripts/custom")
+@etag_cached
 async def build_scripts_custom_endpoint(
+    request: Request,
     email: str = Depends(verify_session_token)
 ):
     """Get custom build scripts stored in BuildMaster"""
     try:
-        custom_scripts_file = Path(settings.BUILD_DATA_DIR) / "custom_scripts.json"
+        custom_scripts_file = _CUSTOM_SCRIPTS_FILE
         
-        if not custom_scripts_file.exists():
+        if not os.path.exists(custom_scripts_file):
             return {"scripts": []}
         
-        with open(custom_scripts_file, "r") as f:
-            data = json.load(f)
+        data = await _read_json_file(custom_scripts_file)
         
-        return {"scripts": data.get("scripts", [])}
+        return {"scripts": [_render_custom_script(s) for s in data.get("scripts", [])]}
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -602,7 +876,7 @@ async def build_scripts_custom_endpoint(
         )
 
 
-@app.post("/api/build/scripts/create", response_model=dict)
+@app.post("/api/build/scripts/create")
 async def build_scripts_create_endpoint(
     payload: dict,
     email: str = Depends(verify_session_token)
@@ -621,38 +895,36 @@ async def build_scripts_create_endpoint(
             raise HTTPException(status_code=400, detail="Invalid script name format")
         
         # Load existing custom scripts
-        custom_scripts_file = Path(settings.BUILD_DATA_DIR) / "custom_scripts.json"
-        custom_scripts_file.parent.mkdir(parents=True, exist_ok=True)
+        custom_scripts_file = _CUSTOM_SCRIPTS_FILE
         
-        if custom_scripts_file.exists():
-            with open(custom_scripts_file, "r") as f:
-                data = json.load(f)
-        else:
-            data = {"scripts": []}
+        async with _lock_for(custom_scripts_file):
+            if os.path.exists(custom_scripts_file):
+                data = await _read_json_file(custom_scripts_file)
+            else:
+                data = {"scripts": []}
         
-        # Check for duplicate
-        if any(s["name"] == name for s in data["scripts"]):
-            raise HTTPException(status_code=400, detail=f"Script '{name}' already exists")
+            # Check for duplicate
+            if any(s["name"] == name for s in data["scripts"]):
+                raise HTTPException(status_code=400, detail=f"Script '{name}' already exists")
         
-        # Format Python commands to include UTF-8 encoding
-        formatted_command = format_python_command(command)
+            # Format Python commands to include UTF-8 encoding
+            formatted_command = format_python_command(command)
         
-        # Add new script
-        new_script = {
-            "name": name,
-            "command": formatted_command,
-            "description": description,
-            "category": "custom",
-            "isCustom": True,
-            "created_at": datetime.utcnow().isoformat(),
-            "created_by": email
-        }
-        data["scripts"].append(new_script)
+            # Add new script
+            new_script = {
+                "name": name,
+                "command": formatted_command,
+                "description": description,
+                "category": "custom",
+                "isCustom": True,
+                "created_at": time.time(),
+                "created_by": email
+            }
+            data["scripts"].append(new_script)
         
-        with open(custom_scripts_file, "w") as f:
-            json.dump(data, f, indent=2)
+            await _write_json_file(custom_scripts_file, data)
         
-        return {"success": True, "script": new_script}
+        return {"success": True, "script": _render_custom_script(new_script)}
     except HTTPException:
         raise
     except Exception as e:
@@ -662,7 +934,7 @@ async def build_scripts_create_endpoint(
         )
 
 
-@app.post("/api/build/scripts/save", response_model=dict)
+@app.post("/api/build/scripts/save")
 async def build_scripts_save_endpoint(
     payload: dict,
     email: str = Depends(verify_session_token)
@@ -677,49 +949,49 @@ async def build_scripts_save_endpoint(
         if not name or not command:
             raise HTTPException(status_code=400, detail="Name and command are required")
         
-        # Check if it's a custom script
-        custom_scripts_file = Path(settings.BUILD_DATA_DIR) / "custom_scripts.json"
-        is_custom = False
-        
-        if custom_scripts_file.exists():
-            with open(custom_scripts_file, "r") as f:
-                custom_data = json.load(f)
-            
-            for script in custom_data.get("scripts", []):
-                if script["name"] == name:
-                    is_custom = True
-                    # Format Python commands to include UTF-8 encoding
-                    formatted_command = format_python_command(command)
-                    script["command"] = formatted_command
-                    script["description"] = description
-                    script["updated_at"] = datetime.utcnow().isoformat()
-                    script["updated_by"] = email
-                    break
-            
-            if is_custom:
-                with open(custom_scripts_file, "w") as f:
-                    json.dump(custom_data, f, indent=2)
-                return {"success": True, "message": f"Custom script '{name}' updated"}
-        
-        # Update package.json
         project_dir = get_environment_directory(environment)
         package_json_path = Path(project_dir) / "package.json"
         
-        if not package_json_path.exists():
-            raise HTTPException(status_code=404, detail="package.json not found")
-        
-        with open(package_json_path, "r") as f:
-            package_data = json.load(f)
-        
-        if "scripts" not in package_data:
-            package_data["scripts"] = {}
+        # Fast path: a script package.json already defines is saved there
+        # without opening custom_scripts.json, so a custom entry with the
+        # same name can't shadow it
+        stamp = _file_stamp(package_json_path)
+        is_package_script = False
+        if stamp is not None:
+            package_data = await _load_package_json(package_json_path, stamp)
+            is_package_script = name in package_data.get("scripts", {})
         
         # Format Python commands to include UTF-8 encoding
         formatted_command = format_python_command(command)
-        package_data["scripts"][name] = formatted_command
         
-        with open(package_json_path, "w") as f:
-            json.dump(package_data, f, indent=2)
+        # Check if it's a custom script
+        custom_scripts_file = _CUSTOM_SCRIPTS_FILE
+        if not is_package_script and os.path.exists(custom_scripts_file):
+            async with _lock_for(custom_scripts_file):
+                custom_data = await _read_json_file(custom_scripts_file)
+                
+                for script in custom_data.get("scripts", []):
+                    if script["name"] == name:
+                        script["command"] = formatted_command
+                        script["description"] = description
+                        script["updated_at"] = time.time()
+                        script["updated_by"] = email
+                        await _write_json_file(custom_scripts_file, custom_data)
+                        return {"success": True, "message": f"Custom script '{name}' updated"}
+        
+        # Update package.json
+        if stamp is None:
+            raise HTTPException(status_code=404, detail="package.json not found")
+        
+        async with _lock_for(package_json_path):
+            # Re-stat under the lock; the cached dict is shared, so edit a copy
+            stamp = _file_stamp(package_json_path)
+            if stamp is None:
+                raise HTTPException(status_code=404, detail="package.json not found")
+            package_data = dict(await _load_package_json(package_json_path, stamp))
+            package_data["scripts"] = {**package_data.get("scripts", {}), name: formatted_command}
+            
+            await _write_json_file(package_json_path, package_data)
         
         return {"success": True, "message": f"Script '{name}' saved to package.json"}
     except HTTPException:
@@ -731,29 +1003,28 @@ async def build_scripts_save_endpoint(
         )
 
 
-@app.delete("/api/build/scripts/{script_name}", response_model=dict)
+@app.delete("/api/build/scripts/{script_name}")
 async def build_scripts_delete_endpoint(
     script_name: str,
     email: str = Depends(verify_session_token)
 ):
     """Delete a custom build script"""
     try:
-        custom_scripts_file = Path(settings.BUILD_DATA_DIR) / "custom_scripts.json"
+        custom_scripts_file = _CUSTOM_SCRIPTS_FILE
         
-        if not custom_scripts_file.exists():
+        if not os.path.exists(custom_scripts_file):
             raise HTTPException(status_code=404, detail="Script not found")
         
-        with open(custom_scripts_file, "r") as f:
-            data = json.load(f)
+        async with _lock_for(custom_scripts_file):
+            data = await _read_json_file(custom_scripts_file)
         
-        original_count = len(data.get("scripts", []))
-        data["scripts"] = [s for s in data.get("scripts", []) if s["name"] != script_name]
+            original_count = len(data.get("scripts", []))
+            data["scripts"] = [s for s in data.get("scripts", []) if s["name"] != script_name]
         
-        if len(data["scripts"]) == original_count:
-            raise HTTPException(status_code=404, detail="Script not found or cannot be deleted")
+            if len(data["scripts"]) == original_count:
+                raise HTTPException(status_code=404, detail="Script not found or cannot be deleted")
         
-        with open(custom_scripts_file, "w") as f:
-            json.dump(data, f, indent=2)
+            await _write_json_file(custom_scripts_file, data)
         
         return {"success": True, "message": f"Script '{script_name}' deleted"}
     except HTTPException:
@@ -765,7 +1036,7 @@ async def build_scripts_delete_endpoint(
         )
 
 
-@app.post("/api/build/scripts/analyze", response_model=dict)
+@app.post("/api/build/scripts/analyze")
 async def build_scripts_analyze_endpoint(
     payload: dict,
     email: str = Depends(verify_session_token)
@@ -782,8 +1053,21 @@ async def build_scripts_analyze_endpoint(
         memory_estimate = "4-8 GB"
         risk_level = "low"
         
+        # One pass over the command collects every marker we check below
+        found = set()
+        mem_size = None
+        for match in _ANALYZE_RE.finditer(command):
+            if match.group("mem_flag"):
+                found.add("mem_flag")
+                if match.group("mem") and mem_size is None:
+                    mem_size = int(match.group("mem"))
+            else:
+                found.add(match.lastgroup)
+        has_mem_limit = "mem_flag" in found
+        has_node_env = "node_env" in found
+        
         # Analyze memory settings
-        if "max-old-space-size" not in command:
+        if not has_mem_limit:
             suggestions.append({
                 "type": "warning",
                 "title": "No memory limit set",
@@ -791,23 +1075,19 @@ async def build_scripts_analyze_endpoint(
                 "fix": 'Add NODE_OPTIONS="--max-old-space-size=8192"',
                 "impact": "high"
             })
-        else:
-            import re
-            mem_match = re.search(r'max-old-space-size=(\d+)', command)
-            if mem_match:
-                mem_size = int(mem_match.group(1))
-                memory_estimate = f"{mem_size // 1024} GB"
-                if mem_size < 4096:
-                    suggestions.append({
-                        "type": "warning",
-                        "title": "Low memory limit",
-                        "description": f"{mem_size}MB may not be enough for large builds",
-                        "fix": "Increase to at least 4096 or 8192",
-                        "impact": "medium"
-                    })
+        elif mem_size is not None:
+            memory_estimate = f"{mem_size // 1024} GB"
+            if mem_size < 4096:
+                suggestions.append({
+                    "type": "warning",
+                    "title": "Low memory limit",
+                    "description": f"{mem_size}MB may not be enough for large builds",
+                    "fix": "Increase to at least 4096 or 8192",
+                    "impact": "medium"
+                })
         
         # Check NODE_ENV
-        if "NODE_ENV=" not in command:
+        if not has_node_env:
             suggestions.append({
                 "type": "error",
                 "title": "NODE_ENV not set",
@@ -818,7 +1098,7 @@ async def build_scripts_analyze_endpoint(
             risk_level = "medium"
         
         # Check for turbo
-        if "--turbo" in command:
+        if "turbo" in found:
             suggestions.append({
                 "type": "warning",
                 "title": "Turbopack is experimental",
@@ -829,7 +1109,7 @@ async def build_scripts_analyze_endpoint(
             estimated_time = "5-10 min"
         
         # Check for cache clearing
-        if "rimraf .next" in command or "rm -rf .next" in command:
+        if "clean" in found:
             suggestions.append({
                 "type": "info",
                 "title": "Cache will be cleared",
@@ -840,10 +1120,10 @@ async def build_scripts_analyze_endpoint(
         
         # Sanity checks
         sanity_checks = [
-            {"name": "Memory Limit", "passed": "max-old-space-size" in command, "message": "Memory limit configured" if "max-old-space-size" in command else "No memory limit"},
-            {"name": "Environment", "passed": "NODE_ENV=" in command, "message": "NODE_ENV set" if "NODE_ENV=" in command else "NODE_ENV not set"},
+            {"name": "Memory Limit", "passed": has_mem_limit, "message": "Memory limit configured" if has_mem_limit else "No memory limit"},
+            {"name": "Environment", "passed": has_node_env, "message": "NODE_ENV set" if has_node_env else "NODE_ENV not set"},
             {"name": "Timeout Protection", "passed": True, "message": "BuildMaster enforces 30-min timeout"},
-            {"name": "Loop Safety", "passed": "while true" not in command and "for (;;)" not in command, "message": "No dangerous loops detected"}
+            {"name": "Loop Safety", "passed": "loop" not in found, "message": "No dangerous loops detected"}
         ]
         
         if not suggestions:
@@ -873,8 +1153,8 @@ async def build_scripts_analyze_endpoint(
         )
 
 
-@app.get("/api/build/scripts/mjs", response_model=dict)
-async def build_scripts_mjs_endpoint(
+@app.get("/api/build/scripts/mjs")
+def build_scripts_mjs_endpoint(
     environment: str = "dev",
     email: str = Depends(verify_session_token)
 ):
@@ -957,8 +1237,8 @@ async def build_scripts_mjs_endpoint(
         )
 
 
-@app.get("/api/build/scripts/env", response_model=dict)
-async def build_scripts_env_endpoint(
+@app.get("/api/build/scripts/env")
+def build_scripts_env_endpoint(
     environment: str = "dev",
     email: str = Depends(verify_session_token)
 ):
@@ -1013,8 +1293,8 @@ async def build_scripts_env_endpoint(
         )
 
 
-@app.get("/api/build/scripts/env/content", response_model=dict)
-async def build_scripts_env_content_endpoint(
+@app.get("/api/build/scripts/env/content")
+def build_scripts_env_content_endpoint(
     path: str,
     email: str = Depends(verify_session_token)
 ):
@@ -1038,8 +1318,7 @@ async def build_scripts_env_content_endpoint(
         if not basename.startswith('.env'):
             raise HTTPException(status_code=400, detail="Only .env files are allowed")
         
-        with open(abs_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        content = _read_text_cached(abs_path)
         
         return {
             "content": content,
@@ -1055,8 +1334,8 @@ async def build_scripts_env_content_endpoint(
         )
 
 
-@app.post("/api/build/scripts/env/save", response_model=dict)
-async def build_scripts_env_save_endpoint(
+@app.post("/api/build/scripts/env/save")
+def build_scripts_env_save_endpoint(
     payload: dict,
     email: str = Depends(verify_session_token)
 ):
@@ -1110,8 +1389,8 @@ async def build_scripts_env_save_endpoint(
         )
 
 
-@app.get("/api/build/scripts/mjs/content", response_model=dict)
-async def build_scripts_mjs_content_endpoint(
+@app.get("/api/build/scripts/mjs/content")
+def build_scripts_mjs_content_endpoint(
     path: str,
     email: str = Depends(verify_session_token)
 ):
@@ -1136,8 +1415,7 @@ async def build_scripts_mjs_content_endpoint(
         if not any(abs_path.endswith(ext) for ext in allowed_extensions):
             raise HTTPException(status_code=400, detail=f"Only config files are allowed: {', '.join(allowed_extensions)}")
         
-        with open(abs_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        content = _read_text_cached(abs_path)
         
         return {
             "content": content,
@@ -1154,8 +1432,8 @@ async def build_scripts_mjs_content_endpoint(
         )
 
 
-@app.post("/api/build/scripts/mjs/save", response_model=dict)
-async def build_scripts_mjs_save_endpoint(
+@app.post("/api/build/scripts/mjs/save")
+def build_scripts_mjs_save_endpoint(
     payload: dict,
     email: str = Depends(verify_session_token)
 ):
@@ -1210,7 +1488,7 @@ async def build_scripts_mjs_save_endpoint(
 
 
 # Deploy operations
-@app.post("/api/deploy/golive", response_model=dict)
+@app.post("/api/deploy/golive")
 async def deploy_golive_endpoint(
     request: DeployGoLiveRequest,
     email: str = Depends(verify_session_token)
@@ -1227,7 +1505,7 @@ async def deploy_golive_endpoint(
 
 
 # Health check endpoints
-@app.get("/api/health/server", response_model=dict)
+@app.get("/api/health/server")
 async def health_server_endpoint(
     env: str = "dev",
     email: str = Depends(verify_session_token)
@@ -1236,7 +1514,11 @@ async def health_server_endpoint(
     import psutil
     
     try:
-        health = await get_server_health()
+        # Server metrics and the database probe are independent
+        health, db_health = await asyncio.gather(
+            get_server_health(),
+            check_database_health_for_env(env)
+        )
         
         # Get CPU cores
         cpu_cores = psutil.cpu_count(logical=True) or 0
@@ -1267,7 +1549,6 @@ async def health_server_endpoint(
         }
         
         # Add database health for the specified environment
-        db_health = await check_database_health_for_env(env)
         response["database"] = db_health
         
         return response
@@ -1278,7 +1559,7 @@ async def health_server_endpoint(
         )
 
 
-@app.get("/api/health/database", response_model=dict)
+@app.get("/api/health/database")
 async def health_database_endpoint(
     email: str = Depends(verify_session_token)
 ):
@@ -1293,7 +1574,7 @@ async def health_database_endpoint(
         )
 
 
-@app.get("/api/health/redis", response_model=dict)
+@app.get("/api/health/redis")
 async def health_redis_endpoint(
     email: str = Depends(verify_session_token)
 ):
@@ -1308,7 +1589,7 @@ async def health_redis_endpoint(
         )
 
 
-@app.get("/api/health/environment", response_model=dict)
+@app.get("/api/health/environment")
 async def health_environment_endpoint(
     email: str = Depends(verify_session_token)
 ):
@@ -1323,8 +1604,31 @@ async def health_environment_endpoint(
         )
 
 
+@app.get("/api/health/all")
+async def health_all_endpoint(
+    email: str = Depends(verify_session_token)
+):
+    """Get server, database, Redis and environment health in one round trip"""
+    # The probes are independent, so their latencies overlap
+    results = await asyncio.gather(
+        get_server_health(),
+        get_database_health(),
+        get_redis_health(),
+        get_environment_health(),
+        return_exceptions=True
+    )
+
+    response = {}
+    for name, result in zip(("server", "database", "redis", "environment"), results):
+        if isinstance(result, Exception):
+            response[name] = {"error": str(result)}
+        else:
+            response[name] = result.dict()
+    return response
+
+
 # Database service management endpoints
-@app.get("/api/services/status", response_model=dict)
+@app.get("/api/services/status")
 async def services_status_endpoint(
     email: str = Depends(verify_session_token)
 ):
@@ -1338,7 +1642,7 @@ async def services_status_endpoint(
         )
 
 
-@app.get("/api/services/postgres/status", response_model=dict)
+@app.get("/api/services/postgres/status")
 async def postgres_status_endpoint(
     email: str = Depends(verify_session_token)
 ):
@@ -1352,13 +1656,14 @@ async def postgres_status_endpoint(
         )
 
 
-@app.post("/api/services/postgres/start", response_model=dict)
+@app.post("/api/services/postgres/start")
 async def postgres_start_endpoint(
+    include_status: bool = False,
     email: str = Depends(verify_session_token)
 ):
     """Start PostgreSQL service"""
     try:
-        return await start_postgres()
+        return await start_postgres(include_status)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -1366,7 +1671,7 @@ async def postgres_start_endpoint(
         )
 
 
-@app.post("/api/services/postgres/stop", response_model=dict)
+@app.post("/api/services/postgres/stop")
 async def postgres_stop_endpoint(
     email: str = Depends(verify_session_token)
 ):
@@ -1380,13 +1685,14 @@ async def postgres_stop_endpoint(
         )
 
 
-@app.post("/api/services/postgres/restart", response_model=dict)
+@app.post("/api/services/postgres/restart")
 async def postgres_restart_endpoint(
+    include_status: bool = False,
     email: str = Depends(verify_session_token)
 ):
     """Restart PostgreSQL service"""
     try:
-        return await restart_postgres()
+        return await restart_postgres(include_status)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -1394,7 +1700,7 @@ async def postgres_restart_endpoint(
         )
 
 
-@app.post("/api/services/postgres/maintenance", response_model=dict)
+@app.post("/api/services/postgres/maintenance")
 async def postgres_maintenance_endpoint(
     email: str = Depends(verify_session_token)
 ):
@@ -1408,7 +1714,7 @@ async def postgres_maintenance_endpoint(
         )
 
 
-@app.get("/api/services/postgres/connections", response_model=dict)
+@app.get("/api/services/postgres/connections")
 async def postgres_connections_endpoint(
     email: str = Depends(verify_session_token)
 ):
@@ -1422,7 +1728,7 @@ async def postgres_connections_endpoint(
         )
 
 
-@app.get("/api/services/redis/status", response_model=dict)
+@app.get("/api/services/redis/status")
 async def redis_service_status_endpoint(
     email: str = Depends(verify_session_token)
 ):
@@ -1436,13 +1742,14 @@ async def redis_service_status_endpoint(
         )
 
 
-@app.post("/api/services/redis/start", response_model=dict)
+@app.post("/api/services/redis/start")
 async def redis_start_endpoint(
+    include_status: bool = False,
     email: str = Depends(verify_session_token)
 ):
     """Start Redis service"""
     try:
-        return await start_redis()
+        return await start_redis(include_status)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -1450,7 +1757,7 @@ async def redis_start_endpoint(
         )
 
 
-@app.post("/api/services/redis/stop", response_model=dict)
+@app.post("/api/services/redis/stop")
 async def redis_stop_endpoint(
     email: str = Depends(verify_session_token)
 ):
@@ -1464,13 +1771,14 @@ async def redis_stop_endpoint(
         )
 
 
-@app.post("/api/services/redis/restart", response_model=dict)
+@app.post("/api/services/redis/restart")
 async def redis_restart_endpoint(
+    include_status: bool = False,
     email: str = Depends(verify_session_token)
 ):
     """Restart Redis service"""
     try:
-        return await restart_redis()
+        return await restart_redis(include_status)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -1479,13 +1787,14 @@ async def redis_restart_endpoint(
 
 
 # Git status endpoints
-@app.get("/api/git/status/detailed", response_model=dict)
+@app.get("/api/git/status/detailed")
 async def git_status_detailed_endpoint(
+    force_refresh: bool = False,
     email: str = Depends(verify_session_token)
 ):
     """Get detailed git status with file changes and suggestions"""
     try:
-        status_info = await get_detailed_git_status()
+        status_info = await get_detailed_git_status(force_refresh)
         return status_info
     except Exception as e:
         raise HTTPException(
@@ -1494,7 +1803,7 @@ async def git_status_detailed_endpoint(
         )
 
 
-@app.post("/api/git/stash", response_model=dict)
+@app.post("/api/git/stash")
 async def git_stash_endpoint(
     email: str = Depends(verify_session_token)
 ):
@@ -1509,7 +1818,7 @@ async def git_stash_endpoint(
         )
 
 
-@app.post("/api/git/stash/pop", response_model=dict)
+@app.post("/api/git/stash/pop")
 async def git_stash_pop_endpoint(
     email: str = Depends(verify_session_token)
 ):
@@ -1524,7 +1833,22 @@ async def git_stash_pop_endpoint(
         )
 
 
-@app.post("/api/git/clean", response_model=dict)
+@app.post("/api/git/stash-and-pull")
+async def git_stash_and_pull_endpoint(
+    email: str = Depends(verify_session_token)
+):
+    """Stash local changes, pull latest and re-apply them"""
+    try:
+        result = await git_stash_and_pull()
+        return result
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+
+@app.post("/api/git/clean")
 async def git_clean_endpoint(
     email: str = Depends(verify_session_token)
 ):
@@ -1539,7 +1863,7 @@ async def git_clean_endpoint(
         )
 
 
-@app.post("/api/git/clean/confirm", response_model=dict)
+@app.post("/api/git/clean/confirm")
 async def git_clean_confirm_endpoint(
     email: str = Depends(verify_session_token)
 ):
@@ -1555,7 +1879,7 @@ async def git_clean_confirm_endpoint(
 
 
 # Git commit tracking endpoints
-@app.get("/api/git/environment-comparison", response_model=dict)
+@app.get("/api/git/environment-comparison")
 async def git_environment_comparison_endpoint(
     email: str = Depends(verify_session_token)
 ):
@@ -1570,7 +1894,7 @@ async def git_environment_comparison_endpoint(
         )
 
 
-@app.get("/api/git/commit-timeline", response_model=dict)
+@app.get("/api/git/commit-timeline")
 async def git_commit_timeline_endpoint(
     email: str = Depends(verify_session_token)
 ):
@@ -1586,7 +1910,7 @@ async def git_commit_timeline_endpoint(
 
 
 # BuildMaster Git Pull endpoints
-@app.get("/api/git/preview-pull", response_model=dict)
+@app.get("/api/git/preview-pull")
 async def git_preview_pull_endpoint(
     env: str = "dev",
     email: str = Depends(verify_session_token)
@@ -1594,11 +1918,11 @@ async def git_preview_pull_endpoint(
     """Preview incoming changes before pulling"""
     try:
         working_dir = settings.DEV_DIR if env == "dev" else settings.PROD_DIR
-        result = get_incoming_changes(working_dir)
+        result = await get_incoming_changes(working_dir)
         
         # If there are BuildMaster files, check their status
         if result.get("success") and result.get("buildmaster_files"):
-            bm_status = check_buildmaster_repo_status(result["buildmaster_files"])
+            bm_status = await check_buildmaster_repo_status(result["buildmaster_files"])
             result["buildmaster_status"] = bm_status
         
         result["env"] = env
@@ -1610,7 +1934,7 @@ async def git_preview_pull_endpoint(
         )
 
 
-@app.post("/api/git/pull-env", response_model=dict)
+@app.post("/api/git/pull-env")
 async def git_pull_env_endpoint(
     env: str = "dev",
     branch: str = None,
@@ -1629,7 +1953,32 @@ async def git_pull_env_endpoint(
         )
 
 
-@app.post("/api/git/push-buildmaster", response_model=dict)
+@app.post("/api/git/pull-envs")
+async def git_pull_envs_endpoint(
+    envs: str = "dev,prod",
+    branch: str = None,
+    stash: bool = False,
+    force: bool = False,
+    email: str = Depends(verify_session_token)
+):
+    """Pull several environments (comma-separated) side by side without auto-restart"""
+    env_list = [e.strip() for e in envs.split(",") if e.strip()]
+    if not env_list:
+        return {"success": False, "error": "No environments given"}
+    try:
+        results = await pull_with_envs(env_list, branch, stash, force)
+        return {
+            "success": all(r.get("success") for r in results.values()),
+            "results": results
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+
+@app.post("/api/git/push-buildmaster")
 async def git_push_buildmaster_endpoint(
     commit_message: str = None,
     email: str = Depends(verify_session_token)
@@ -1645,7 +1994,7 @@ async def git_push_buildmaster_endpoint(
         )
 
 
-@app.post("/api/pm2/restart", response_model=dict)
+@app.post("/api/pm2/restart")
 async def pm2_restart_endpoint(
     env: str = "dev",
     email: str = Depends(verify_session_token)
@@ -1662,7 +2011,7 @@ async def pm2_restart_endpoint(
         )
 
 
-@app.get("/api/git/local-changes", response_model=dict)
+@app.get("/api/git/local-changes")
 async def git_local_changes_endpoint(
     env: str = "dev",
     email: str = Depends(verify_session_token)
@@ -1681,7 +2030,7 @@ async def git_local_changes_endpoint(
         )
 
 
-@app.post("/api/git/reset-files", response_model=dict)
+@app.post("/api/git/reset-files")
 async def git_reset_files_endpoint(
     env: str = "dev",
     files: list = None,
@@ -1702,7 +2051,7 @@ async def git_reset_files_endpoint(
         )
 
 
-@app.post("/api/git/force-sync", response_model=dict)
+@app.post("/api/git/force-sync")
 async def git_force_sync_endpoint(
     env: str = "dev",
     email: str = Depends(verify_session_token)
@@ -1722,7 +2071,7 @@ async def git_force_sync_endpoint(
 
 
 # Build Dashboard update endpoints
-@app.post("/api/build-dashboard/install", response_model=dict)
+@app.post("/api/build-dashboard/install")
 async def build_dashboard_install_endpoint(
     email: str = Depends(verify_session_token)
 ):
@@ -1744,7 +2093,7 @@ async def build_dashboard_install_endpoint(
         )
 
 
-@app.get("/api/build-dashboard/status", response_model=dict)
+@app.get("/api/build-dashboard/status")
 async def build_dashboard_status_endpoint(
     email: str = Depends(verify_session_token)
 ):
@@ -1760,7 +2109,7 @@ async def build_dashboard_status_endpoint(
 
 
 # System metrics endpoints
-@app.get("/api/system/metrics", response_model=dict)
+@app.get("/api/system/metrics")
 async def system_metrics_endpoint(
     email: str = Depends(verify_session_token)
 ):
@@ -1775,7 +2124,7 @@ async def system_metrics_endpoint(
         )
 
 
-@app.get("/api/build/metrics", response_model=dict)
+@app.get("/api/build/metrics")
 async def build_metrics_endpoint(
     build_id: Optional[str] = None,
     email: str = Depends(verify_session_token)
@@ -1791,7 +2140,7 @@ async def build_metrics_endpoint(
         )
 
 
-@app.post("/api/workers/handle-stalled", response_model=dict)
+@app.post("/api/workers/handle-stalled")
 async def handle_stalled_workers_endpoint(
     email: str = Depends(verify_session_token)
 ):
@@ -1811,13 +2160,14 @@ async def handle_stalled_workers_endpoint(
 
 
 # Troubleshooting endpoints
-@app.get("/api/troubleshooting/cache-status/{environment}", response_model=dict)
+@app.get("/api/troubleshooting/cache-status/{environment}")
 async def cache_status_endpoint(
     environment: str,
     email: str = Depends(verify_session_token)
 ):
     """Get cache status for dev or prod"""
     try:
+        from troubleshooting_ops import get_cache_status
         directory = get_environment_directory(environment)
         status_data = await get_cache_status(directory)
         return status_data
@@ -1828,7 +2178,7 @@ async def cache_status_endpoint(
         )
 
 
-@app.post("/api/troubleshooting/clear-cache/{environment}/{cache_type}", response_model=dict)
+@app.post("/api/troubleshooting/clear-cache/{environment}/{cache_type}")
 async def clear_cache_endpoint(
     environment: str,
     cache_type: str,
@@ -1836,6 +2186,7 @@ async def clear_cache_endpoint(
 ):
     """Clear cache for dev or prod"""
     try:
+        from troubleshooting_ops import clear_cache
         directory = get_environment_directory(environment)
         result = await clear_cache(directory, cache_type)
         return result
@@ -1846,12 +2197,13 @@ async def clear_cache_endpoint(
         )
 
 
-@app.get("/api/troubleshooting/redis-status", response_model=dict)
+@app.get("/api/troubleshooting/redis-status")
 async def redis_status_endpoint(
     email: str = Depends(verify_session_token)
 ):
     """Get Redis status"""
     try:
+        from troubleshooting_ops import get_redis_status
         status_data = await get_redis_status()
         return status_data
     except Exception as e:
@@ -1861,13 +2213,14 @@ async def redis_status_endpoint(
         )
 
 
-@app.post("/api/troubleshooting/clear-redis", response_model=dict)
+@app.post("/api/troubleshooting/clear-redis")
 async def clear_redis_endpoint(
     pattern: str = "*",
     email: str = Depends(verify_session_token)
 ):
     """Clear Redis cache"""
     try:
+        from troubleshooting_ops import clear_redis_cache
         result = await clear_redis_cache(pattern)
         return result
     except Exception as e:
@@ -1877,13 +2230,14 @@ async def clear_redis_endpoint(
         )
 
 
-@app.get("/api/troubleshooting/packages/{environment}", response_model=dict)
+@app.get("/api/troubleshooting/packages/{environment}")
 async def packages_endpoint(
     environment: str,
     email: str = Depends(verify_session_token)
 ):
     """Get package versions"""
     try:
+        from troubleshooting_ops import get_package_versions
         directory = get_environment_directory(environment)
         packages = await get_package_versions(directory)
         return packages
@@ -1894,7 +2248,7 @@ async def packages_endpoint(
         )
 
 
-@app.get("/api/troubleshooting/pm2-logs/{app_name}", response_model=dict)
+@app.get("/api/troubleshooting/pm2-logs/{app_name}")
 async def pm2_logs_endpoint(
     app_name: str,
     lines: int = 100,
@@ -1902,6 +2256,7 @@ async def pm2_logs_endpoint(
 ):
     """Get PM2 logs"""
     try:
+        from troubleshooting_ops import get_pm2_logs
         logs = await get_pm2_logs(app_name, lines)
         return logs
     except Exception as e:
@@ -1911,7 +2266,7 @@ async def pm2_logs_endpoint(
         )
 
 
-@app.get("/api/troubleshooting/system-logs/{log_type}", response_model=dict)
+@app.get("/api/troubleshooting/system-logs/{log_type}")
 async def system_logs_endpoint(
     log_type: str,
     lines: int = 100,
@@ -1919,6 +2274,7 @@ async def system_logs_endpoint(
 ):
     """Get system logs"""
     try:
+        from troubleshooting_ops import get_system_logs
         logs = await get_system_logs(log_type, lines)
         return logs
     except Exception as e:
@@ -1928,12 +2284,13 @@ async def system_logs_endpoint(
         )
 
 
-@app.get("/api/troubleshooting/connectivity-test", response_model=dict)
+@app.get("/api/troubleshooting/connectivity-test")
 async def connectivity_test_endpoint(
     email: str = Depends(verify_session_token)
 ):
     """Test connectivity to services"""
     try:
+        from troubleshooting_ops import test_connectivity
         results = await test_connectivity()
         return results
     except Exception as e:
@@ -1943,13 +2300,14 @@ async def connectivity_test_endpoint(
         )
 
 
-@app.get("/api/troubleshooting/env-analysis/{environment}", response_model=dict)
+@app.get("/api/troubleshooting/env-analysis/{environment}")
 async def env_analysis_endpoint(
     environment: str,
     email: str = Depends(verify_session_token)
 ):
     """Analyze .env files"""
     try:
+        from troubleshooting_ops import analyze_env_file
         directory = get_environment_directory(environment)
         analysis = await analyze_env_file(directory)
         return analysis
@@ -1960,13 +2318,14 @@ async def env_analysis_endpoint(
         )
 
 
-@app.get("/api/troubleshooting/sql-migrations/{environment}", response_model=dict)
+@app.get("/api/troubleshooting/sql-migrations/{environment}")
 async def sql_migrations_endpoint(
     environment: str,
     email: str = Depends(verify_session_token)
 ):
     """Get SQL migration files"""
     try:
+        from troubleshooting_ops import get_sql_migrations
         directory = get_environment_directory(environment)
         migrations = await get_sql_migrations(directory)
         return migrations
@@ -1977,7 +2336,7 @@ async def sql_migrations_endpoint(
         )
 
 
-@app.get("/api/troubleshooting/check-migration-applied/{environment}", response_model=dict)
+@app.get("/api/troubleshooting/check-migration-applied/{environment}")
 async def check_migration_applied_endpoint(
     environment: str,
     filename: str,
@@ -1985,6 +2344,7 @@ async def check_migration_applied_endpoint(
 ):
     """Check if a specific migration has been applied"""
     try:
+        from troubleshooting_ops import check_migration_applied
         directory = get_environment_directory(environment)
         result = await check_migration_applied(directory, filename)
         return result
@@ -1995,7 +2355,7 @@ async def check_migration_applied_endpoint(
         )
 
 
-@app.post("/api/troubleshooting/execute-sql", response_model=dict)
+@app.post("/api/troubleshooting/execute-sql")
 async def execute_sql_endpoint(
     sql: str,
     dry_run: bool = True,
@@ -2003,6 +2363,7 @@ async def execute_sql_endpoint(
 ):
     """Execute SQL query"""
     try:
+        from troubleshooting_ops import execute_sql
         result = await execute_sql(sql, dry_run)
         return result
     except Exception as e:
@@ -2025,13 +2386,14 @@ async def root():
 
 # ============= DATABASE SYNC TOOLS =============
 
-@app.post("/api/database/sync/commands", response_model=dict)
+@app.post("/api/database/sync/commands")
 async def database_sync_commands_endpoint(
     payload: dict,
     email: str = Depends(verify_session_token)
 ):
     """Generate and optionally execute sync commands between environments"""
     try:
+        from troubleshooting_ops import generate_sync_commands
         source_env = payload.get("source_env")
         target_env = payload.get("target_env") 
         options = payload.get("options", {})
@@ -2053,13 +2415,14 @@ async def database_sync_commands_endpoint(
 
 # ============= VITEST TESTING TOOLS =============
 
-@app.get("/api/troubleshooting/vitest/discover/{environment}", response_model=dict)
+@app.get("/api/troubleshooting/vitest/discover/{environment}")
 async def vitest_discover_endpoint(
     environment: str,
     email: str = Depends(verify_session_token)
 ):
     """Discover Vitest tests in dev or prod environment"""
     try:
+        from troubleshooting_ops import discover_vitest_tests
         if environment not in ("dev", "prod", "app"):
             raise HTTPException(status_code=400, detail="Invalid environment")
         
@@ -2075,13 +2438,14 @@ async def vitest_discover_endpoint(
         )
 
 
-@app.post("/api/troubleshooting/vitest/run", response_model=dict)
+@app.post("/api/troubleshooting/vitest/run")
 async def vitest_run_endpoint(
     payload: dict,
     email: str = Depends(verify_session_token)
 ):
     """Run Vitest tests in dev, prod, or app environment"""
     try:
+        from troubleshooting_ops import run_vitest_tests
         environment = payload.get("environment")
         test_file = payload.get("test_file")
         test_name = payload.get("test_name")
@@ -2113,13 +2477,14 @@ async def vitest_run_endpoint(
         )
 
 
-@app.get("/api/troubleshooting/vitest/report/{environment}", response_model=dict)
+@app.get("/api/troubleshooting/vitest/report/{environment}")
 async def vitest_report_endpoint(
     environment: str,
     email: str = Depends(verify_session_token)
 ):
     """Get copyable console report of Vitest tests"""
     try:
+        from troubleshooting_ops import discover_vitest_tests
         if environment not in ("dev", "prod", "app"):
             raise HTTPException(status_code=400, detail="Invalid environment")
         
@@ -2180,7 +2545,7 @@ async def vitest_report_endpoint(
 
 # ============= DATABASE BACKUP TOOLS =============
 
-@app.get("/api/database/backup/commands/{environment}", response_model=dict)
+@app.get("/api/database/backup/commands/{environment}")
 async def database_backup_commands_endpoint(
     environment: str,
     backup_type: str = "full",
@@ -2189,6 +2554,7 @@ async def database_backup_commands_endpoint(
 ):
     """Generate and optionally execute backup commands for environment"""
     try:
+        from troubleshooting_ops import generate_backup_commands
         if environment not in ("dev", "prod", "app"):
             raise HTTPException(status_code=400, detail="Invalid environment")
         
@@ -2226,7 +2592,7 @@ async def download_backup_file(
     )
 
 
-@app.post("/api/database/backup/upload", response_model=dict)
+@app.post("/api/database/backup/upload")
 async def upload_backup_file(
     file: UploadFile = File(...),
     email: str = Depends(verify_session_token)
@@ -2264,7 +2630,7 @@ async def upload_backup_file(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post("/api/database/backup/restore", response_model=dict)
+@app.post("/api/database/backup/restore")
 async def restore_backup_file(
     filename: str = Form(...),
     environment: str = Form(...),
@@ -2427,13 +2793,14 @@ async def restore_backup_file(
 
 # ============= DATABASE CRUD EXPLORER =============
 
-@app.get("/api/database/schema/{environment}", response_model=dict)
+@app.get("/api/database/schema/{environment}")
 async def database_schema_endpoint(
     environment: str,
     email: str = Depends(verify_session_token)
 ):
     """Get database schema for CRUD explorer"""
     try:
+        from troubleshooting_ops import get_database_schema
         if environment not in ("dev", "prod", "app"):
             raise HTTPException(status_code=400, detail="Invalid environment")
         
@@ -2448,7 +2815,7 @@ async def database_schema_endpoint(
         )
 
 
-@app.get("/api/database/query/{environment}/{table_name}", response_model=dict)
+@app.get("/api/database/query/{environment}/{table_name}")
 async def database_query_endpoint(
     environment: str,
     table_name: str,
@@ -2458,6 +2825,7 @@ async def database_query_endpoint(
 ):
     """Query table data for CRUD explorer"""
     try:
+        from troubleshooting_ops import query_table_data
         if environment not in ("dev", "prod", "app"):
             raise HTTPException(status_code=400, detail="Invalid environment")
         
@@ -2474,7 +2842,7 @@ async def database_query_endpoint(
 
 # ============= TABLE MANAGEMENT =============
 
-@app.post("/api/database/create-table/{environment}", response_model=dict)
+@app.post("/api/database/create-table/{environment}")
 async def create_table_endpoint(
     environment: str,
     payload: dict,
@@ -2482,6 +2850,7 @@ async def create_table_endpoint(
 ):
     """Create a new database table"""
     try:
+        from troubleshooting_ops import create_database_table
         if environment not in ("dev", "prod", "app"):
             raise HTTPException(status_code=400, detail="Invalid environment")
         
@@ -2502,7 +2871,7 @@ async def create_table_endpoint(
         )
 
 
-@app.delete("/api/database/drop-table/{environment}/{table_name}", response_model=dict)
+@app.delete("/api/database/drop-table/{environment}/{table_name}")
 async def drop_table_endpoint(
     environment: str,
     table_name: str,
@@ -2510,6 +2879,7 @@ async def drop_table_endpoint(
 ):
     """Delete a database table"""
     try:
+        from troubleshooting_ops import drop_database_table
         if environment not in ("dev", "prod", "app"):
             raise HTTPException(status_code=400, detail="Invalid environment")
         
@@ -2526,13 +2896,14 @@ async def drop_table_endpoint(
 
 # ============= DATABASE TOOLKIT =============
 
-@app.get("/api/database/toolkit/users/{environment}", response_model=dict)
+@app.get("/api/database/toolkit/users/{environment}")
 async def list_database_users_endpoint(
     environment: str,
     email: str = Depends(verify_session_token)
 ):
     """List all database users"""
     try:
+        from troubleshooting_ops import list_database_users
         if environment not in ("dev", "prod", "app"):
             raise HTTPException(status_code=400, detail="Invalid environment")
         
@@ -2547,7 +2918,7 @@ async def list_database_users_endpoint(
         )
 
 
-@app.post("/api/database/toolkit/users/{environment}", response_model=dict)
+@app.post("/api/database/toolkit/users/{environment}")
 async def create_database_user_endpoint(
     environment: str,
     payload: dict,
@@ -2555,6 +2926,7 @@ async def create_database_user_endpoint(
 ):
     """Create a new database user"""
     try:
+        from troubleshooting_ops import create_database_user
         if environment not in ("dev", "prod", "app"):
             raise HTTPException(status_code=400, detail="Invalid environment")
         
@@ -2576,7 +2948,7 @@ async def create_database_user_endpoint(
         )
 
 
-@app.delete("/api/database/toolkit/users/{environment}/{username}", response_model=dict)
+@app.delete("/api/database/toolkit/users/{environment}/{username}")
 async def delete_database_user_endpoint(
     environment: str,
     username: str,
@@ -2584,6 +2956,7 @@ async def delete_database_user_endpoint(
 ):
     """Delete a database user"""
     try:
+        from troubleshooting_ops import delete_database_user
         if environment not in ("dev", "prod", "app"):
             raise HTTPException(status_code=400, detail="Invalid environment")
         
@@ -2598,13 +2971,14 @@ async def delete_database_user_endpoint(
         )
 
 
-@app.post("/api/database/toolkit/privileges/grant", response_model=dict)
+@app.post("/api/database/toolkit/privileges/grant")
 async def grant_privileges_endpoint(
     payload: dict,
     email: str = Depends(verify_session_token)
 ):
     """Grant table privileges to a user"""
     try:
+        from troubleshooting_ops import grant_table_privileges
         environment = payload.get("environment")
         username = payload.get("username")
         table_name = payload.get("table_name")
@@ -2627,13 +3001,14 @@ async def grant_privileges_endpoint(
         )
 
 
-@app.post("/api/database/toolkit/privileges/revoke", response_model=dict)
+@app.post("/api/database/toolkit/privileges/revoke")
 async def revoke_privileges_endpoint(
     payload: dict,
     email: str = Depends(verify_session_token)
 ):
     """Revoke table privileges from a user"""
     try:
+        from troubleshooting_ops import revoke_table_privileges
         environment = payload.get("environment")
         username = payload.get("username")
         table_name = payload.get("table_name")
@@ -2656,13 +3031,14 @@ async def revoke_privileges_endpoint(
         )
 
 
-@app.post("/api/database/toolkit/optimize", response_model=dict)
+@app.post("/api/database/toolkit/optimize")
 async def optimize_tables_endpoint(
     payload: dict,
     email: str = Depends(verify_session_token)
 ):
     """Optimize database tables"""
     try:
+        from troubleshooting_ops import optimize_database_tables
         environment = payload.get("environment")
         table_names = payload.get("table_names")
         
@@ -2685,7 +3061,7 @@ async def optimize_tables_endpoint(
 
 # ============= ENV FILE EDITOR =============
 
-@app.get("/api/database/env-files/{environment}", response_model=dict)
+@app.get("/api/database/env-files/{environment}")
 async def get_env_files_endpoint(
     environment: str,
     email: str = Depends(verify_session_token)
@@ -2708,7 +3084,7 @@ async def get_env_files_endpoint(
         )
 
 
-@app.get("/api/database/env-file/{environment}/{filename}", response_model=dict)
+@app.get("/api/database/env-file/{environment}/{filename}")
 async def read_env_file_endpoint(
     environment: str,
     filename: str,
@@ -2739,7 +3115,7 @@ async def read_env_file_endpoint(
         )
 
 
-@app.post("/api/database/env-file/{environment}/{filename}", response_model=dict)
+@app.post("/api/database/env-file/{environment}/{filename}")
 async def write_env_file_endpoint(
     environment: str,
     filename: str,
@@ -2775,7 +3151,7 @@ async def write_env_file_endpoint(
 
 # ============= DATABASE SELECTOR =============
 
-@app.get("/api/database/selector/{environment}", response_model=dict)
+@app.get("/api/database/selector/{environment}")
 async def get_database_selector_endpoint(
     environment: str,
     email: str = Depends(verify_session_token)
@@ -2805,7 +3181,7 @@ async def get_database_selector_endpoint(
         )
 
 
-@app.post("/api/database/selector/{environment}", response_model=dict)
+@app.post("/api/database/selector/{environment}")
 async def set_database_selector_endpoint(
     environment: str,
     payload: dict,
@@ -2838,7 +3214,7 @@ async def set_database_selector_endpoint(
 
 # ============= SETUP TEST DATABASE =============
 
-@app.post("/api/database/setup-test", response_model=dict)
+@app.post("/api/database/setup-test")
 async def setup_test_database_endpoint(
     payload: dict,
     email: str = Depends(verify_session_token)
@@ -2848,6 +3224,7 @@ async def setup_test_database_endpoint(
     Updates all .env* files in the selected environment directory.
     """
     try:
+        from troubleshooting_ops import setup_test_database
         db_name = payload.get("db_name")
         username = payload.get("username")
         password = payload.get("password")
@@ -3001,13 +3378,14 @@ async def setup_test_database_endpoint(
         )
 
 
-@app.post("/api/database/execute-test-setup", response_model=dict)
+@app.post("/api/database/execute-test-setup")
 async def execute_test_setup_endpoint(
     payload: dict,
     email: str = Depends(verify_session_token)
 ):
     """Execute test database setup SQL commands"""
     try:
+        from troubleshooting_ops import execute_test_database_setup
         commands = payload.get("commands", [])
         db_url = payload.get("db_url")
         
@@ -3025,13 +3403,14 @@ async def execute_test_setup_endpoint(
         )
 
 
-@app.post("/api/database/create-database", response_model=dict)
+@app.post("/api/database/create-database")
 async def create_database_endpoint(
     payload: dict,
     email: str = Depends(verify_session_token)
 ):
     """Create a database only (without user)"""
     try:
+        from troubleshooting_ops import create_database_only
         db_name = payload.get("db_name")
         environment = payload.get("environment", "dev")
         
@@ -3052,13 +3431,14 @@ async def create_database_endpoint(
         )
 
 
-@app.post("/api/database/create-user", response_model=dict)
+@app.post("/api/database/create-user")
 async def create_user_endpoint(
     payload: dict,
     email: str = Depends(verify_session_token)
 ):
     """Create a database user only (without database)"""
     try:
+        from troubleshooting_ops import create_database_user
         username = payload.get("username")
         password = payload.get("password")
         environment = payload.get("environment", "dev")
@@ -3080,13 +3460,14 @@ async def create_user_endpoint(
         )
 
 
-@app.get("/api/database/env-files/{environment}", response_model=dict)
+@app.get("/api/database/env-files/{environment}")
 async def get_env_files_endpoint(
     environment: str,
     email: str = Depends(verify_session_token)
 ):
     """Get list of all .env* files for an environment"""
     try:
+        from troubleshooting_ops import get_env_files_list
         if environment not in ("dev", "prod", "app"):
             raise HTTPException(status_code=400, detail="Invalid environment. Use 'dev' or 'prod'")
         
@@ -3102,7 +3483,7 @@ async def get_env_files_endpoint(
         )
 
 
-@app.get("/api/database/env-file/{environment}/{filename:path}", response_model=dict)
+@app.get("/api/database/env-file/{environment}/{filename:path}")
 async def read_env_file_endpoint(
     environment: str,
     filename: str,
@@ -3110,6 +3491,7 @@ async def read_env_file_endpoint(
 ):
     """Read content of a specific .env file"""
     try:
+        from troubleshooting_ops import read_env_file
         if environment not in ("dev", "prod", "app"):
             raise HTTPException(status_code=400, detail="Invalid environment. Use 'dev' or 'prod'")
         
@@ -3129,7 +3511,7 @@ async def read_env_file_endpoint(
         )
 
 
-@app.post("/api/database/env-file/{environment}/{filename:path}", response_model=dict)
+@app.post("/api/database/env-file/{environment}/{filename:path}")
 async def write_env_file_endpoint(
     environment: str,
     filename: str,
@@ -3138,6 +3520,7 @@ async def write_env_file_endpoint(
 ):
     """Write content to a specific .env file"""
     try:
+        from troubleshooting_ops import write_env_file
         if environment not in ("dev", "prod", "app"):
             raise HTTPException(status_code=400, detail="Invalid environment. Use 'dev' or 'prod'")
         
@@ -3162,13 +3545,14 @@ async def write_env_file_endpoint(
 
 
 # Update DATABASE_URL for both dev and prod
-@app.post("/api/database/update-database-url", response_model=dict)
+@app.post("/api/database/update-database-url")
 async def update_database_url_endpoint(
     payload: dict,
     email: str = Depends(verify_session_token)
 ):
     """Update DATABASE_URL in dev or prod environment files"""
     try:
+        from troubleshooting_ops import update_database_url
         environment = payload.get("environment")
         database_url = payload.get("database_url")
         target_files = payload.get("files") or [".env.local"]
@@ -3197,7 +3581,7 @@ async def update_database_url_endpoint(
 
 # ============= SETTINGS ENDPOINTS =============
 
-@app.get("/api/settings", response_model=dict)
+@app.get("/api/settings")
 async def get_settings_endpoint(
     email: str = Depends(verify_session_token)
 ):
@@ -3212,7 +3596,7 @@ async def get_settings_endpoint(
         )
 
 
-@app.post("/api/settings", response_model=dict)
+@app.post("/api/settings")
 async def save_settings_endpoint(
     payload: dict,
     email: str = Depends(verify_session_token)
@@ -3235,7 +3619,7 @@ async def save_settings_endpoint(
         )
 
 
-@app.get("/api/settings/server-info", response_model=dict)
+@app.get("/api/settings/server-info")
 async def server_info_endpoint(
     email: str = Depends(verify_session_token)
 ):
@@ -3250,7 +3634,7 @@ async def server_info_endpoint(
         )
 
 
-@app.post("/api/settings/detect-scripts", response_model=dict)
+@app.post("/api/settings/detect-scripts")
 async def detect_scripts_endpoint(
     payload: dict,
     email: str = Depends(verify_session_token)
@@ -3267,7 +3651,7 @@ async def detect_scripts_endpoint(
         )
 
 
-@app.get("/api/settings/pm2-processes", response_model=dict)
+@app.get("/api/settings/pm2-processes")
 async def pm2_processes_endpoint(
     email: str = Depends(verify_session_token)
 ):
@@ -3282,7 +3666,7 @@ async def pm2_processes_endpoint(
         )
 
 
-@app.get("/api/settings/nginx-sites", response_model=dict)
+@app.get("/api/settings/nginx-sites")
 async def nginx_sites_endpoint(
     email: str = Depends(verify_session_token)
 ):
@@ -3297,7 +3681,7 @@ async def nginx_sites_endpoint(
         )
 
 
-@app.post("/api/settings/pm2/restart/{env}", response_model=dict)
+@app.post("/api/settings/pm2/restart/{env}")
 async def pm2_restart_with_settings_endpoint(
     env: str,
     email: str = Depends(verify_session_token)
@@ -3317,7 +3701,7 @@ async def pm2_restart_with_settings_endpoint(
         )
 
 
-@app.post("/api/settings/nginx/reload", response_model=dict)
+@app.post("/api/settings/nginx/reload")
 async def nginx_reload_endpoint(
     email: str = Depends(verify_session_token)
 ):
@@ -3332,7 +3716,7 @@ async def nginx_reload_endpoint(
         )
 
 
-@app.get("/api/nginx/config/{config_path:path}", response_model=dict)
+@app.get("/api/nginx/config/{config_path:path}")
 async def read_nginx_config_endpoint(
     config_path: str,
     email: str = Depends(verify_session_token)
@@ -3348,7 +3732,7 @@ async def read_nginx_config_endpoint(
         )
 
 
-@app.post("/api/nginx/config/{config_path:path}", response_model=dict)
+@app.post("/api/nginx/config/{config_path:path}")
 async def write_nginx_config_endpoint(
     config_path: str,
     request: dict,
@@ -3367,7 +3751,7 @@ async def write_nginx_config_endpoint(
         )
 
 
-@app.post("/api/nginx/autofix", response_model=dict)
+@app.post("/api/nginx/autofix")
 async def autofix_nginx_endpoint(
     request: dict,
     email: str = Depends(verify_session_token)
@@ -3394,7 +3778,7 @@ async def autofix_nginx_endpoint(
         )
 
 
-@app.get("/api/nginx/ssl-certificates", response_model=dict)
+@app.get("/api/nginx/ssl-certificates")
 async def ssl_certificates_endpoint(
     email: str = Depends(verify_session_token)
 ):
@@ -3409,7 +3793,7 @@ async def ssl_certificates_endpoint(
         )
 
 
-@app.post("/api/nginx/ssl-renew", response_model=dict)
+@app.post("/api/nginx/ssl-renew")
 async def ssl_renew_endpoint(
     payload: dict = None,
     email: str = Depends(verify_session_token)
@@ -3426,7 +3810,7 @@ async def ssl_renew_endpoint(
         )
 
 
-@app.get("/api/nginx/ssl-details", response_model=dict)
+@app.get("/api/nginx/ssl-details")
 async def ssl_details_endpoint(
     cert_path: str,
     email: str = Depends(verify_session_token)
@@ -3442,7 +3826,7 @@ async def ssl_details_endpoint(
         )
 
 
-@app.post("/api/settings/database/test", response_model=dict)
+@app.post("/api/settings/database/test")
 async def test_database_endpoint(
     payload: dict,
     email: str = Depends(verify_session_token)
@@ -3458,7 +3842,7 @@ async def test_database_endpoint(
         )
 
 
-@app.get("/api/settings/database/from-env", response_model=dict)
+@app.get("/api/settings/database/from-env")
 async def database_from_env_endpoint(
     email: str = Depends(verify_session_token)
 ):
@@ -3473,7 +3857,7 @@ async def database_from_env_endpoint(
         )
 
 
-@app.get("/api/settings/database/available", response_model=dict)
+@app.get("/api/settings/database/available")
 async def available_databases_endpoint(
     host: str = "localhost",
     port: int = 5432,
@@ -3492,7 +3876,7 @@ async def available_databases_endpoint(
         )
 
 
-@app.get("/api/settings/database/scan-all", response_model=dict)
+@app.get("/api/settings/database/scan-all")
 async def scan_all_databases_endpoint(
     env: str = "dev",
     email: str = Depends(verify_session_token)
@@ -3509,24 +3893,21 @@ async def scan_all_databases_endpoint(
         )
 
 
-@app.get("/api/build/status", response_model=dict)
+@app.get("/api/build/status")
 async def build_status_simple_endpoint(
     email: str = Depends(verify_session_token)
 ):
     """Get current build status (simple)"""
     try:
-        import os
-        import json
         status_file = "/var/www/build/status/current_build.json"
         if os.path.exists(status_file):
-            with open(status_file, 'r') as f:
-                return json.load(f)
+            return await _read_json_file(status_file)
         return {"status": "idle"}
     except Exception as e:
         return {"status": "unknown", "error": str(e)}
 
 
-@app.get("/api/git/status", response_model=dict)
+@app.get("/api/git/status")
 async def git_status_simple_endpoint(
     env: str = "dev",
     email: str = Depends(verify_session_token)
@@ -3579,7 +3960,7 @@ async def git_status_simple_endpoint(
         }
 
 
-@app.get("/api/stats/active-users", response_model=dict)
+@app.get("/api/stats/active-users")
 async def active_users_endpoint(
     env: str = "dev",
     email: str = Depends(verify_session_token)
@@ -3642,7 +4023,7 @@ async def active_users_endpoint(
 
 # ============= BUILDMASTER SETTINGS ENDPOINTS =============
 
-@app.get("/api/buildmaster/settings", response_model=dict)
+@app.get("/api/buildmaster/settings")
 async def get_buildmaster_settings_endpoint(
     email: str = Depends(verify_session_token)
 ):
@@ -3657,7 +4038,7 @@ async def get_buildmaster_settings_endpoint(
         )
 
 
-@app.post("/api/buildmaster/settings", response_model=dict)
+@app.post("/api/buildmaster/settings")
 async def save_buildmaster_settings_endpoint(
     payload: dict,
     email: str = Depends(verify_session_token)
@@ -3673,7 +4054,7 @@ async def save_buildmaster_settings_endpoint(
         )
 
 
-@app.get("/api/buildmaster/status", response_model=dict)
+@app.get("/api/buildmaster/status")
 async def get_buildmaster_status_endpoint(
     email: str = Depends(verify_session_token)
 ):
@@ -3688,7 +4069,7 @@ async def get_buildmaster_status_endpoint(
         )
 
 
-@app.get("/api/buildmaster/valid-emails", response_model=dict)
+@app.get("/api/buildmaster/valid-emails")
 async def get_valid_emails_endpoint(
     email: str = Depends(verify_session_token)
 ):
@@ -3703,7 +4084,7 @@ async def get_valid_emails_endpoint(
         )
 
 
-@app.post("/api/buildmaster/valid-emails", response_model=dict)
+@app.post("/api/buildmaster/valid-emails")
 async def save_valid_emails_endpoint(
     payload: dict,
     email: str = Depends(verify_session_token)
@@ -3720,7 +4101,7 @@ async def save_valid_emails_endpoint(
         )
 
 
-@app.post("/api/buildmaster/valid-emails/add", response_model=dict)
+@app.post("/api/buildmaster/valid-emails/add")
 async def add_valid_email_endpoint(
     payload: dict,
     email: str = Depends(verify_session_token)
@@ -3741,7 +4122,7 @@ async def add_valid_email_endpoint(
         )
 
 
-@app.post("/api/buildmaster/valid-emails/remove", response_model=dict)
+@app.post("/api/buildmaster/valid-emails/remove")
 async def remove_valid_email_endpoint(
     payload: dict,
     email: str = Depends(verify_session_token)
@@ -3762,7 +4143,7 @@ async def remove_valid_email_endpoint(
         )
 
 
-@app.post("/api/buildmaster/check-updates", response_model=dict)
+@app.post("/api/buildmaster/check-updates")
 async def check_updates_endpoint(
     email: str = Depends(verify_session_token)
 ):
@@ -3777,7 +4158,7 @@ async def check_updates_endpoint(
         )
 
 
-@app.post("/api/buildmaster/update", response_model=dict)
+@app.post("/api/buildmaster/update")
 async def update_buildmaster_endpoint(
     email: str = Depends(verify_session_token)
 ):
@@ -3792,7 +4173,7 @@ async def update_buildmaster_endpoint(
         )
 
 
-@app.post("/api/buildmaster/restart", response_model=dict)
+@app.post("/api/buildmaster/restart")
 async def restart_buildmaster_endpoint(
     email: str = Depends(verify_session_token)
 ):
@@ -3823,7 +4204,7 @@ async def api_health_check():
 # SANITY CHECKER ENDPOINTS
 # ============================================================================
 
-@app.get("/api/sanity/check", response_model=dict)
+@app.get("/api/sanity/check")
 async def sanity_check_endpoint(
     environment: str = "dev",
     email: str = Depends(verify_session_token)
@@ -3833,6 +4214,7 @@ async def sanity_check_endpoint(
     Checks: System, Node, Nginx, React, Build, Config, Network
     """
     try:
+        from sanity_checker import run_sanity_check
         project_dir = get_environment_directory(environment)
         report = await run_sanity_check(project_dir, environment)
         return report.to_dict()
@@ -3843,7 +4225,7 @@ async def sanity_check_endpoint(
         )
 
 
-@app.get("/api/sanity/quick", response_model=dict)
+@app.get("/api/sanity/quick")
 async def sanity_quick_check_endpoint(
     environment: str = "dev",
     email: str = Depends(verify_session_token)
@@ -3898,7 +4280,7 @@ async def sanity_quick_check_endpoint(
         )
 
 
-@app.post("/api/sanity/fix", response_model=dict)
+@app.post("/api/sanity/fix")
 async def sanity_fix_endpoint(
     payload: dict,
     email: str = Depends(verify_session_token)
@@ -3992,7 +4374,7 @@ async def sanity_fix_endpoint(
         )
 
 
-@app.get("/api/sanity/report", response_model=dict)
+@app.get("/api/sanity/report")
 async def sanity_report_endpoint(
     environment: str = "dev",
     format: str = "console",
@@ -4003,6 +4385,7 @@ async def sanity_report_endpoint(
     Format: console (copyable text) or json
     """
     try:
+        from sanity_checker import run_sanity_check
         project_dir = get_environment_directory(environment)
         report = await run_sanity_check(project_dir, environment)
         
@@ -4079,10 +4462,16 @@ async def sanity_report_endpoint(
 
 
 if __name__ == "__main__":
+    # uvloop and httptools come with uvicorn[standard]; name them so a
+    # missing extension fails loudly instead of falling back to asyncio/h11.
+    # A single worker: sessions, OTPs and build state live in process memory
     uvicorn.run(
         "main:app",
         host=settings.BUILD_API_HOST,
         port=settings.BUILD_API_PORT,
+        loop="uvloop",
+        http="httptools",
+        workers=1,
         reload=False
     )
 
@@ -4,7 +4,7 @@ module.exports = {
       name: 'buildmaster-api',
       script: 'main.py',
       interpreter: 'python',
-      interpreter_args: '-m uvicorn main:app --host 0.0.0.0 --port 8889 --workers 1',
+      interpreter_args: '-m uvicorn main:app --host 0.0.0.0 --port 8889 --workers 1 --loop uvloop --http httptools',
       cwd: './api',
       instances: 1,
       autorestart: true,
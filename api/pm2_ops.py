@@ -1,7 +1,9 @@
 """PM2 process management operations"""
+import asyncio
 import subprocess
 import json
-from typing import Dict, Any, Optional
+import time
+from typing import Dict, Any, List, Optional
 from config import settings
 from models import PM2ReloadResponse
 
@@ -38,10 +40,58 @@ def get_pm2_status(app_name: str) -> Optional[Dict[str, Any]]:
         return None
 
 
-def is_pm2_running(app_name: str) -> bool:
+# How long a `pm2 jlist` snapshot is reused by health probes
+PM2_LIST_CACHE_SECONDS = 2.0
+
+_pm2_list_cache: Dict[str, Any] = {"ts": 0.0, "value": None}
+_pm2_list_lock = asyncio.Lock()
+
+
+async def get_pm2_process_list() -> Optional[List[Dict[str, Any]]]:
+    """
+    Get the parsed `pm2 jlist` output without blocking the event loop
+    
+    The snapshot is shared for PM2_LIST_CACHE_SECONDS so several concurrent
+    probes cost a single pm2 spawn.
+    
+    Returns:
+        List of PM2 process dicts, or None if pm2 failed
+    """
+    async with _pm2_list_lock:
+        if time.monotonic() - _pm2_list_cache["ts"] < PM2_LIST_CACHE_SECONDS:
+            return _pm2_list_cache["value"]
+        
+        processes = None
+        try:
+            process = await asyncio.create_subprocess_exec(
+                "pm2", "jlist",
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL
+            )
+            try:
+                stdout, _ = await asyncio.wait_for(process.communicate(), timeout=10)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+                raise
+            if process.returncode == 0:
+                processes = json.loads(stdout)
+        except Exception as e:
+            print(f"Error listing PM2 processes: {e}")
+        
+        _pm2_list_cache["ts"] = time.monotonic()
+        _pm2_list_cache["value"] = processes
+        return processes
+
+
+async def is_pm2_running(app_name: str) -> bool:
     """Check if PM2 process is running"""
-    status = get_pm2_status(app_name)
-    return status is not None and status.get("status") == "online"
+    processes = await get_pm2_process_list()
+    for proc in processes or []:
+        if proc.get("name") == app_name:
+            return proc.get("pm2_env", {}).get("status") == "online"
+    return False
 
 
 async def reload_pm2_app(app_name: str) -> PM2ReloadResponse:
@@ -1,6 +1,8 @@
 """Settings operations for Build Dashboard API"""
 import json
 import os
+import aiofiles
+import orjson
 import subprocess
 import asyncio
 import time
@@ -231,8 +233,8 @@ async def detect_build_scripts(project_path: str) -> Dict[str, Any]:
         package_json_path = os.path.join(project_path, "package.json")
         
         if os.path.exists(package_json_path):
-            with open(package_json_path, 'r') as f:
-                package = json.load(f)
+            async with aiofiles.open(package_json_path, 'rb') as f:
+                package = orjson.loads(await f.read())
                 
             if "scripts" in package:
                 # Get all scripts that might be build-related
@@ -1,13 +1,15 @@
 """Troubleshooting operations for system diagnostics and maintenance"""
 import subprocess
 import os
-import json
 import redis
+import aiofiles
+import orjson
 from pathlib import Path
 from typing import Dict, List, Optional
 from datetime import datetime
 from urllib.parse import urlparse, urlunparse
 from config import settings
+from db_service_ops import get_pg_pool
 
 
 def convert_db_url_to_localhost(db_url: str) -> str:
@@ -235,8 +237,8 @@ async def get_package_versions(directory: str) -> Dict:
         package_json = dir_path / "package.json"
         
         if package_json.exists():
-            with open(package_json, 'r') as f:
-                data = json.load(f)
+            async with aiofiles.open(package_json, 'rb') as f:
+                data = orjson.loads(await f.read())
             
             # Get dependencies
             deps = data.get("dependencies", {})
@@ -332,9 +334,9 @@ async def test_connectivity() -> Dict:
     
     # Test database
     try:
-        import psycopg2
-        conn = psycopg2.connect(settings.DATABASE_URL)
-        conn.close()
+        pool = await get_pg_pool()
+        async with pool.acquire() as conn:
+            await conn.fetchval("SELECT 1")
         result["tests"]["database"] = {"status": "pass", "message": "Connected successfully"}
     except Exception as e:
         result["tests"]["database"] = {"status": "fail", "message": str(e)}
@@ -686,25 +688,19 @@ async def execute_sql(sql: str, dry_run: bool = True) -> Dict:
         return result
     
     try:
-        import psycopg2
-        
-        conn = psycopg2.connect(settings.DATABASE_URL)
-        cursor = conn.cursor()
-        
-        # Execute SQL
-        cursor.execute(sql)
-        
-        # Check if it's a SELECT query
-        if sql.strip().upper().startswith("SELECT"):
-            results = cursor.fetchall()
-            result["results"] = [list(row) for row in results]
-            result["rows_affected"] = len(results)
-        else:
-            conn.commit()
-            result["rows_affected"] = cursor.rowcount
-        
-        cursor.close()
-        conn.close()
+        pool = await get_pg_pool()
+        async with pool.acquire() as conn:
+            # Check if it's a SELECT query
+            if sql.strip().upper().startswith("SELECT"):
+                results = await conn.fetch(sql)
+                result["results"] = [list(row) for row in results]
+                result["rows_affected"] = len(results)
+            else:
+                # Runs in its own transaction; the status tag ends with the
+                # row count, e.g. "UPDATE 3" or "INSERT 0 1"
+                status_tag = await conn.execute(sql)
+                count = status_tag.rsplit(" ", 1)[-1]
+                result["rows_affected"] = int(count) if count.isdigit() else 0
         
         result["success"] = True
         result["message"] = f"SQL executed successfully. Rows affected: {result['rows_affected']}"
@@ -1015,7 +1011,8 @@ async def run_vitest_tests(
             result["console_output"].append("❌ package.json not found")
             return result
         
-        package_data = json.loads(package_json.read_text())
+        async with aiofiles.open(package_json, 'rb') as f:
+            package_data = orjson.loads(await f.read())
         scripts = package_data.get("scripts", {})
         
         # Look for vitest script